@@ -0,0 +1,165 @@
+# 测试结果汇总统计
+# 在结果存储（results_store.py）写入的同一事务中增量更新按 日期 × 车型 × 测试类别 × 测试项 汇总的统计表：
+# 测试次数、异常次数、检查耗时（按键测试即按下按钮的用时）、ping平均延迟、丢包率。
+# 单项IO检查（check_io）的结果随后还会通过 /api/submit_test 提交一次，只计入耗时和测量值，测试次数和异常次数按提交的结果统计，
+# 每次测试只统计一次。
+# /api/analytics 直接从汇总表按需要的维度合并，看板和班次报告不再扫描原始记录；
+# 汇总表为空而已有原始记录时（首次启用）从原始记录重建一次
+
+import json
+from datetime import datetime
+
+from results_store import COLUMNS, results_store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    day TEXT NOT NULL,              -- 日期（本地时间，2026-01-13）
+    family TEXT NOT NULL,           -- 车型，无法识别时为空字符串
+    category TEXT NOT NULL,
+    item TEXT NOT NULL,
+    tests INTEGER NOT NULL DEFAULT 0,       -- 不含check_io记录
+    failures INTEGER NOT NULL DEFAULT 0,    -- abnormal + error
+    elapsed_sum REAL NOT NULL DEFAULT 0,
+    elapsed_count INTEGER NOT NULL DEFAULT 0,
+    delay_sum REAL NOT NULL DEFAULT 0,      -- avg_delay（毫秒）之和
+    delay_count INTEGER NOT NULL DEFAULT 0,
+    loss_sum REAL NOT NULL DEFAULT 0,       -- packet_loss_rate（%）之和
+    loss_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, family, category, item)
+);
+"""
+
+_METRICS = ('tests', 'failures', 'elapsed_sum', 'elapsed_count', 'delay_sum', 'delay_count', 'loss_sum', 'loss_count')
+_UPSERT = (
+    f"INSERT INTO rollups (day, family, category, item, {', '.join(_METRICS)}) "
+    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(_METRICS))}) "
+    f"ON CONFLICT (day, family, category, item) DO UPDATE SET "
+    + ', '.join(f"{name} = {name} + excluded.{name}" for name in _METRICS)
+)
+
+# 可用于分组和过滤的维度
+GROUP_FIELDS = ('day', 'family', 'category', 'item')
+
+_INDEX = {name: index for index, name in enumerate(COLUMNS)}
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def aggregate(rows, sign=1, totals=None):
+    """把结果记录（results_store.COLUMNS 顺序的元组）累加到 {(日期, 车型, 类别, 测试项): [指标...]}"""
+    totals = {} if totals is None else totals
+    days = {}
+    for row in rows:
+        recorded_at = row[_INDEX['recorded_at']]
+        day_key = int(recorded_at // 900)  # 同一刻钟内的日期只计算一次（时区偏移都是15分钟的整数倍）
+        day = days.get(day_key)
+        if day is None:
+            day = days[day_key] = datetime.fromtimestamp(recorded_at).strftime('%Y-%m-%d')
+        key = (day, row[_INDEX['family']] or '', row[_INDEX['category']] or '', row[_INDEX['item']] or '')
+        metrics = totals.get(key)
+        if metrics is None:
+            metrics = totals[key] = [0] * len(_METRICS)
+        result = row[_INDEX['result']]
+        if row[_INDEX['source']] != 'check_io':
+            metrics[0] += sign
+            if result in ('abnormal', 'error'):
+                metrics[1] += sign
+        elapsed = row[_INDEX['elapsed']]
+        if elapsed is not None and result == 'normal':  # 超时等异常结果的耗时不是按下用时，不计入
+            metrics[2] += sign * elapsed
+            metrics[3] += sign
+        if row[_INDEX['data']]:
+            data = json.loads(row[_INDEX['data']])
+            delay = _number(data.get('avg_delay'))
+            if delay is not None:
+                metrics[4] += sign * delay
+                metrics[5] += sign
+            loss = _number(data.get('packet_loss_rate'))
+            if loss is not None:
+                metrics[6] += sign * loss
+                metrics[7] += sign
+    return totals
+
+
+class RollupIndex:
+    """按 日期 × 车型 × 测试类别 × 测试项 的增量汇总表（注册为结果存储的写入监听）"""
+
+    def initialize(self, conn):
+        conn.executescript(_SCHEMA)
+        if conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone() is None:
+            if conn.execute("SELECT 1 FROM results LIMIT 1").fetchone() is not None:
+                self.rebuild(conn)
+
+    def apply(self, conn, rows, sign):
+        if not rows:
+            return
+        totals = aggregate(rows, sign)
+        conn.executemany(_UPSERT, [key + tuple(metrics) for key, metrics in totals.items()])
+        if sign < 0:
+            conn.execute("DELETE FROM rollups WHERE tests <= 0 AND elapsed_count <= 0 AND delay_count <= 0 AND loss_count <= 0")
+
+    def rebuild(self, conn):
+        """从原始记录重建汇总表"""
+        with conn:
+            conn.execute("DELETE FROM rollups")
+            totals = {}
+            cursor = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM results")
+            count = 0
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                aggregate(rows, 1, totals)
+                count += len(rows)
+            conn.executemany(_UPSERT, [key + tuple(metrics) for key, metrics in totals.items()])
+        print(f"[统计] 已从 {count} 条测试结果重建汇总表（{len(totals)} 组）")
+
+
+def _average(total, count, digits=3):
+    return round(total / count, digits) if count else None
+
+
+def query(group_by=('family', 'item'), filters=None, since=None, until=None):
+    """按维度合并汇总表，返回 [{维度..., tests, failures, failure_rate, avg_elapsed, avg_delay, avg_packet_loss_rate}]
+
+    since / until 为日期字符串（2026-01-13，包含until当天）
+    """
+    group_by = [field for field in group_by if field in GROUP_FIELDS]
+    clauses, params = [], []
+    for field in GROUP_FIELDS:
+        value = (filters or {}).get(field)
+        if value:
+            clauses.append(f"{field} = ?")
+            params.append(value)
+    if since:
+        clauses.append("day >= ?")
+        params.append(since)
+    if until:
+        clauses.append("day <= ?")
+        params.append(until)
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    columns = ', '.join(group_by + [f"SUM({name}) AS {name}" for name in _METRICS])
+    group = (" GROUP BY " + ', '.join(group_by) + " ORDER BY " + ', '.join(group_by)) if group_by else ""
+    rows = results_store.execute(f"SELECT {columns} FROM rollups{where}{group}", params)
+    groups = []
+    for row in rows:
+        if not (row['tests'] or row['elapsed_count'] or row['delay_count'] or row['loss_count']):
+            continue
+        entry = {field: row[field] for field in group_by}
+        entry.update({
+            "tests": row['tests'],
+            "failures": row['failures'],
+            "failure_rate": _average(row['failures'], row['tests'], 4),
+            "avg_elapsed": _average(row['elapsed_sum'], row['elapsed_count']),  # 按键测试即平均按下用时（秒）
+            "avg_delay": _average(row['delay_sum'], row['delay_count']),
+            "avg_packet_loss_rate": _average(row['loss_sum'], row['loss_count']),
+        })
+        groups.append(entry)
+    return groups
+
+
+# 全局汇总表，导入时注册到结果存储
+rollups = RollupIndex()
+results_store.add_listener(rollups)
@@ -1,6 +1,10 @@
 # 基础API处理器
 # 所有测试类别的API处理器都应该继承此类
 
+from .ssh_pool import ssh_pool
+from .int_data_parser import IntDataStreamParser
+from .io_subscriber import get_io_subscriber
+
 class BaseAPI:
     """基础API处理器，提供默认的API处理方法"""
     
@@ -28,21 +32,10 @@ class BaseAPI:
             try:
                 import paramiko
                 
-                # 创建SSH客户端
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                
-                # 连接SSH服务器
+                # 从连接池获取SSH连接（同一主机复用已建立的连接，无需重新握手）
                 try:
-                    ssh.connect(
-                        hostname=ssh_host,
-                        username=ssh_user,
-                        password=ssh_password,
-                        timeout=config.SSH_TIMEOUT,
-                        look_for_keys=False,
-                        allow_agent=False
-                    )
-                    print(f"[SSH调试] 连接成功")
+                    ssh = ssh_pool.acquire(ssh_host, ssh_user, ssh_password)
+                    print(f"[SSH调试] 获取连接成功")
                 except Exception as conn_error:
                     print(f"[SSH调试] 连接失败: {str(conn_error)}")
                     raise
@@ -64,39 +57,17 @@ class BaseAPI:
                     if stderr_text:
                         print(f"[SSH调试] 错误输出: {stderr_text}")
                     
+                    # 连接归还连接池后保持打开，空闲超时（SSH_POOL_IDLE_TIMEOUT）后自动回收
                     if exit_status == 0:
-                        # 不立即关闭连接，返回SSH对象信息用于后续关闭
-                        # 注意：这里不能直接返回SSH对象（无法序列化），需要在后台线程中保持连接
-                        import threading
-                        import time
-                        
-                        # 在后台线程中保持连接指定时间后关闭
-                        def close_connection_after_delay(ssh_conn, delay_seconds):
-                            time.sleep(delay_seconds)
-                            try:
-                                ssh_conn.close()
-                                print(f"[SSH调试] 连接已自动关闭（保持{delay_seconds}秒后）")
-                            except:
-                                pass
-                        
-                        hold_time = getattr(config, 'SSH_CONNECTION_HOLD_TIME', 30)
-                        thread = threading.Thread(
-                            target=close_connection_after_delay,
-                            args=(ssh, hold_time),
-                            daemon=True
-                        )
-                        thread.start()
-                        print(f"[SSH调试] 连接将保持{hold_time}秒后自动关闭")
-                        
                         return {"status": "success", "message": "指令发送成功"}
                     else:
                         error_msg = stderr_text if stderr_text else "命令执行失败"
-                        ssh.close()
                         return {"status": "error", "message": f"指令执行失败: {error_msg}"}
                 except Exception as exec_error:
-                    ssh.close()
                     print(f"[SSH调试] 命令执行异常: {str(exec_error)}")
                     raise
+                finally:
+                    ssh_pool.release(ssh)
                     
             except paramiko.AuthenticationException as e:
                 error_msg = f"SSH认证失败：用户名({ssh_user})或密码错误，请检查config.py中的SSH_USER和SSH_PASSWORD配置"
@@ -138,7 +109,6 @@ class BaseAPI:
     def check_io(item_id, io_index_map, ros_topic, ros_timeout, io_timeout, ssh_host=None, ssh_user=None, ssh_password=None):
         """检查IO状态的默认实现（支持SSH远程执行）"""
         import config
-        import re
         
         if item_id not in io_index_map:
             return {"status": "error", "message": "未知的测试项"}
@@ -151,70 +121,26 @@ class BaseAPI:
             ssh_password = ssh_password or config.SSH_PASSWORD
             
             try:
-                import paramiko
-                
-                # 创建SSH客户端
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                # 从常驻订阅的缓存中读取最新IO状态（首次调用时启动订阅并等待第一帧数据）
+                subscriber = get_io_subscriber(ssh_host, ssh_user, ssh_password, ros_topic)
+                frame = subscriber.latest(max_age=config.IO_SUBSCRIBER_MAX_AGE) or subscriber.wait_next(ros_timeout)
                 
-                # 连接SSH服务器
-                ssh.connect(
-                    hostname=ssh_host,
-                    username=ssh_user,
-                    password=ssh_password,
-                    timeout=config.SSH_TIMEOUT,
-                    look_for_keys=False,
-                    allow_agent=False
-                )
-                
-                # 执行rostopic命令
-                command = f"timeout {ros_timeout} rostopic echo -n 1 {ros_topic}"
-                stdin, stdout, stderr = ssh.exec_command(command, timeout=ros_timeout + 5)
-                exit_status = stdout.channel.recv_exit_status()
+                if frame is None:
+                    error_msg = subscriber.last_error or f"{ros_timeout}秒内未收到IO数据"
+                    return {"status": "error", "message": f"获取IO数据失败: {error_msg}"}
                 
-                if exit_status == 0:
-                    output = stdout.read().decode('utf-8', errors='ignore')
-                    int_data = None
-                    
-                    # 解析输出，只关心第二个int_data（第一个---分隔符后的）
-                    lines = output.split('\n')
-                    found_first_separator = False
-                    
-                    for line in lines:
-                        # 检测到第一个---分隔符
-                        if line.strip() == '---':
-                            found_first_separator = True
-                            continue
-                        
-                        # 在第一个---分隔符后查找int_data
-                        if found_first_separator and 'int_data:' in line:
-                            match = re.search(r'\[(.*?)\]', line)
-                            if match:
-                                data_str = match.group(1)
-                                int_data = [int(x.strip()) for x in data_str.split(',') if x.strip()]
-                                break
-                    
-                    ssh.close()
-                    
-                    if int_data and len(int_data) > io_index:
-                        io_value = int_data[io_index]
-                        status = "normal" if io_value == 0 else "abnormal"
-                        return {
-                            "status": "success",
-                            "io_value": io_value,
-                            "test_status": status
-                        }
-                    else:
-                        return {"status": "error", "message": "无法解析IO数据"}
+                int_data = frame[1]
+                if int_data and len(int_data) > io_index:
+                    io_value = int_data[io_index]
+                    status = "normal" if io_value == 0 else "abnormal"
+                    return {
+                        "status": "success",
+                        "io_value": io_value,
+                        "test_status": status
+                    }
                 else:
-                    error_msg = stderr.read().decode('utf-8', errors='ignore').strip()
-                    ssh.close()
-                    return {"status": "error", "message": f"获取IO数据失败: {error_msg}"}
+                    return {"status": "error", "message": "无法解析IO数据"}
                     
-            except paramiko.AuthenticationException:
-                return {"status": "error", "message": "SSH认证失败"}
-            except paramiko.SSHException as e:
-                return {"status": "error", "message": f"SSH连接错误: {str(e)}"}
             except Exception as e:
                 return {"status": "error", "message": f"检查错误: {str(e)}"}
         else:
@@ -231,26 +157,8 @@ class BaseAPI:
                 )
                 
                 if result.returncode == 0:
-                    output = result.stdout
-                    int_data = None
-                    
-                    # 解析输出，只关心第二个int_data（第一个---分隔符后的）
-                    lines = output.split('\n')
-                    found_first_separator = False
-                    
-                    for line in lines:
-                        # 检测到第一个---分隔符
-                        if line.strip() == '---':
-                            found_first_separator = True
-                            continue
-                        
-                        # 在第一个---分隔符后查找int_data
-                        if found_first_separator and 'int_data:' in line:
-                            match = re.search(r'\[(.*?)\]', line)
-                            if match:
-                                data_str = match.group(1)
-                                int_data = [int(x.strip()) for x in data_str.split(',') if x.strip()]
-                                break
+                    frames = IntDataStreamParser().feed_all(result.stdout)
+                    int_data = frames[0] if frames else None
                     
                     if int_data and len(int_data) > io_index:
                         io_value = int_data[io_index]
@@ -1,10 +1,13 @@
 # 相机/激光/TOF测试API处理器
 
 from .base_api import BaseAPI
+from .ssh_pool import ssh_pool
+from .channel_reader import ChannelReader
+from . import ping_probe
 import config
+from event_bus import event_bus
 import subprocess
 import re
-import time
 
 class CameraAPI(BaseAPI):
     """相机/激光/TOF测试专用的API处理器"""
@@ -141,13 +144,81 @@ class CameraAPI(BaseAPI):
         if not ip_address:
             return {"status": "error", "message": "未提供IP地址"}
         
-        # 如果提供了SSH主机，通过SSH执行ping
+        # 如果提供了SSH主机，通过SSH执行ping（probe：一次性统计探测；shell：交互式Shell持续ping）
+        if ssh_host and config.PING_TEST_MODE == 'probe':
+            return CameraAPI.ping_probe_via_ssh(ip_address, ssh_host, ssh_user, ssh_password, ssh_connection=ssh_connection)
         if ssh_host:
             return CameraAPI.ping_test_via_ssh(ip_address, ssh_host, ssh_user, ssh_password, timeout=config.PING_TEST_TIMEOUT, use_existing_ssh=use_existing_ssh, ssh_connection=ssh_connection)
         else:
             # 本地执行ping测试
             return CameraAPI.ping_test(ip_address, timeout=config.PING_TEST_TIMEOUT)
     
+    @staticmethod
+    def probe_result(stats):
+        """把ping探测统计结果转换为与ping_test_via_ssh相同格式的测试结果（0%丢包为正常）"""
+        sent, received = stats["sent"], stats["received"]
+        avg_delay = stats["avg"] or 0
+        if sent == 0:
+            test_status = "abnormal"
+            message = f"未获取到有效ping数据，可能目标IP不可达或网络异常: {stats.get('error', '')}"
+        elif stats["loss"] == 0:
+            test_status = "normal"
+            message = f"连接正常，丢包率: {stats['loss']:.1f}%，平均延迟: {avg_delay:.2f} ms，抖动: {stats['jitter'] or 0:.2f} ms"
+        else:
+            test_status = "abnormal"
+            message = f"有丢包，丢包率: {stats['loss']:.1f}%，平均延迟: {avg_delay:.2f} ms"
+        return {
+            "status": "success",
+            "test_status": test_status,
+            "packet_loss_rate": 100 if sent == 0 else stats["loss"],
+            "sent": sent,
+            "received": received,
+            "lost": sent - received,
+            "avg_delay": avg_delay,
+            "min_delay": stats["min"],
+            "max_delay": stats["max"],
+            "jitter": stats["jitter"],
+            "message": message
+        }
+    
+    @staticmethod
+    def ping_probe_via_ssh(ip_addresses, ssh_host, ssh_user=None, ssh_password=None, ssh_connection=None):
+        """通过一次exec_command在远程设备上并行ping一个或多个IP（ping -c N -i 0.2 -q），返回统计结果
+        
+        Args:
+            ip_addresses: 目标IP，或IP列表（列表时返回 {IP: 测试结果}）
+            ssh_connection: 可选的SSH连接对象（如果提供，直接使用，不归还连接池）
+        """
+        import paramiko
+        
+        single = isinstance(ip_addresses, str)
+        targets = [ip_addresses] if single else list(ip_addresses)
+        ssh_user = ssh_user or config.SSH_USER
+        ssh_password = ssh_password or config.SSH_PASSWORD
+        
+        try:
+            print(f"[相机测试] 📤 ping探测 {', '.join(targets)}（{config.PING_PROBE_COUNT}次，间隔{config.PING_PROBE_INTERVAL}秒）")
+            if ssh_connection:
+                stats = ping_probe.probe(ssh_connection, targets)
+            else:
+                with ssh_pool.connection(ssh_host, ssh_user, ssh_password) as ssh:
+                    stats = ping_probe.probe(ssh, targets)
+        except ValueError as e:
+            return {"status": "error", "message": f"IP地址格式不正确: {str(e)}"}
+        except paramiko.AuthenticationException:
+            return {"status": "error", "message": "SSH认证失败"}
+        except paramiko.SSHException as e:
+            return {"status": "error", "message": f"SSH连接错误: {str(e)}"}
+        except Exception as e:
+            return {"status": "error", "message": f"Ping测试失败: {str(e)}"}
+        
+        results = {}
+        for ip, ip_stats in stats.items():
+            print(f"[相机测试] 📊 {ip}: {ip_stats}")
+            results[ip] = CameraAPI.probe_result(ip_stats)
+            event_bus.publish("ping", {"ip": ip, "summary": ip_stats}, host=ssh_host)
+        return results[targets[0]] if single else results
+    
     @staticmethod
     def ping_test_via_ssh(ip_address, ssh_host, ssh_user=None, ssh_password=None, timeout=10, use_existing_ssh=False, ssh_connection=None):
         """通过SSH在远程设备上执行ping测试（使用交互式Shell实时读取输出）
@@ -158,8 +229,8 @@ class CameraAPI(BaseAPI):
             ssh_user: SSH用户名
             ssh_password: SSH密码
             timeout: ping测试持续时间（秒）
-            use_existing_ssh: 是否使用已存在的SSH连接
-            ssh_connection: 可选的SSH连接对象（如果提供，直接使用）
+            use_existing_ssh: 保留兼容性（SSH连接统一由连接池复用）
+            ssh_connection: 可选的SSH连接对象（如果提供，直接使用，不归还连接池）
         """
         import paramiko
         
@@ -168,51 +239,18 @@ class CameraAPI(BaseAPI):
         
         ssh = None
         channel = None
-        should_close_ssh = False  # 标记是否需要关闭SSH连接
+        pooled = False  # 标记连接是否从连接池借出（借出的连接需要归还）
         
         try:
-            # 1. 获取SSH连接（使用已存在的或新建）
+            # 1. 获取SSH连接（优先使用提供的连接，否则从连接池获取）
             if ssh_connection:
                 # 如果直接提供了SSH连接对象，使用它
                 ssh = ssh_connection
                 print(f"[相机测试] ✅ 使用提供的SSH连接: {ssh_host}，开始对 {ip_address} 执行ping测试（持续{timeout}秒）...")
-            elif use_existing_ssh:
-                # 尝试从连接池获取（通过全局变量访问）
-                try:
-                    # 延迟导入app模块，避免循环导入
-                    import sys
-                    app_module = sys.modules.get('app')
-                    if app_module and hasattr(app_module, 'camera_ssh_connections'):
-                        camera_ssh_connections = app_module.camera_ssh_connections
-                        if ssh_host in camera_ssh_connections:
-                            ssh_info = camera_ssh_connections[ssh_host]
-                            ssh = ssh_info['ssh']
-                            print(f"[相机测试] ✅ 使用已存在的SSH连接: {ssh_host}，开始对 {ip_address} 执行ping测试（持续{timeout}秒）...")
-                        else:
-                            print(f"[相机测试] ⚠️ 未找到已存在的SSH连接: {ssh_host}，将新建连接")
-                            use_existing_ssh = False
-                    else:
-                        print(f"[相机测试] ⚠️ 连接池不可用，将新建连接")
-                        use_existing_ssh = False
-                except Exception as e:
-                    print(f"[相机测试] ⚠️ 获取已存在SSH连接失败: {str(e)}，将新建连接")
-                    use_existing_ssh = False
-            
-            # 如果还没有SSH连接，建立新的连接
-            if ssh is None:
-                # 建立新的SSH连接
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                ssh.connect(
-                    hostname=ssh_host,
-                    username=ssh_user,
-                    password=ssh_password,
-                    timeout=config.SSH_TIMEOUT,
-                    look_for_keys=False,
-                    allow_agent=False
-                )
-                should_close_ssh = True  # 标记需要关闭
-                print(f"[相机测试] ✅ 成功SSH连接到 {ssh_host}，开始对 {ip_address} 执行ping测试（持续{timeout}秒）...")
+            else:
+                ssh = ssh_pool.acquire(ssh_host, ssh_user, ssh_password)
+                pooled = True
+                print(f"[相机测试] ✅ 已获取 {ssh_host} 的SSH连接，开始对 {ip_address} 执行ping测试（持续{timeout}秒）...")
             
             # 2. 创建交互式Shell通道（支持持续输出）
             channel = ssh.invoke_shell()
@@ -221,51 +259,55 @@ class CameraAPI(BaseAPI):
             
             # 3. 发送ping命令（Linux系统，持续ping直到手动停止）
             # -i 1 每秒ping一次，不指定-c（持续ping），后续通过时间控制停止
+            reader = ChannelReader(channel)
             ping_cmd = f"ping {ip_address} -i 1\n"
             channel.send(ping_cmd)
-            time.sleep(1)  # 等待ping命令启动
             
-            # 4. 实时读取ping输出并解析
-            start_time = time.time()
+            # 4. 实时读取ping输出并解析（数据到达即处理，无需等待ping启动或定时轮询）
             ping_stats = {
                 "packet_sent": 0,      # 发送包数
                 "packet_received": 0,  # 接收包数
                 "packet_loss": 0.0,    # 丢包率
                 "avg_delay": 0.0       # 平均延迟(ms)
             }
-            all_output = ""  # 存储所有输出用于调试
             
             print(f"[相机测试] 📤 ping {ip_address} 实时输出：")
             print("-" * 80)
             
-            while time.time() - start_time < timeout:
-                if channel.recv_ready():
-                    output = channel.recv(4096).decode('utf-8', errors='ignore')
-                    if output:
-                        all_output += output
-                        print(output.strip())  # 打印原始ping输出
-                        
-                        # 解析单条ping结果（匹配"time=xx.xx ms"或"time=xx ms"）
-                        delay_match = re.search(r'time=(\d+\.?\d*)\s*ms', output)
-                        if delay_match:
-                            ping_stats["packet_sent"] += 1
-                            ping_stats["packet_received"] += 1
-                            delay = float(delay_match.group(1))
-                            # 计算平均延迟
-                            if ping_stats["packet_received"] == 1:
-                                ping_stats["avg_delay"] = delay
-                            else:
-                                ping_stats["avg_delay"] = (ping_stats["avg_delay"] * (ping_stats["packet_received"] - 1) + delay) / ping_stats["packet_received"]
-                        
-                        # 解析丢包（匹配"Request timeout"或超时信息）
-                        if "Request timeout" in output or "100% packet loss" in output or "no answer" in output.lower():
-                            ping_stats["packet_sent"] += 1
+            def on_line(line):
+                if line.strip():
+                    print(line.strip())  # 打印原始ping输出
                 
-                time.sleep(0.1)  # 每隔0.1秒读取一次
+                # 解析单条ping结果（匹配"time=xx.xx ms"或"time=xx ms"）
+                delay_match = re.search(r'time=(\d+\.?\d*)\s*ms', line)
+                if delay_match:
+                    ping_stats["packet_sent"] += 1
+                    ping_stats["packet_received"] += 1
+                    delay = float(delay_match.group(1))
+                    seq_match = re.search(r'icmp_seq=(\d+)', line)
+                    event_bus.publish("ping", {
+                        "ip": ip_address,
+                        "seq": int(seq_match.group(1)) if seq_match else ping_stats["packet_sent"],
+                        "delay": delay,
+                        "received": True
+                    }, host=ssh_host)
+                    # 计算平均延迟
+                    if ping_stats["packet_received"] == 1:
+                        ping_stats["avg_delay"] = delay
+                    else:
+                        ping_stats["avg_delay"] = (ping_stats["avg_delay"] * (ping_stats["packet_received"] - 1) + delay) / ping_stats["packet_received"]
+                
+                # 解析丢包（匹配"Request timeout"或超时信息）
+                if "Request timeout" in line or "100% packet loss" in line or "no answer" in line.lower():
+                    ping_stats["packet_sent"] += 1
+                    event_bus.publish("ping", {"ip": ip_address, "seq": ping_stats["packet_sent"], "received": False}, host=ssh_host)
+                return False  # ping测试持续timeout秒，不提前结束
+            
+            reader.read_lines_until(on_line, timeout)
+            all_output = reader.output  # 存储所有输出用于调试
             
-            # 5. 停止ping命令（发送Ctrl+C）
-            channel.send("\x03")  # 发送中断信号
-            time.sleep(1)
+            # 5. 停止ping命令（发送Ctrl+C，随后直接关闭通道）
+            reader.interrupt()
             
             # 6. 计算丢包率并输出汇总
             print("-" * 80)
@@ -342,15 +384,9 @@ class CameraAPI(BaseAPI):
                 except:
                     pass
             
-            # 只有在新建连接时才关闭SSH（使用已存在连接时不关闭）
-            if should_close_ssh and ssh:
-                try:
-                    ssh.close()
-                    print(f"[相机测试] 🔌 SSH连接已关闭")
-                except:
-                    pass
-            elif use_existing_ssh:
-                print(f"[相机测试] ✅ 保持SSH连接打开（供后续使用）")
+            # 从连接池借出的连接归还连接池（保持打开，供后续使用）
+            if pooled and ssh:
+                ssh_pool.release(ssh)
     
     @staticmethod
     def check_tof_subscribe(item_id, ssh_host=None, ssh_user=None, ssh_password=None, vehicle_model=None, test_id=None, use_existing_ssh=False, ssh_connection=None):
@@ -363,11 +399,10 @@ class CameraAPI(BaseAPI):
             ssh_password: SSH密码
             vehicle_model: 车型（未使用，保留兼容性）
             test_id: 测试ID（未使用，保留兼容性）
-            use_existing_ssh: 是否使用已存在的SSH连接
-            ssh_connection: 可选的SSH连接对象（如果提供，直接使用）
+            use_existing_ssh: 保留兼容性（SSH连接统一由连接池复用）
+            ssh_connection: 可选的SSH连接对象（如果提供，直接使用，不归还连接池）
         """
         import paramiko
-        import time
         
         # 根据item_id确定订阅话题
         if item_id == 'front_tof':
@@ -389,47 +424,17 @@ class CameraAPI(BaseAPI):
         
         ssh = None
         channel = None
-        should_close_ssh = False
+        pooled = False
         
         try:
-            # 1. 获取SSH连接（使用已存在的或新建）
+            # 1. 获取SSH连接（优先使用提供的连接，否则从连接池获取）
             if ssh_connection:
                 ssh = ssh_connection
                 print(f"[TOF测试] ✅ 使用提供的SSH连接: {ssh_host}，开始订阅 {tof_name} 话题...")
-            elif use_existing_ssh:
-                try:
-                    import sys
-                    app_module = sys.modules.get('app')
-                    if app_module and hasattr(app_module, 'camera_ssh_connections'):
-                        camera_ssh_connections = app_module.camera_ssh_connections
-                        if ssh_host in camera_ssh_connections:
-                            ssh_info = camera_ssh_connections[ssh_host]
-                            ssh = ssh_info['ssh']
-                            print(f"[TOF测试] ✅ 使用已存在的SSH连接: {ssh_host}，开始订阅 {tof_name} 话题...")
-                        else:
-                            print(f"[TOF测试] ⚠️ 未找到已存在的SSH连接: {ssh_host}，将新建连接")
-                            use_existing_ssh = False
-                    else:
-                        print(f"[TOF测试] ⚠️ 连接池不可用，将新建连接")
-                        use_existing_ssh = False
-                except Exception as e:
-                    print(f"[TOF测试] ⚠️ 获取已存在SSH连接失败: {str(e)}，将新建连接")
-                    use_existing_ssh = False
-            
-            # 如果还没有SSH连接，建立新的连接
-            if ssh is None:
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                ssh.connect(
-                    hostname=ssh_host,
-                    username=ssh_user,
-                    password=ssh_password,
-                    timeout=config.SSH_TIMEOUT,
-                    look_for_keys=False,
-                    allow_agent=False
-                )
-                should_close_ssh = True
-                print(f"[TOF测试] ✅ 成功SSH连接到 {ssh_host}，开始订阅 {tof_name} 话题...")
+            else:
+                ssh = ssh_pool.acquire(ssh_host, ssh_user, ssh_password)
+                pooled = True
+                print(f"[TOF测试] ✅ 已获取 {ssh_host} 的SSH连接，开始订阅 {tof_name} 话题...")
             
             # 2. 创建交互式Shell通道
             channel = ssh.invoke_shell()
@@ -438,70 +443,40 @@ class CameraAPI(BaseAPI):
             channel.set_combine_stderr(True)
             
             # 3. 发送rostopic echo指令（订阅话题）
+            reader = ChannelReader(channel, log_prefix=f"[TOF测试] [{tof_name}]")
             rostopic_cmd = f"rostopic echo {topic}\n"
             channel.send(rostopic_cmd)
-            time.sleep(1)  # 等待指令执行和话题数据返回
             
-            # 4. 实时读取输出，每5秒检查一次是否有数据
-            start_time = time.time()
-            has_data = False  # 标记是否收到数据
-            all_output = ""  # 存储所有原始输出用于调试
-            last_check_time = start_time  # 上次检查的时间
-            check_interval = 5  # 每5秒检查一次
-            
-            print(f"[TOF测试] 开始接收 {tof_name} 话题数据（超时时间{timeout}秒，每{check_interval}秒检查一次）：")
+            # 4. 实时读取输出，收到第一行有效数据立即返回
+            print(f"[TOF测试] 开始接收 {tof_name} 话题数据（超时时间{timeout}秒，收到数据立即返回）：")
             print("-" * 60)
             
-            # 持续读取数据，每5秒检查一次是否有数据
-            while time.time() - start_time < timeout:
-                if channel.recv_ready():
-                    output = channel.recv(4096).decode('utf-8', errors='ignore')
-                    if output:
-                        all_output += output
-                        # 打印所有原始输出（完整数据）
-                        print(f"[TOF测试] [{tof_name}] 原始输出:\n{output}")
-                        print("-" * 60)
-                
-                # 每5秒检查一次是否有有效数据
-                current_time = time.time()
-                if current_time - last_check_time >= check_interval:
-                    last_check_time = current_time
-                    
-                    # 检查是否有有效数据（排除提示符、命令回显等）
-                    if all_output:
-                        # 查找有效数据（排除提示符、命令回显、空行等）
-                        lines = all_output.split('\n')
-                        for line in lines:
-                            line_clean = line.strip()
-                            # 如果输出包含非空内容（排除提示符、命令回显、空行等）
-                            if line_clean and not line_clean.startswith('[') and 'echo' not in line_clean.lower():
-                                # 检查是否包含实际数据（不是提示符或命令回显）
-                                if len(line_clean) > 10:  # 至少10个字符，可能是有效数据
-                                    has_data = True
-                                    print(f"[TOF测试] [{tof_name}] 检测到有效数据（长度: {len(line_clean)} 字符），立即返回结果")
-                                    # 检测到数据，立即停止订阅并返回
-                                    try:
-                                        channel.send(b'\x03')  # Ctrl+C
-                                        time.sleep(0.1)
-                                        print(f"[TOF测试] 已发送Ctrl+C停止 {tof_name} 话题订阅")
-                                    except:
-                                        pass
-                                    break
-                    
-                    # 如果检测到数据，跳出循环
-                    if has_data:
-                        break
-                
-                time.sleep(0.5)  # 每隔0.5秒读取一次
+            command_echoed = []  # 是否已看到命令回显（之前的登录欢迎信息等不算数据）
             
-            # 5. 如果还没有停止，停止rostopic订阅（发送Ctrl+C）
-            if not has_data:
-                try:
-                    channel.send(b'\x03')  # Ctrl+C
-                    time.sleep(0.1)
-                    print(f"[TOF测试] 已发送Ctrl+C停止 {tof_name} 话题订阅")
-                except:
-                    pass
+            def is_data_line(line):
+                line_clean = line.strip()
+                if not command_echoed:
+                    if rostopic_cmd.strip() in line_clean:
+                        command_echoed.append(True)
+                    return False
+                # 排除提示符、命令回显、空行以及rostopic的WARNING/ERROR提示
+                if not line_clean or line_clean.startswith('[') or 'echo' in line_clean.lower():
+                    return False
+                if line_clean.startswith(('WARNING', 'ERROR')):
+                    return False
+                # 至少10个字符，可能是有效数据
+                if len(line_clean) > 10:
+                    print(f"[TOF测试] [{tof_name}] 检测到有效数据（长度: {len(line_clean)} 字符），立即返回结果")
+                    event_bus.publish("tof", {"item_id": item_id, "topic": topic, "length": len(line_clean)}, host=ssh_host)
+                    return True
+                return False
+            
+            has_data = bool(reader.read_lines_until(is_data_line, timeout))
+            all_output = reader.output  # 原始输出用于调试
+            
+            # 5. 停止rostopic订阅（发送Ctrl+C）
+            reader.interrupt()
+            print(f"[TOF测试] 已发送Ctrl+C停止 {tof_name} 话题订阅")
             
             # 6. 判断结果
             print("-" * 60)
@@ -549,12 +524,83 @@ class CameraAPI(BaseAPI):
                 except:
                     pass
             
-            # 只有在新建连接时才关闭SSH（使用已存在连接时不关闭）
-            if should_close_ssh and ssh:
+            # 从连接池借出的连接归还连接池（保持打开，供后续使用）
+            if pooled and ssh:
+                ssh_pool.release(ssh)
+    
+    @staticmethod
+    def check_all_devices(ssh_host, devices, ip_map=None, ssh_user=None, ssh_password=None, vehicle_model=None):
+        """同时检测所有相机/激光/TOF设备（每个设备从连接池借出一个通道并发执行）
+        
+        Args:
+            ssh_host: SSH主机地址
+            devices: 设备ID列表（如 ['upper_camera', 'front_tof', ...]）
+            ip_map: {设备ID: IP地址}，ping测试的目标IP（TOF不需要）
+        
+        总耗时约等于最慢的一个设备（TOF收到数据立即返回）；PING_TEST_MODE为probe时所有ping设备合并为一次探测
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        import time
+        
+        if not ssh_host:
+            return {"status": "error", "message": "未提供SSH主机地址"}
+        if not devices:
+            return {"status": "error", "message": "未提供需要检测的设备"}
+        
+        ssh_user = ssh_user or config.SSH_USER
+        ssh_password = ssh_password or config.SSH_PASSWORD
+        ip_map = ip_map or {}
+        start_time = time.time()
+        
+        def check_device(device_id):
+            # 不传ssh_connection，每个通道单独从连接池借出，按 SSH_POOL_MAX_CHANNELS_PER_CONNECTION 计数
+            if device_id in ('front_tof', 'rear_tof'):
+                return CameraAPI.check_tof_subscribe(device_id, ssh_host, ssh_user, ssh_password, vehicle_model, 'camera')
+            ip_address = ip_map.get(device_id)
+            if not ip_address:
+                return {"status": "error", "message": "未提供IP地址"}
+            return CameraAPI.ping_test_via_ssh(ip_address, ssh_host, ssh_user, ssh_password, timeout=config.PING_TEST_TIMEOUT)
+        
+        # probe模式下所有需要ping的设备合并为一次探测命令
+        probe_devices = []
+        if config.PING_TEST_MODE == 'probe':
+            probe_devices = [device_id for device_id in devices
+                             if device_id not in ('front_tof', 'rear_tof') and ip_map.get(device_id)]
+        
+        print(f"[相机测试] 🚀 同时检测 {ssh_host} 的 {len(devices)} 个设备: {devices}")
+        try:
+            # 先建立连接（连接失败时直接返回，不再逐个设备报错）
+            ssh_pool.warm_up(ssh_host, ssh_user, ssh_password)
+        except Exception as e:
+            print(f"[相机测试] ❌ 获取SSH连接失败: {e}")
+            return {"status": "error", "message": f"SSH连接失败: {str(e)}"}
+        
+        with ThreadPoolExecutor(max_workers=len(devices), thread_name_prefix="camera") as executor:
+            futures = {device_id: executor.submit(check_device, device_id)
+                       for device_id in devices if device_id not in probe_devices}
+            if probe_devices:
+                probe_ips = sorted({ip_map[device_id] for device_id in probe_devices})
+                probe_future = executor.submit(CameraAPI.ping_probe_via_ssh, probe_ips, ssh_host, ssh_user, ssh_password)
+            results = {}
+            for device_id in devices:
                 try:
-                    ssh.close()
-                    print(f"[TOF测试] 🔌 SSH连接已关闭")
-                except:
-                    pass
-            elif use_existing_ssh:
-                print(f"[TOF测试] ✅ 保持SSH连接打开（供后续使用）")
+                    if device_id in probe_devices:
+                        probe_results = probe_future.result()
+                        results[device_id] = probe_results[ip_map[device_id]] if probe_results.get('status') != 'error' else probe_results
+                    else:
+                        results[device_id] = futures[device_id].result()
+                except Exception as e:
+                    results[device_id] = {"status": "error", "message": f"检测失败: {str(e)}"}
+        
+        elapsed = time.time() - start_time
+        abnormal = [device_id for device_id, result in results.items()
+                    if result.get('status') != 'success' or result.get('test_status') != 'normal']
+        print(f"[相机测试] 📊 {len(devices)} 个设备检测完成，耗时 {elapsed:.2f} 秒，异常设备: {abnormal or '无'}")
+        return {
+            "status": "success",
+            "test_status": "abnormal" if abnormal else "normal",
+            "results": results,
+            "abnormal_devices": abnormal,
+            "elapsed": round(elapsed, 3),
+            "message": f"{len(devices) - len(abnormal)}/{len(devices)} 个设备正常" + (f"，异常: {', '.join(abnormal)}" if abnormal else "")
+        }
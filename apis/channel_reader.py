@@ -0,0 +1,84 @@
+# SSH通道的事件驱动读取
+# 用select等待通道可读，数据一到立即处理并检查判断条件，条件满足马上返回
+# 替代 "while: if recv_ready(): ...; time.sleep(0.5)" 式的轮询读取
+
+import codecs
+import select
+import time
+
+# 命令结束标记：在命令末尾追加 SHELL_DONE_COMMAND，读到单独一行 SHELL_DONE_MARKER 即表示命令已执行完
+# $((40+2)) 在交互式Shell的命令回显中不会被展开，因此回显不会误判为结束
+SHELL_DONE_COMMAND = "echo __RT_DONE_$((40+2))__"
+SHELL_DONE_MARKER = "__RT_DONE_42__"
+
+
+class ChannelReader:
+    """paramiko交互式Shell通道的读取器
+
+    用法：
+        reader = ChannelReader(channel)
+        channel.send("rostopic echo /topic\\n")
+        found = reader.read_lines_until(lambda line: 'data' in line, timeout=30)
+
+    - predicate返回真值时立即返回该值；超时或通道关闭返回None
+    - reader.output 保存收到的全部输出（最多max_output个字符），用于调试和返回原始输出
+    """
+
+    def __init__(self, channel, max_output=256 * 1024, log_prefix=None):
+        self.channel = channel
+        self.max_output = max_output
+        self.log_prefix = log_prefix  # 设置后打印每块原始输出，如 "[车辆ID检测]"
+        self.output = ""
+        self.closed = False  # 通道已关闭（收到EOF）
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._pending_line = ""
+
+    def _recv(self, timeout):
+        """等待通道可读（最多timeout秒），返回解码后的文本；超时返回''，通道关闭返回None"""
+        readable, _, _ = select.select([self.channel], [], [], max(0, timeout))
+        if not readable:
+            return ""
+        data = self.channel.recv(4096)
+        if not data:
+            self.closed = True
+            return None
+        text = self._decoder.decode(data)
+        if len(self.output) < self.max_output:
+            self.output += text[:self.max_output - len(self.output)]
+        if self.log_prefix and text.strip():
+            print(f"{self.log_prefix} 接收到数据: {text.strip()}")
+        return text
+
+    def read_until(self, predicate, timeout):
+        """读取输出，每收到一块数据调用predicate(text)，返回第一个真值；超时或通道关闭返回None"""
+        deadline = time.time() + timeout
+        while not self.closed:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            text = self._recv(remaining)
+            if text:
+                result = predicate(text)
+                if result:
+                    return result
+        return None
+
+    def read_lines_until(self, predicate, timeout):
+        """按完整行读取输出，每行（已去掉\\r\\n）调用predicate(line)，返回第一个真值"""
+        def on_text(text):
+            lines = (self._pending_line + text).split('\n')
+            self._pending_line = lines.pop()  # 最后一行可能不完整，留到下次
+            for line in lines:
+                result = predicate(line.rstrip('\r'))
+                if result:
+                    return result
+            return None
+
+        return self.read_until(on_text, timeout)
+
+    def interrupt(self):
+        """发送Ctrl+C停止前台命令（rostopic echo、ping等）"""
+        try:
+            self.channel.send(b'\x03')
+        except Exception:
+            pass
@@ -0,0 +1,91 @@
+# rostopic echo 输出的 int_data 增量解析器
+# 按块（bytes或str）喂入SSH通道读到的数据，每个完整的 int_data 数组只解析一次
+# 只保留最后一个未完成的片段，内存占用有上限，解析耗时与数据量成线性关系
+
+import codecs
+
+
+class IntDataStreamParser:
+    """int_data 流式解析器
+
+    用法：
+        parser = IntDataStreamParser()
+        for int_data in parser.feed(channel.recv(4096)):
+            ...
+
+    - 数组可以跨多次recv（甚至跨多行）被截断，拼接完整后才会输出
+    - UTF-8多字节字符被截断时使用增量解码器，不会丢失字符
+    - 空数组（int_data: []）不输出
+    """
+
+    KEY = 'int_data:'
+
+    def __init__(self, max_buffer=65536):
+        self.max_buffer = max_buffer  # 未完成片段的最大长度，超过时丢弃（避免异常输出撑爆内存）
+        self.frames_parsed = 0  # 累计解析出的帧数
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._buffer = ''
+
+    def reset(self):
+        """清空未完成的片段（例如重新订阅时）"""
+        self._decoder.reset()
+        self._buffer = ''
+
+    @staticmethod
+    def _parse_values(text):
+        """解析数组内容 '0, 1, 1' -> [0, 1, 1]，内容不合法时返回None"""
+        if not text.strip():
+            return []
+        try:
+            # int()会忽略数字两侧的空格和换行
+            return [int(part) for part in text.split(',')]
+        except ValueError:
+            return None
+
+    def feed(self, data):
+        """喂入一块数据，返回本次新解析出的完整 int_data 列表（按出现顺序）"""
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        if not data:
+            return []
+
+        text = self._buffer + data
+        key_len = len(self.KEY)
+        frames = []
+        pos = 0
+        while True:
+            key = text.find(self.KEY, pos)
+            if key < 0:
+                # 末尾可能是被截断的 "int_d"，保留 len(KEY)-1 个字符
+                keep_from = max(pos, len(text) - key_len + 1)
+                break
+            start = text.find('[', key + key_len)
+            if start < 0:
+                keep_from = key
+                break
+            if text[key + key_len:start].strip():
+                # int_data: 后面不是数组，跳过
+                pos = key + key_len
+                continue
+            end = text.find(']', start + 1)
+            if end < 0:
+                keep_from = key
+                break
+            values = self._parse_values(text[start + 1:end])
+            if values:
+                frames.append(values)
+            pos = end + 1
+
+        self._buffer = text[keep_from:]
+        if len(self._buffer) > self.max_buffer:
+            # 未闭合的数组过长，视为异常输出，丢弃
+            self._buffer = self._buffer[-(key_len - 1):]
+        self.frames_parsed += len(frames)
+        return frames
+
+    def feed_all(self, data):
+        """一次性解析完整输出（例如 rostopic echo -n 1 的结果）"""
+        frames = self.feed(data)
+        if isinstance(data, bytes):
+            frames += self.feed(self._decoder.decode(b'', final=True))
+        return frames
@@ -0,0 +1,218 @@
+# ROS IO话题常驻订阅
+# 每台车辆只订阅一次 /Dev_input_output，后台线程用IntDataStreamParser增量解析int_data并缓存最近的IO状态
+# check_io 直接从缓存读取或等待期望的IO值出现，无需每个测试项都重新启动rostopic
+
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+
+import config
+from event_bus import event_bus
+from .int_data_parser import IntDataStreamParser
+from .ssh_pool import ssh_pool
+
+
+class IOTopicSubscriber:
+    """单台车辆的IO话题订阅：后台线程持续接收数据，保存带时间戳的int_data环形缓冲区"""
+
+    def __init__(self, ssh_host, ssh_user=None, ssh_password=None, topic=None, buffer_size=None):
+        self.ssh_host = ssh_host
+        self.ssh_user = ssh_user or config.SSH_USER
+        self.ssh_password = ssh_password or config.SSH_PASSWORD
+        self.topic = topic or config.ROS_TOPIC
+        self.frames = deque(maxlen=buffer_size or config.IO_SUBSCRIBER_BUFFER_SIZE)  # [(时间戳, int_data元组)]
+        self.frame_count = 0  # 累计收到的帧数（用于判断等待期间是否有新帧）
+        self.connected = False
+        self.last_error = None
+        self.last_access = time.time()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def key(self):
+        return (self.ssh_host, self.ssh_user, self.topic)
+
+    def is_running(self):
+        """订阅线程在运行且未在停止中（空闲超时停止后线程仍会短暂存活，关闭通道、归还连接）"""
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"io-subscriber-{self.ssh_host}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _touch(self):
+        self.last_access = time.time()
+
+    def _stop_if_idle(self, idle_timeout):
+        """空闲超时时标记停止（与 get_io_subscriber 的复用检查互斥，不会停掉刚被取用的订阅），返回是否已停止"""
+        with _subscribers_lock:
+            if time.time() - self.last_access <= idle_timeout:
+                return False
+            self._stop_event.set()
+            return True
+
+    def _add_frame(self, int_data):
+        """保存一帧int_data并唤醒等待的check_io，IO值有变化时推送事件"""
+        int_data = tuple(int_data)
+        with self._cond:
+            previous = self.frames[-1][1] if self.frames else None
+            self.frames.append((time.time(), int_data))
+            self.frame_count += 1
+            self._cond.notify_all()
+
+        if int_data != previous:
+            # 推送变化的IO索引：[[索引, 旧值, 新值], ...]（首帧或长度变化时changes为空，前端以int_data为准）
+            changes = []
+            if previous is not None and len(previous) == len(int_data):
+                changes = [[i, old, new] for i, (old, new) in enumerate(zip(previous, int_data)) if old != new]
+            event_bus.publish("io", {"topic": self.topic, "int_data": list(int_data), "changes": changes}, host=self.ssh_host)
+
+    def _run(self):
+        backoff = 1
+        idle_timeout = config.IO_SUBSCRIBER_IDLE_TIMEOUT
+        while not self._stop_event.is_set():
+            ssh = None
+            channel = None
+            try:
+                ssh = ssh_pool.acquire(self.ssh_host, self.ssh_user, self.ssh_password)
+                # 使用交互式Shell（会加载ROS环境变量），与原来的按键测试订阅方式一致
+                channel = ssh.invoke_shell()
+                channel.settimeout(1.0)  # 便于定期检查停止标记
+                channel.set_combine_stderr(True)
+                channel.send(f"rostopic echo {self.topic}\n")
+                self.connected = True
+                self.last_error = None
+                backoff = 1
+                print(f"[IO订阅] ✅ 已开始订阅 {self.ssh_host} 的 {self.topic}")
+
+                parser = IntDataStreamParser()
+                while not self._stop_event.is_set():
+                    if time.time() - self.last_access > idle_timeout and self._stop_if_idle(idle_timeout):
+                        print(f"[IO订阅] {self.ssh_host} 超过{idle_timeout}秒无查询，停止订阅")
+                        break
+                    try:
+                        data = channel.recv(4096)
+                    except socket.timeout:
+                        continue
+                    if not data:
+                        raise EOFError("订阅通道已关闭")
+                    for int_data in parser.feed(data):
+                        self._add_frame(int_data)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[IO订阅] ⚠️ {self.ssh_host} 订阅中断: {e}")
+            finally:
+                self.connected = False
+                if channel:
+                    try:
+                        channel.send(b'\x03')  # Ctrl+C 停止rostopic
+                        channel.close()
+                    except Exception:
+                        pass
+                if ssh:
+                    ssh_pool.release(ssh)
+                with self._cond:
+                    self._cond.notify_all()
+
+            if not self._stop_event.is_set():
+                # 断线重连（指数退避，最长10秒）
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 10)
+
+        _remove_subscriber(self)
+        print(f"[IO订阅] 🔌 {self.ssh_host} 订阅已停止")
+
+    def latest(self, max_age=None):
+        """返回最近一帧 (时间戳, int_data列表)；max_age秒内没有数据时返回None"""
+        self._touch()
+        with self._cond:
+            if not self.frames:
+                return None
+            ts, int_data = self.frames[-1]
+        if max_age is not None and time.time() - ts > max_age:
+            return None
+        return ts, list(int_data)
+
+    def wait_for(self, predicate, timeout, max_age=None):
+        """等待满足predicate(int_data)的帧
+
+        先检查缓存中的最新一帧（max_age秒内有效），然后逐帧检查新收到的数据，
+        满足条件立即返回 (时间戳, int_data列表)；超时返回None
+        """
+        self._touch()
+        deadline = time.time() + timeout
+        with self._cond:
+            if self.frames:
+                ts, int_data = self.frames[-1]
+                if (max_age is None or time.time() - ts <= max_age) and predicate(int_data):
+                    return ts, list(int_data)
+            seen = self.frame_count
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._stop_event.is_set():
+                    return None
+                self._cond.wait(remaining)
+                new_count = min(self.frame_count - seen, len(self.frames))
+                if new_count > 0:
+                    # 检查等待期间收到的每一帧，避免短暂的按下被后续帧覆盖
+                    start = len(self.frames) - new_count
+                    for ts, int_data in itertools.islice(self.frames, start, None):
+                        if predicate(int_data):
+                            return ts, list(int_data)
+                seen = self.frame_count
+
+    def wait_next(self, timeout):
+        """等待下一帧数据（不论内容）"""
+        return self.wait_for(lambda int_data: True, timeout, max_age=0)
+
+    def history(self, since=None):
+        """返回缓冲区中的历史帧（since之后），用于调试"""
+        with self._cond:
+            return [(ts, list(int_data)) for ts, int_data in self.frames if since is None or ts >= since]
+
+
+# 订阅注册表：{(ssh_host, ssh_user, topic): IOTopicSubscriber}
+_subscribers = {}
+_subscribers_lock = threading.Lock()
+
+
+def _remove_subscriber(subscriber):
+    with _subscribers_lock:
+        if _subscribers.get(subscriber.key) is subscriber:
+            del _subscribers[subscriber.key]
+
+
+def get_io_subscriber(ssh_host, ssh_user=None, ssh_password=None, topic=None):
+    """获取（必要时创建并启动）指定车辆的IO话题订阅"""
+    subscriber = IOTopicSubscriber(ssh_host, ssh_user, ssh_password, topic)
+    with _subscribers_lock:
+        existing = _subscribers.get(subscriber.key)
+        if existing and existing.is_running():
+            existing._touch()
+            return existing
+        _subscribers[subscriber.key] = subscriber
+    subscriber.start()
+    return subscriber
+
+
+def stop_all_subscribers():
+    """停止所有IO订阅（服务退出时调用）"""
+    with _subscribers_lock:
+        subscribers = list(_subscribers.values())
+    for subscriber in subscribers:
+        subscriber.stop()
@@ -17,7 +17,7 @@ class LightAPI(BaseAPI):
     
     @staticmethod
     def check_io(item_id, ssh_host=None, ssh_user=None, ssh_password=None):
-        """检查灯光IO状态（通过SSH执行rostopic命令）"""
+        """检查灯光IO状态（从IO话题常驻订阅中读取）"""
         import config
         return BaseAPI.check_io(
             item_id,
@@ -0,0 +1,69 @@
+# 远程ping探测
+# 在车辆上用一次exec_command执行有限次数的静默ping（ping -c N -i 0.2 -q），多个IP并行探测，
+# 只解析ping最后的统计行，得到丢包率、最小/平均/最大延迟和抖动（mdev）
+# 替代在交互式Shell中持续ping、逐行正则匹配time=、再发送Ctrl+C停止的方式
+
+import ipaddress
+import re
+
+import config
+
+# iputils: "20 packets transmitted, 20 received, 0% packet loss, time 3804ms"
+# busybox: "20 packets transmitted, 20 packets received, 0% packet loss"
+_SUMMARY_PATTERN = re.compile(r'(\d+) packets transmitted, (\d+) (?:packets )?received.*?([\d.]+)% packet loss')
+# iputils: "rtt min/avg/max/mdev = 0.301/0.412/0.533/0.061 ms"
+# busybox: "round-trip min/avg/max = 0.301/0.412/0.533 ms"
+_RTT_PATTERN = re.compile(r'min/avg/max(?:/mdev)? = ([\d.]+)/([\d.]+)/([\d.]+)(?:/([\d.]+))?')
+
+
+def build_probe_command(ip_addresses, count=None, interval=None):
+    """生成并行ping多个IP的Shell命令，每行输出以 "IP|" 开头便于区分"""
+    count = count or config.PING_PROBE_COUNT
+    interval = interval or config.PING_PROBE_INTERVAL
+    deadline = int(count * interval) + 2  # -w 总时长上限，目标不可达时也能按时结束
+    for ip in ip_addresses:
+        ipaddress.ip_address(ip)  # 只接受合法IP，防止拼接出其他命令
+    targets = " ".join(ip_addresses)
+    return (f"for ip in {targets}; do "
+            f"(ping -c {count} -i {interval} -W 1 -w {deadline} -q $ip 2>&1 | sed \"s/^/$ip|/\") & "
+            f"done; wait")
+
+
+def parse_probe_output(output, ip_addresses):
+    """解析探测输出，返回 {IP: 统计结果}；未解析到统计行的IP视为100%丢包"""
+    lines = {ip: [] for ip in ip_addresses}
+    for line in output.splitlines():
+        ip, sep, text = line.partition('|')
+        if sep and ip in lines:
+            lines[ip].append(text)
+
+    stats = {}
+    for ip, ip_lines in lines.items():
+        text = "\n".join(ip_lines)
+        result = {"ip": ip, "sent": 0, "received": 0, "loss": 100.0,
+                  "min": None, "avg": None, "max": None, "jitter": None}
+        summary = _SUMMARY_PATTERN.search(text)
+        if summary:
+            result["sent"] = int(summary.group(1))
+            result["received"] = int(summary.group(2))
+            result["loss"] = float(summary.group(3))
+        rtt = _RTT_PATTERN.search(text)
+        if rtt:
+            result["min"], result["avg"], result["max"] = (float(value) for value in rtt.group(1, 2, 3))
+            if rtt.group(4) is not None:
+                result["jitter"] = float(rtt.group(4))
+        if not summary:
+            result["error"] = text.strip()[:200] or "未获取到ping统计结果"
+        stats[ip] = result
+    return stats
+
+
+def probe(ssh, ip_addresses, count=None, interval=None):
+    """通过已建立的SSH连接执行一次并行探测，返回 {IP: 统计结果}"""
+    count = count or config.PING_PROBE_COUNT
+    interval = interval or config.PING_PROBE_INTERVAL
+    command = build_probe_command(ip_addresses, count, interval)
+    print(f"[Ping探测] 执行: {command}")
+    _, stdout, _ = ssh.exec_command(command, timeout=count * interval + 10)
+    output = stdout.read().decode('utf-8', errors='ignore')
+    return parse_probe_output(output, ip_addresses)
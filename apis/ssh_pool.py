@@ -0,0 +1,298 @@
+# SSH连接池
+# 按 (ssh_host, ssh_user) 复用SSH传输通道，同一条连接上可以同时打开多个通道（exec_command / invoke_shell）
+# 所有API处理器和app.py中的路由都从这里获取SSH连接，避免每次点击都重新握手
+
+import threading
+import time
+from contextlib import contextmanager
+
+import paramiko
+
+import config
+
+
+class SSHPoolTimeout(paramiko.SSHException):
+    """连接池已满，等待可用连接超时"""
+    pass
+
+
+class _PooledConnection:
+    """连接池中的一条SSH连接（一个paramiko.SSHClient及其传输通道）"""
+
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.leases = 0  # 当前借出的次数（即正在使用的通道数）
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+        self.broken = False  # 标记为不可用，归还后关闭
+
+    def is_active(self):
+        transport = self.client.get_transport()
+        return bool(transport and transport.is_active())
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHConnectionPool:
+    """按 (ssh_host, ssh_user) 分组的SSH连接池
+
+    - 同一主机最多保持 max_per_host 条连接，每条连接最多同时借出 max_channels_per_connection 次
+      （优先在已有连接上复用通道，占满后才新建连接）
+    - 借出前做健康检查（传输层是否存活，超过检查间隔时发送SSH_MSG_IGNORE探测）
+    - 后台线程回收空闲超过 idle_timeout 秒的连接
+    """
+
+    def __init__(self, max_per_host=None, max_channels_per_connection=None, idle_timeout=None,
+                 health_check_interval=None, acquire_timeout=None):
+        self.max_per_host = max_per_host or config.SSH_POOL_MAX_PER_HOST
+        self.max_channels_per_connection = max_channels_per_connection or config.SSH_POOL_MAX_CHANNELS_PER_CONNECTION
+        self.idle_timeout = idle_timeout or config.SSH_POOL_IDLE_TIMEOUT
+        self.health_check_interval = health_check_interval or config.SSH_POOL_HEALTH_CHECK_INTERVAL
+        self.acquire_timeout = acquire_timeout or config.SSH_POOL_ACQUIRE_TIMEOUT
+
+        self._connections = {}  # {(ssh_host, ssh_user): [_PooledConnection, ...]}
+        self._pending = {}  # {(ssh_host, ssh_user): 正在建立中的连接数}
+        self._by_client = {}  # {id(client): _PooledConnection}
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+    @staticmethod
+    def _make_key(ssh_host, ssh_user):
+        return (ssh_host, ssh_user or config.SSH_USER)
+
+    def _connect(self, ssh_host, ssh_user, ssh_password):
+        """建立新的SSH连接（在锁外执行，避免阻塞其他主机）"""
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh.connect(
+            hostname=ssh_host,
+            username=ssh_user,
+            password=ssh_password,
+            timeout=config.SSH_TIMEOUT,
+            look_for_keys=False,
+            allow_agent=False
+        )
+        transport = ssh.get_transport()
+        if transport and config.SSH_POOL_KEEPALIVE_INTERVAL:
+            transport.set_keepalive(config.SSH_POOL_KEEPALIVE_INTERVAL)
+        return ssh
+
+    def _is_healthy(self, conn, now):
+        """健康检查：传输层存活，且（超过检查间隔时）能够发送探测包"""
+        if conn.broken or not conn.is_active():
+            return False
+        if now - conn.last_checked >= self.health_check_interval:
+            try:
+                conn.client.get_transport().send_ignore()
+            except Exception:
+                return False
+            conn.last_checked = now
+        return True
+
+    def _discard(self, conn):
+        """从连接池中移除连接（调用方需持有锁）"""
+        conns = self._connections.get(conn.key, [])
+        if conn in conns:
+            conns.remove(conn)
+        if not conns:
+            self._connections.pop(conn.key, None)
+        self._by_client.pop(id(conn.client), None)
+
+    def _finish_pending(self, key):
+        """新建连接结束（成功或失败），减少计数（调用方需持有锁）"""
+        self._pending[key] -= 1
+        if self._pending[key] <= 0:
+            self._pending.pop(key, None)
+
+    def _ensure_reaper(self):
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, name="ssh-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1, min(self.idle_timeout / 2, 30))
+        while True:
+            time.sleep(interval)
+            if self._closed:
+                return
+            self.evict_idle()
+
+    def acquire(self, ssh_host, ssh_user=None, ssh_password=None, timeout=None):
+        """借出一个到 (ssh_host, ssh_user) 的SSHClient，用完必须调用release归还"""
+        ssh_user = ssh_user or config.SSH_USER
+        ssh_password = ssh_password or config.SSH_PASSWORD
+        key = self._make_key(ssh_host, ssh_user)
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        while True:
+            stale = []
+            with self._cond:
+                if self._closed:
+                    raise paramiko.SSHException("SSH连接池已关闭")
+                self._ensure_reaper()
+
+                now = time.time()
+                best = None
+                for conn in list(self._connections.get(key, [])):
+                    if not self._is_healthy(conn, now):
+                        conn.broken = True
+                        if conn.leases == 0:
+                            self._discard(conn)
+                            stale.append(conn)
+                        continue
+                    if conn.leases < self.max_channels_per_connection and (best is None or conn.leases < best.leases):
+                        best = conn
+
+                # 优先在已有连接上复用通道，所有连接的通道都占满时才新建连接
+                total = len(self._connections.get(key, [])) + self._pending.get(key, 0)
+                client = None
+                if best is not None:
+                    best.leases += 1
+                    best.last_used = now
+                    client = best.client
+                elif total < self.max_per_host:
+                    self._pending[key] = self._pending.get(key, 0) + 1
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise SSHPoolTimeout(f"SSH连接池已满（{ssh_host}最多{self.max_per_host}条连接），等待可用连接超时")
+                    self._cond.wait(remaining)
+                    continue
+
+            for conn in stale:
+                print(f"[SSH连接池] 连接不可用，已移除: {conn.key[1]}@{conn.key[0]}")
+                conn.close()
+
+            if client is not None:
+                return client
+
+            # 在锁外建立新连接
+            try:
+                client = self._connect(ssh_host, ssh_user, ssh_password)
+            except Exception:
+                with self._cond:
+                    self._finish_pending(key)
+                    self._cond.notify_all()
+                raise
+
+            with self._cond:
+                self._finish_pending(key)
+                conn = _PooledConnection(key, client)
+                conn.leases = 1
+                self._connections.setdefault(key, []).append(conn)
+                self._by_client[id(client)] = conn
+                count = len(self._connections[key])
+                self._cond.notify_all()
+            print(f"[SSH连接池] 新建连接: {ssh_user}@{ssh_host}（当前{count}条）")
+            return client
+
+    def release(self, client, broken=False):
+        """归还SSHClient；broken=True或连接已断开时直接关闭"""
+        to_close = None
+        with self._cond:
+            conn = self._by_client.get(id(client))
+            if conn is None:
+                # 不是连接池借出的连接，直接关闭
+                to_close = client
+            else:
+                conn.leases = max(0, conn.leases - 1)
+                conn.last_used = time.time()
+                if broken:
+                    conn.broken = True
+                if (conn.broken or not conn.is_active()) and conn.leases == 0:
+                    self._discard(conn)
+                    to_close = conn.client
+            self._cond.notify_all()
+        if to_close is not None:
+            try:
+                to_close.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def connection(self, ssh_host, ssh_user=None, ssh_password=None, timeout=None):
+        """with ssh_pool.connection(host, user, password) as ssh: ..."""
+        client = self.acquire(ssh_host, ssh_user, ssh_password, timeout=timeout)
+        broken = False
+        try:
+            yield client
+        except (paramiko.SSHException, EOFError, OSError):
+            # 通道/传输层异常，交给release根据传输状态判断是否需要关闭
+            transport = client.get_transport()
+            broken = not (transport and transport.is_active())
+            raise
+        finally:
+            self.release(client, broken=broken)
+
+    def warm_up(self, ssh_host, ssh_user=None, ssh_password=None):
+        """预先建立连接（例如进入相机TAB时），建立后立即归还"""
+        client = self.acquire(ssh_host, ssh_user, ssh_password)
+        self.release(client)
+
+    def evict_idle(self):
+        """回收空闲超时的连接"""
+        now = time.time()
+        evicted = []
+        with self._cond:
+            for conns in list(self._connections.values()):
+                for conn in list(conns):
+                    if conn.leases == 0 and (conn.broken or now - conn.last_used >= self.idle_timeout or not conn.is_active()):
+                        self._discard(conn)
+                        evicted.append(conn)
+            if evicted:
+                self._cond.notify_all()
+        for conn in evicted:
+            print(f"[SSH连接池] 回收空闲连接: {conn.key[1]}@{conn.key[0]}")
+            conn.close()
+        return len(evicted)
+
+    def close_host(self, ssh_host, ssh_user=None):
+        """关闭指定主机的所有空闲连接，正在使用的连接在归还后关闭"""
+        key = self._make_key(ssh_host, ssh_user)
+        closed = []
+        with self._cond:
+            for conn in list(self._connections.get(key, [])):
+                conn.broken = True
+                if conn.leases == 0:
+                    self._discard(conn)
+                    closed.append(conn)
+            self._cond.notify_all()
+        for conn in closed:
+            conn.close()
+        return len(closed)
+
+    def close_all(self):
+        """关闭连接池中的所有连接（服务退出时调用）"""
+        with self._cond:
+            self._closed = True
+            conns = [conn for group in self._connections.values() for conn in group]
+            self._connections.clear()
+            self._by_client.clear()
+            self._cond.notify_all()
+        for conn in conns:
+            conn.close()
+        if conns:
+            print(f"[SSH连接池] 已关闭全部连接（{len(conns)}条）")
+
+    def stats(self):
+        """连接池状态（用于调试和健康检查）"""
+        with self._cond:
+            return {
+                f"{user}@{host}": [
+                    {"leases": conn.leases, "active": conn.is_active(), "idle_seconds": round(time.time() - conn.last_used, 1)}
+                    for conn in conns
+                ]
+                for (host, user), conns in self._connections.items()
+            }
+
+
+# 全局共享的SSH连接池
+ssh_pool = SSHConnectionPool()
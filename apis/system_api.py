@@ -0,0 +1,149 @@
+# 系统信息/车辆ID检测API处理器
+# 通过SSH读取设备环境变量（PRODUCT_NAME、HOSTNAME等），供 /api/get_system_info、/api/check_vehicle_id 和批量测试共用
+
+import re
+
+import config
+from .ssh_pool import ssh_pool
+from .channel_reader import ChannelReader, SHELL_DONE_COMMAND, SHELL_DONE_MARKER
+
+# 系统信息需要读取的环境变量
+SYSTEM_INFO_KEYS = ['PRODUCT_NAME', 'PRODUCT_NAME_EXTERNAL', 'HOSTNAME', 'APP_VERSION']
+
+
+class SystemAPI:
+    """系统信息和车辆ID检测的API处理器
+
+    SSH认证失败、连接错误等paramiko异常直接抛出，由调用方（路由或批量测试）决定如何返回
+    """
+
+    @staticmethod
+    def read_env(ssh_host, keys, ssh_user=None, ssh_password=None, log_prefix="[系统信息调试]", timeout=8):
+        """通过交互式Shell读取环境变量，返回 ({变量名: 值}, 原始输出)"""
+        ssh_user = ssh_user or config.SSH_USER
+        ssh_password = ssh_password or config.SSH_PASSWORD
+
+        # 1. 从连接池获取SSH连接（复用已建立的连接）
+        with ssh_pool.connection(ssh_host, ssh_user, ssh_password) as ssh:
+            print(f"{log_prefix} ✅ SSH连接成功，开始获取 {', '.join(keys)}...")
+
+            # 2. 创建交互式Shell通道（需要加载登录环境变量）
+            channel = ssh.invoke_shell()
+            channel.settimeout(10)  # 通道超时时间
+            channel.set_combine_stderr(True)  # 合并标准输出和错误输出
+
+            # 3. 发送获取环境变量的命令
+            # 先尝试source环境变量文件（如果存在），然后获取环境变量，最后输出结束标记
+            reader = ChannelReader(channel, log_prefix=log_prefix)
+            echo_commands = "".join(f"echo {key}=${key}; " for key in keys)
+            command = "source ~/.bashrc 2>/dev/null; source /etc/profile 2>/dev/null; " + echo_commands + SHELL_DONE_COMMAND + "\n"
+            print(f"{log_prefix} 发送命令: {command.strip()}")
+            channel.send(command)
+
+            # 4. 读取输出直到命令执行完成（收到结束标记立即返回，无需固定等待）
+            print(f"{log_prefix} 开始接收输出（超时时间{timeout}秒）...")
+            if reader.read_lines_until(lambda line: line.strip() == SHELL_DONE_MARKER, timeout):
+                print(f"{log_prefix} 已获取到所有需要的信息，提前退出")
+            output = reader.output
+
+            # 5. 关闭通道
+            channel.close()
+
+        print(f"{log_prefix} 原始输出内容:\n{output}")
+        return SystemAPI.parse_env_output(output, keys, log_prefix), output
+
+    @staticmethod
+    def parse_env_output(output, keys, log_prefix="[系统信息调试]"):
+        """从Shell输出中解析 KEY=值，跳过命令回显中未展开的变量（如 $HOSTNAME）"""
+        values = {}
+        if not output:
+            return values
+
+        # 使用正则表达式提取环境变量（匹配格式：PRODUCT_NAME=值）
+        for key in keys:
+            for match in re.finditer(key + r'\s*=\s*([^\s\n\r;]+)', output):
+                value = match.group(1).strip()
+                if value.startswith('$'):
+                    continue
+                values[key] = value
+                print(f"{log_prefix} 正则匹配: {key}={value}")
+                break
+            else:
+                print(f"{log_prefix} 警告: 未获取到 {key} 的值")
+
+        # 如果正则匹配不完整，使用行解析方式
+        if len(values) < len(keys):
+            print(f"{log_prefix} 正则匹配不完整（只匹配到{len(values)}个字段），使用行解析方式")
+            for line in output.split('\n'):
+                line = line.strip()
+                # 提取包含环境变量的行，排除提示符和命令回显
+                if '=' not in line or not any(key in line for key in keys):
+                    continue
+                # 移除可能的提示符前缀（如 [user@host ~]$ 等）
+                if line.startswith('[') and ']' in line:
+                    line = line.split(']', 1)[1].strip()
+                # 移除命令回显（如 echo PRODUCT_NAME=...）
+                if line.startswith('echo ') or '=' not in line:
+                    continue
+                key, value = line.split('=', 1)
+                key = key.strip()
+                value = value.strip()
+                # 过滤掉未解析的变量
+                if key in keys and key not in values and value and not value.startswith('$'):
+                    values[key] = value
+                    print(f"{log_prefix} 行解析: {key}={value}")
+
+        return values
+
+    @staticmethod
+    def get_system_info(ssh_host, ssh_user=None, ssh_password=None):
+        """获取系统信息（PRODUCT_NAME, PRODUCT_NAME_EXTERNAL, HOSTNAME, APP_VERSION）"""
+        system_info, output = SystemAPI.read_env(ssh_host, SYSTEM_INFO_KEYS, ssh_user, ssh_password, log_prefix="[系统信息调试]")
+
+        # 至少获取到3个关键字段才算成功
+        if len(system_info) >= 3:
+            print(f"[系统信息调试] ✅ 成功获取系统信息: {system_info}")
+            return {
+                "status": "success",
+                "data": {key: system_info.get(key, '') for key in SYSTEM_INFO_KEYS}
+            }
+
+        print(f"[系统信息调试] ❌ 获取系统信息失败")
+        print(f"[系统信息调试] 解析到的系统信息: {system_info}")
+        print(f"[系统信息调试] 原始输出: {output[:500]}...")
+        return {
+            "status": "error",
+            "message": f"无法获取系统信息。请检查环境变量是否正确设置。解析到的信息: {system_info}, 原始输出长度: {len(output) if output else 0}"
+        }
+
+    @staticmethod
+    def check_vehicle_id(vehicle_id, ssh_host, ssh_user=None, ssh_password=None):
+        """检测车辆ID是否匹配（通过SSH获取HOSTNAME并与输入的车辆ID比较）"""
+        values, output = SystemAPI.read_env(ssh_host, ['HOSTNAME'], ssh_user, ssh_password, log_prefix="[车辆ID检测]")
+        hostname = values.get('HOSTNAME')
+        print(f"[车辆ID检测] 输入的车辆ID: {vehicle_id}, 获取的HOSTNAME: {hostname}")
+
+        if not hostname:
+            print(f"[车辆ID检测] ❌ 无法解析HOSTNAME，原始输出长度: {len(output)}")
+            return {
+                "status": "error",
+                "message": f"无法获取设备HOSTNAME，请检查SSH连接和网络设置。原始输出: {output[:200]}"
+            }
+
+        # 比较车辆ID和HOSTNAME
+        print(f"[车辆ID检测] 比较: 车辆ID='{vehicle_id}' vs HOSTNAME='{hostname}'")
+        if vehicle_id == hostname:
+            print(f"[车辆ID检测] ✅ 匹配成功")
+            return {
+                "status": "success",
+                "matched": True,
+                "hostname": hostname,
+                "message": "车辆ID匹配成功"
+            }
+        print(f"[车辆ID检测] ❌ 匹配失败")
+        return {
+            "status": "success",
+            "matched": False,
+            "hostname": hostname,
+            "message": "车辆ID与设备不匹配"
+        }
@@ -1,6 +1,7 @@
 # 语音测试API处理器
 
 from .base_api import BaseAPI
+from .ssh_pool import ssh_pool
 import config
 import requests
 
@@ -31,35 +32,26 @@ class VoiceAPI(BaseAPI):
         import paramiko
         import time
         
-        ssh = None  # 初始化SSH连接变量
+        ssh_available = False  # 步骤1能否连上SSH（连不上时跳过后续的Ctrl+C操作）
         
         # 步骤1: 执行 rosnode kill /task_manager
         try:
             print(f"[语音测试] 步骤1: 正在通过SSH执行命令: rosnode kill /task_manager")
             
-            # 建立SSH连接
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(
-                hostname=ssh_host,
-                port=22,
-                username=ssh_user,
-                password=ssh_password,
-                timeout=10,
-                allow_agent=False,
-                look_for_keys=False
-            )
-            
-            # 执行 rosnode kill /task_manager 命令
-            # 需要先source ROS环境，因为exec_command不会自动加载环境变量
-            # 尝试多个可能的ROS环境路径（使用bash -c确保shell正确执行）
-            command = "bash -c 'source /opt/ros/melodic/setup.bash 2>/dev/null || source /opt/ros/noetic/setup.bash 2>/dev/null || source ~/catkin_ws/devel/setup.bash 2>/dev/null || source $(find /opt/ros -name setup.bash 2>/dev/null | head -1) 2>/dev/null; rosnode kill /task_manager'"
-            stdin, stdout, stderr = ssh.exec_command(command, timeout=10)
-            
-            # 等待命令执行完成
-            exit_status = stdout.channel.recv_exit_status()
-            output = stdout.read().decode('utf-8', errors='ignore')
-            error_output = stderr.read().decode('utf-8', errors='ignore')
+            # 从连接池获取SSH连接（后续步骤复用同一条连接，无需重新握手）
+            with ssh_pool.connection(ssh_host, ssh_user, ssh_password) as ssh:
+                ssh_available = True
+                
+                # 执行 rosnode kill /task_manager 命令
+                # 需要先source ROS环境，因为exec_command不会自动加载环境变量
+                # 尝试多个可能的ROS环境路径（使用bash -c确保shell正确执行）
+                command = "bash -c 'source /opt/ros/melodic/setup.bash 2>/dev/null || source /opt/ros/noetic/setup.bash 2>/dev/null || source ~/catkin_ws/devel/setup.bash 2>/dev/null || source $(find /opt/ros -name setup.bash 2>/dev/null | head -1) 2>/dev/null; rosnode kill /task_manager'"
+                stdin, stdout, stderr = ssh.exec_command(command, timeout=10)
+                
+                # 等待命令执行完成
+                exit_status = stdout.channel.recv_exit_status()
+                output = stdout.read().decode('utf-8', errors='ignore')
+                error_output = stderr.read().decode('utf-8', errors='ignore')
             
             print(f"[语音测试] SSH命令执行完成，退出状态: {exit_status}")
             if output:
@@ -69,17 +61,13 @@ class VoiceAPI(BaseAPI):
             
             # 注意：即使rosnode kill命令失败（节点不存在），也继续执行后续步骤
             # 因为节点可能已经不存在，这是正常情况
-            # 不关闭SSH连接，等待20秒后可能还需要使用（但20秒后连接可能超时，步骤5会重新建立）
             
         except paramiko.AuthenticationException as e:
             print(f"[语音测试] ⚠️ SSH认证失败，继续执行后续步骤: {e}")
-            ssh = None
         except paramiko.SSHException as e:
             print(f"[语音测试] ⚠️ SSH连接错误，继续执行后续步骤: {e}")
-            ssh = None
         except Exception as e:
             print(f"[语音测试] ⚠️ SSH命令执行异常，继续执行后续步骤: {e}")
-            ssh = None
         
         # 步骤2: 等待20秒
         print(f"[语音测试] 步骤2: 等待20秒...")
@@ -87,16 +75,8 @@ class VoiceAPI(BaseAPI):
         print(f"[语音测试] 等待完成，发送Ctrl+C操作")
         
         # 等待20秒后，发送Ctrl+C操作
-        try:
-            if ssh and ssh.get_transport() and ssh.get_transport().is_active():
-                # 创建交互式shell通道来发送Ctrl+C
-                channel = ssh.invoke_shell()
-                channel.send(b'\x03')  # Ctrl+C (ASCII码3)
-                time.sleep(0.5)  # 短暂等待
-                channel.close()
-                print(f"[语音测试] Ctrl+C操作已发送（步骤2后）")
-        except Exception as e:
-            print(f"[语音测试] ⚠️ 发送Ctrl+C操作失败（步骤2后）: {e}")
+        if ssh_available:
+            VoiceAPI._send_ctrl_c(ssh_host, ssh_user, ssh_password, "步骤2后")
         
         print(f"[语音测试] 开始执行HTTP请求")
         
@@ -193,57 +173,34 @@ class VoiceAPI(BaseAPI):
         try:
             print(f"[语音测试] 步骤5: 正在通过SSH执行命令: roslaunch task_manager task_manager.launch &")
             
-            # 重新建立SSH连接（等待20秒后之前的连接可能已超时或关闭）
-            try:
-                if ssh and ssh.get_transport() and ssh.get_transport().is_active():
-                    print(f"[语音测试] 使用现有SSH连接")
-                else:
-                    raise Exception("SSH连接不可用，需要重新建立")
-            except:
-                print(f"[语音测试] 重新建立SSH连接...")
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                ssh.connect(
-                    hostname=ssh_host,
-                    port=22,
-                    username=ssh_user,
-                    password=ssh_password,
-                    timeout=10,
-                    allow_agent=False,
-                    look_for_keys=False
-                )
-                print(f"[语音测试] SSH连接已重新建立")
-            
-            # 执行 roslaunch task_manager task_manager.launch & 命令（后台运行）
-            # 需要先source ROS环境，因为exec_command不会自动加载环境变量
-            # 使用bash -c确保shell正确执行
-            command = "bash -c 'source /opt/ros/melodic/setup.bash 2>/dev/null || source /opt/ros/noetic/setup.bash 2>/dev/null || source ~/catkin_ws/devel/setup.bash 2>/dev/null || source $(find /opt/ros -name setup.bash 2>/dev/null | head -1) 2>/dev/null; roslaunch task_manager task_manager.launch &'"
-            stdin, stdout, stderr = ssh.exec_command(command, timeout=10)
-            
-            # 对于后台命令，不等待退出状态，立即返回
-            # 读取初始输出（如果有）
-            time.sleep(0.5)  # 短暂等待，让命令开始执行
-            if stdout.channel.recv_ready():
-                output = stdout.read().decode('utf-8', errors='ignore')
-                if output:
-                    print(f"[语音测试] roslaunch命令输出: {output.strip()}")
+            # 连接池会检查连接是否存活，20秒后连接已断开时自动重新建立
+            with ssh_pool.connection(ssh_host, ssh_user, ssh_password) as ssh:
+                ssh_available = True
+                
+                # 执行 roslaunch task_manager task_manager.launch & 命令（后台运行）
+                # 需要先source ROS环境，因为exec_command不会自动加载环境变量
+                # 使用bash -c确保shell正确执行
+                command = "bash -c 'source /opt/ros/melodic/setup.bash 2>/dev/null || source /opt/ros/noetic/setup.bash 2>/dev/null || source ~/catkin_ws/devel/setup.bash 2>/dev/null || source $(find /opt/ros -name setup.bash 2>/dev/null | head -1) 2>/dev/null; roslaunch task_manager task_manager.launch &'"
+                stdin, stdout, stderr = ssh.exec_command(command, timeout=10)
+                
+                # 对于后台命令，不等待退出状态，立即返回
+                # 读取初始输出（如果有）
+                time.sleep(0.5)  # 短暂等待，让命令开始执行
+                if stdout.channel.recv_ready():
+                    output = stdout.read().decode('utf-8', errors='ignore')
+                    if output:
+                        print(f"[语音测试] roslaunch命令输出: {output.strip()}")
             
             print(f"[语音测试] roslaunch命令已启动（后台运行）")
             
         except paramiko.AuthenticationException as e:
+            ssh_available = False
             print(f"[语音测试] ⚠️ SSH认证失败: {e}")
         except paramiko.SSHException as e:
+            ssh_available = False
             print(f"[语音测试] ⚠️ SSH连接错误: {e}")
         except Exception as e:
             print(f"[语音测试] ⚠️ roslaunch命令执行异常: {e}")
-        finally:
-            # 关闭SSH连接
-            try:
-                if ssh:
-                    ssh.close()
-                    print(f"[语音测试] SSH连接已关闭")
-            except:
-                pass
         
         # 步骤6: 等待10秒
         print(f"[语音测试] 步骤6: 等待10秒...")
@@ -251,16 +208,8 @@ class VoiceAPI(BaseAPI):
         print(f"[语音测试] 等待完成，发送Ctrl+C操作")
         
         # 等待10秒后，发送Ctrl+C操作
-        try:
-            if ssh and ssh.get_transport() and ssh.get_transport().is_active():
-                # 创建交互式shell通道来发送Ctrl+C
-                channel = ssh.invoke_shell()
-                channel.send(b'\x03')  # Ctrl+C (ASCII码3)
-                time.sleep(0.5)  # 短暂等待
-                channel.close()
-                print(f"[语音测试] Ctrl+C操作已发送（步骤6后）")
-        except Exception as e:
-            print(f"[语音测试] ⚠️ 发送Ctrl+C操作失败（步骤6后）: {e}")
+        if ssh_available:
+            VoiceAPI._send_ctrl_c(ssh_host, ssh_user, ssh_password, "步骤6后")
         
         print(f"[语音测试] 所有步骤执行完成")
         
@@ -270,6 +219,20 @@ class VoiceAPI(BaseAPI):
         else:
             return {"status": "error", "message": http_message}
     
+    @staticmethod
+    def _send_ctrl_c(ssh_host, ssh_user, ssh_password, step_name):
+        """在共享SSH连接上打开交互式shell通道并发送Ctrl+C"""
+        import time
+        try:
+            with ssh_pool.connection(ssh_host, ssh_user, ssh_password) as ssh:
+                channel = ssh.invoke_shell()
+                channel.send(b'\x03')  # Ctrl+C (ASCII码3)
+                time.sleep(0.5)  # 短暂等待
+                channel.close()
+            print(f"[语音测试] Ctrl+C操作已发送（{step_name}）")
+        except Exception as e:
+            print(f"[语音测试] ⚠️ 发送Ctrl+C操作失败（{step_name}）: {e}")
+    
     @staticmethod
     def check_io(item_id):
         """检查语音IO状态（如果需要）"""
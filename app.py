@@ -1,105 +1,54 @@
-from flask import Flask, render_template, request, jsonify, send_file
-from io import BytesIO
-from datetime import datetime
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import config
 import test_data
 from test_data import TABdisplayconfig
+from test_data.vehicle_catalog import get_vehicle_catalog
+from test_data.vehicle_model import parse_model
+from test_data.config_store import config_store
+from test_data.config_bundle import apply_bundle
+from test_plan import get_test_plan, test_plans
+from report_writer import ReportWriter, XLSX_MIMETYPE
+import report_pipeline
+from report_pipeline import ReportError, TestReport
+from results_store import results_store, make_row, parse_time, FILTER_FIELDS
+import analytics
 import apis
+from apis.ssh_pool import ssh_pool
+from apis.system_api import SystemAPI
+from apis.io_subscriber import get_io_subscriber, stop_all_subscribers
+from job_manager import job_manager, JobQueueFull
+from orchestrator import orchestrator
+from event_bus import event_bus
+import json
+import os
 import time
-import threading
 
 # 导入日志配置（必须在其他导入之前，以便重定向print）
 import logger_config
 
 app = Flask(__name__)
 
-# SSH连接池（用于相机测试，按ssh_host存储）
-# 格式：{ssh_host: {'ssh': ssh_client, 'lock': threading.Lock()}}
-camera_ssh_connections = {}
-ssh_lock = threading.Lock()  # 保护连接池的锁
+# 启动时加载test_data下的CSV配置（优先使用compile_config.py生成的预编译配置包，之后文件修改会自动重新加载）
+apply_bundle(os.path.join(os.path.dirname(os.path.abspath(__file__)), config.CONFIG_BUNDLE_PATH))
+config_store.reload_if_changed()
 
 def get_categories_by_vehicle(vehicle_model):
-    """根据车型获取对应的测试类别列表（优先从CSV文件读取）"""
-    # 首先尝试从CSV文件读取配置
-    tab_config = TABdisplayconfig.get_tabs_by_device_model(vehicle_model)
-    
-    if tab_config and 'tabs' in tab_config:
-        tab_ids = tab_config['tabs']
-        # 根据配置的TAB ID列表，从所有类别中筛选
-        categories = [cat for cat in test_data.TEST_CATEGORIES if cat['id'] in tab_ids]
-        # 保持配置中的顺序
-        category_dict = {cat['id']: cat for cat in categories}
-        result = [category_dict[tab_id] for tab_id in tab_ids if tab_id in category_dict]
-        if result:
-            print(f"[TAB配置] 从CSV文件加载 {vehicle_model} 的TAB配置: {[cat['id'] for cat in result]}")
-            return result
-    
-    # 如果CSV中没有找到，回退到config.py中的配置
-    if vehicle_model in config.VEHICLE_TAB_CONFIG:
-        tab_ids = config.VEHICLE_TAB_CONFIG[vehicle_model]
-        # 根据配置的TAB ID列表，从所有类别中筛选
-        categories = [cat for cat in test_data.TEST_CATEGORIES if cat['id'] in tab_ids]
-        # 保持配置中的顺序
-        category_dict = {cat['id']: cat for cat in categories}
-        result = [category_dict[tab_id] for tab_id in tab_ids if tab_id in category_dict]
-        if result:
-            print(f"[TAB配置] 从config.py加载 {vehicle_model} 的TAB配置: {[cat['id'] for cat in result]}")
-            return result
-    
-    # 如果都没有配置，返回所有类别
-    print(f"[TAB配置] 未找到 {vehicle_model} 的配置，返回所有TAB")
-    return test_data.TEST_CATEGORIES
+    """根据车型获取对应的测试类别列表（优先从CSV文件读取，结果缓存在车型测试计划中）"""
+    return list(get_test_plan(vehicle_model).categories)
+
+def _catalog_response(body, etag):
+    """返回设备型号目录的JSON，带ETag；浏览器携带相同的If-None-Match时返回304"""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'  # 每次都向服务器验证ETag
+    return response.make_conditional(request)
 
 @app.route('/api/vehicle_types')
 def get_vehicle_types():
     """获取设备类型列表（X060、X080、X100、X150等）"""
     try:
-        import csv
-        import os
-        import re
-        
-        csv_path = os.path.join(os.path.dirname(__file__), 'test_data', 'TABdisplay_data.csv')
-        vehicle_types = set()
-        vehicle_models = []
-        
-        # 读取CSV文件
-        encodings = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312']
-        for encoding in encodings:
-            try:
-                with open(csv_path, 'r', encoding=encoding) as f:
-                    reader = csv.reader(f)
-                    rows = list(reader)
-                    
-                    # 跳过表头
-                    for row in rows[1:]:
-                        if len(row) < 1:
-                            continue
-                        device_model = row[0].strip()
-                        if not device_model:
-                            continue
-                        
-                        vehicle_models.append(device_model)
-                        
-                        # 提取设备类型（X060、X080、X100、X150等）
-                        # 匹配 X-060、X-080、X-100、X-150 等格式
-                        match = re.match(r'X-?(\d+)', device_model)
-                        if match:
-                            type_code = 'X' + match.group(1)
-                            vehicle_types.add(type_code)
-                    
-                    break
-            except Exception as e:
-                print(f"[设备类型] 使用 {encoding} 编码读取CSV失败: {e}")
-                continue
-        
-        # 排序设备类型
-        sorted_types = sorted(list(vehicle_types))
-        
-        return jsonify({
-            "status": "success",
-            "vehicle_types": sorted_types,
-            "all_models": vehicle_models
-        })
+        catalog = get_vehicle_catalog()
+        return _catalog_response(catalog.types_json(), catalog.etag)
     except Exception as e:
         print(f"[设备类型] 获取设备类型失败: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -108,56 +57,29 @@ def get_vehicle_types():
 def get_vehicle_models():
     """根据设备类型获取具体型号列表"""
     try:
-        import csv
-        import os
-        import re
-        
         vehicle_type = request.args.get('type', '')  # 如 X060、X080等
         
         if not vehicle_type:
             return jsonify({"status": "error", "message": "缺少设备类型参数"}), 400
         
-        csv_path = os.path.join(os.path.dirname(__file__), 'test_data', 'TABdisplay_data.csv')
-        vehicle_models = []
-        
-        # 读取CSV文件
-        encodings = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312']
-        for encoding in encodings:
-            try:
-                with open(csv_path, 'r', encoding=encoding) as f:
-                    reader = csv.reader(f)
-                    rows = list(reader)
-                    
-                    # 跳过表头
-                    for row in rows[1:]:
-                        if len(row) < 1:
-                            continue
-                        device_model = row[0].strip()
-                        if not device_model:
-                            continue
-                        
-                        # 检查是否以该设备类型开头
-                        # 支持 X-060 和 X060 两种格式
-                        type_pattern = vehicle_type.replace('X', 'X-?')
-                        if re.match(f'^{type_pattern}', device_model):
-                            vehicle_models.append(device_model)
-                    
-                    break
-            except Exception as e:
-                print(f"[设备型号] 使用 {encoding} 编码读取CSV失败: {e}")
-                continue
-        
-        # 去重并排序
-        vehicle_models = sorted(list(set(vehicle_models)))
-        
-        return jsonify({
-            "status": "success",
-            "vehicle_models": vehicle_models
-        })
+        catalog = get_vehicle_catalog()
+        return _catalog_response(catalog.models_json(vehicle_type), f"{catalog.etag}-{vehicle_type}")
     except Exception as e:
         print(f"[设备型号] 获取设备型号失败: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/resolve_model')
+def resolve_model():
+    """查看设备型号匹配到的TAB配置型号和匹配规则（exact/extension/prefix），以及型号各段的解析结果"""
+    device_model = request.args.get('vehiclemodel', '')
+    if not device_model:
+        return jsonify({"status": "error", "message": "缺少设备型号参数"}), 400
+    
+    match = TABdisplayconfig.resolve_device_model(device_model)
+    tab_config = TABdisplayconfig.get_tabs_by_device_model(device_model) if match['model'] else None
+    return jsonify({"status": "success", **match, "tab_config": tab_config,
+                    "descriptor": parse_model(device_model).to_dict()})
+
 @app.route('/api/check_vehicle_id', methods=['POST'])
 def check_vehicle_id():
     """检测车辆ID是否匹配（通过SSH获取HOSTNAME并与输入的车辆ID比较）"""
@@ -173,141 +95,13 @@ def check_vehicle_id():
     if not ssh_host:
         return jsonify({"status": "error", "message": "未提供车辆IP地址"}), 400
     
-    ssh_user = ssh_user or config.SSH_USER
-    ssh_password = ssh_password or config.SSH_PASSWORD
-    
     try:
         import paramiko
-        import time
-        import re
-        
-        # 1. 建立SSH连接
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(
-            hostname=ssh_host,
-            port=22,
-            username=ssh_user,
-            password=ssh_password,
-            timeout=10,
-            allow_agent=False,
-            look_for_keys=False
-        )
-        print(f"[车辆ID检测] SSH连接成功，开始获取HOSTNAME...")
-        
-        # 2. 创建交互式Shell通道
-        channel = ssh.invoke_shell()
-        channel.settimeout(10)
-        channel.set_combine_stderr(True)
-        
-        # 3. 等待shell初始化，清空初始输出
-        time.sleep(1)
-        if channel.recv_ready():
-            initial_output = channel.recv(4096).decode('utf-8', errors='ignore')
-            print(f"[车辆ID检测] 清空初始shell提示符: {initial_output[:100]}...")
-        
-        # 4. 发送获取HOSTNAME的命令（参考get_system_info的实现）
-        command = "source ~/.bashrc 2>/dev/null; source /etc/profile 2>/dev/null; echo HOSTNAME=$HOSTNAME\n"
-        print(f"[车辆ID检测] 发送命令: {command.strip()}")
-        channel.send(command)
-        time.sleep(2)  # 等待命令执行和输出返回（确保环境变量加载完成）
-        
-        # 5. 实时读取输出并解析（参考get_system_info的方式）
-        output = ""
-        start_time = time.time()
-        timeout = 5  # 读取超时时间5秒
         
-        print(f"[车辆ID检测] 开始接收输出（超时时间{timeout}秒）...")
-        
-        while time.time() - start_time < timeout:
-            if channel.recv_ready():
-                # 读取通道数据（按字节读取，避免截断）
-                data = channel.recv(4096).decode('utf-8', errors='ignore')
-                if data:
-                    output += data
-                    print(f"[车辆ID检测] 接收到数据: {data.strip()}")
-                    # 如果已经获取到HOSTNAME信息，可以提前退出
-                    if 'HOSTNAME=' in output and not output.strip().endswith('HOSTNAME='):
-                        print(f"[车辆ID检测] 已获取到HOSTNAME信息，提前退出")
-                        break
-            time.sleep(0.5)  # 每隔0.5秒读取一次
-        
-        # 6. 关闭通道
-        channel.close()
-        
-        print(f"[车辆ID检测] 原始输出内容:\n{output}")
-        
-        # 7. 解析输出，提取HOSTNAME（参考get_system_info的解析逻辑）
-        hostname = None
-        
-        if output:
-            # 使用正则表达式提取HOSTNAME（匹配格式：HOSTNAME=值）
-            hostname_pattern = r'HOSTNAME\s*=\s*([^\s\n\r;]+)'
-            match = re.search(hostname_pattern, output)
-            if match:
-                hostname = match.group(1).strip()
-                # 过滤掉未解析的变量（如 $HOSTNAME）
-                if not hostname.startswith('$'):
-                    print(f"[车辆ID检测] 正则匹配: HOSTNAME={hostname}")
-                else:
-                    print(f"[车辆ID检测] 警告: HOSTNAME 的值未解析: {hostname}")
-                    hostname = None
-            
-            # 如果正则匹配失败，使用行解析方式
-            if not hostname:
-                print(f"[车辆ID检测] 正则匹配失败，使用行解析方式")
-                lines = output.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    # 提取包含HOSTNAME的行，排除提示符和命令回显
-                    if '=' in line and 'HOSTNAME' in line:
-                        # 移除可能的提示符前缀（如 [user@host ~]$ 等）
-                        if line.startswith('[') and ']' in line:
-                            line = line.split(']', 1)[1].strip()
-                        # 移除命令回显（如 echo HOSTNAME=...）
-                        if line.startswith('echo '):
-                            continue
-                        if line and '=' in line:
-                            key, value = line.split('=', 1)
-                            key = key.strip()
-                            value = value.strip()
-                            # 过滤掉未解析的变量
-                            if key == 'HOSTNAME' and not value.startswith('$'):
-                                hostname = value
-                                print(f"[车辆ID检测] 行解析: HOSTNAME={hostname}")
-                                break
-        
-        # 8. 关闭SSH连接
-        ssh.close()
-        
-        print(f"[车辆ID检测] 输入的车辆ID: {vehicle_id}, 获取的HOSTNAME: {hostname}")
-        print(f"[车辆ID检测] 原始输出内容:\n{output}")
-        
-        if not hostname:
-            print(f"[车辆ID检测] ❌ 无法解析HOSTNAME，原始输出长度: {len(output)}")
-            return jsonify({
-                "status": "error",
-                "message": f"无法获取设备HOSTNAME，请检查SSH连接和网络设置。原始输出: {output[:200]}"
-            }), 500
-        
-        # 8. 比较车辆ID和HOSTNAME
-        print(f"[车辆ID检测] 比较: 车辆ID='{vehicle_id}' vs HOSTNAME='{hostname}'")
-        if vehicle_id == hostname:
-            print(f"[车辆ID检测] ✅ 匹配成功")
-            return jsonify({
-                "status": "success",
-                "matched": True,
-                "hostname": hostname,
-                "message": "车辆ID匹配成功"
-            })
-        else:
-            print(f"[车辆ID检测] ❌ 匹配失败")
-            return jsonify({
-                "status": "success",
-                "matched": False,
-                "hostname": hostname,
-                "message": "车辆ID与设备不匹配"
-            })
+        result = SystemAPI.check_vehicle_id(vehicle_id, ssh_host, ssh_user, ssh_password)
+        if result.get('status') == 'error':
+            return jsonify(result), 500
+        return jsonify(result)
             
     except paramiko.AuthenticationException as e:
         print(f"[车辆ID检测] ❌ SSH认证失败: {e}")
@@ -333,16 +127,14 @@ def index():
     hostname = request.args.get('hostname', '')
     carip = request.args.get('carip', '')
     
-    # 根据车型获取对应的测试类别
-    categories = get_categories_by_vehicle(vehicle_model)
-    
-    if not categories:
-        categories = test_data.TEST_CATEGORIES
+    # 根据车型获取对应的测试计划（测试类别和按车型筛选后的测试数据）
+    plan = get_test_plan(vehicle_model)
+    categories = list(plan.categories)
     
     # 获取第一个测试类别的详情
     first_category = categories[0]
     first_test_id = first_category['id']
-    first_test_details = test_data.TEST_DETAILS.get(first_test_id)
+    first_test_details = plan.get_details(first_test_id)
     
     # 确保 first_test_details 是字典且包含 sections
     if not first_test_details or 'sections' not in first_test_details:
@@ -350,7 +142,7 @@ def index():
     
     return render_template('index.html', 
                          test_categories=categories, 
-                         all_test_details=test_data.TEST_DETAILS,
+                         all_test_details=plan.details,
                          first_test_id=first_test_id,
                          first_test_details=first_test_details,
                          vehicle_model=vehicle_model,
@@ -359,65 +151,19 @@ def index():
 
 @app.route('/api/test_data/<test_id>')
 def get_test_data(test_id):
-    if test_id in test_data.TEST_DETAILS:
-        test_data_obj = test_data.TEST_DETAILS[test_id]
-        
-        vehicle_model = request.args.get('vehiclemodel', 'X100')
-        
-        # 如果是相机测试，根据设备型号从CSV配置中获取需要显示的设备
-        if test_id == 'camera':
-            # 从CSV配置中获取该设备型号需要显示的相机设备
-            camera_devices = TABdisplayconfig.get_camera_devices_by_device_model(vehicle_model)
-            print(f"[相机测试] 设备型号 {vehicle_model} 需要显示的设备: {camera_devices}")
-            # 使用X100的IP映射作为默认值
-            ip_map = config.get_camera_ip_map('X100')
-            
-            # 过滤设备列表并添加IP地址
-            filtered_data = {
-                "sections": []
-            }
-            for section in test_data_obj.get('sections', []):
-                filtered_section = {
-                    "title": section.get('title', ''),
-                    "items": []
-                }
-                for item in section.get('items', []):
-                    # 只显示CSV配置中指定的设备
-                    if item.get('id') in camera_devices:
-                        # 添加IP地址到设备数据中
-                        item_with_ip = item.copy()
-                        item_with_ip['default_ip'] = ip_map.get(item.get('id'), '192.168.1.1')
-                        filtered_section['items'].append(item_with_ip)
-                
-                if filtered_section['items']:
-                    filtered_data['sections'].append(filtered_section)
-            
-            return jsonify(filtered_data)
-        
-        # 如果是按键测试，根据车型过滤测试项
-        if test_id == 'button':
-            allowed_items = config.get_button_test_items(vehicle_model)
-            
-            # 过滤测试项列表
-            filtered_data = {
-                "sections": []
-            }
-            for section in test_data_obj.get('sections', []):
-                filtered_section = {
-                    "title": section.get('title', ''),
-                    "items": []
-                }
-                for item in section.get('items', []):
-                    if item.get('id') in allowed_items:
-                        filtered_section['items'].append(item)
-                
-                if filtered_section['items']:
-                    filtered_data['sections'].append(filtered_section)
-            
-            return jsonify(filtered_data)
-        
-        return jsonify(test_data_obj)
-    return jsonify({"error": "Test not found"}), 404
+    vehicle_model = request.args.get('vehiclemodel', 'X100')
+    
+    # 相机测试只包含CSV配置中指定的设备（附带默认IP），按键测试只包含该车型的按钮；JSON在测试计划中只序列化一次
+    body = get_test_plan(vehicle_model).details_json(test_id)
+    if body is None:
+        return jsonify({"error": "Test not found"}), 404
+    return app.response_class(body, mimetype='application/json')
+
+@app.route('/api/test_plan')
+def get_test_plan_info():
+    """查看车型的测试计划（测试类别、相机设备及IP、按键测试项、IO索引、指令）"""
+    vehicle_model = request.args.get('vehiclemodel', 'X100')
+    return jsonify({"status": "success", "plan": get_test_plan(vehicle_model).to_dict()})
 
 @app.route('/api/config')
 def get_config():
@@ -439,143 +185,13 @@ def get_system_info():
     if not ssh_host:
         return jsonify({"status": "error", "message": "未提供SSH主机地址"}), 400
     
-    ssh_user = ssh_user or config.SSH_USER
-    ssh_password = ssh_password or config.SSH_PASSWORD
-    
     try:
         import paramiko
-        import time
-        import re
-        
-        # 1. 建立SSH连接（参考工作代码）
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(
-            hostname=ssh_host,
-            port=22,
-            username=ssh_user,
-            password=ssh_password,
-            timeout=10,
-            allow_agent=False,
-            look_for_keys=False
-        )
-        print(f"[系统信息调试] ✅ SSH连接成功，开始获取系统信息...")
-        
-        # 2. 创建交互式Shell通道（关键：支持持续输出的指令）
-        channel = ssh.invoke_shell()
-        channel.settimeout(10)  # 通道超时时间
-        channel.set_combine_stderr(True)  # 合并标准输出和错误输出
-        
-        # 3. 等待shell初始化，清空初始输出
-        time.sleep(1)
-        if channel.recv_ready():
-            initial_output = channel.recv(4096).decode('utf-8', errors='ignore')
-            print(f"[系统信息调试] 清空初始shell提示符: {initial_output[:100]}...")
-        
-        # 4. 发送获取环境变量的命令
-        # 先尝试source环境变量文件（如果存在），然后获取环境变量
-        command = "source ~/.bashrc 2>/dev/null; source /etc/profile 2>/dev/null; echo PRODUCT_NAME=$PRODUCT_NAME; echo PRODUCT_NAME_EXTERNAL=$PRODUCT_NAME_EXTERNAL; echo HOSTNAME=$HOSTNAME; echo APP_VERSION=$APP_VERSION\n"
-        print(f"[系统信息调试] 发送命令: {command.strip()}")
-        channel.send(command)
-        time.sleep(2)  # 等待命令执行和输出返回（确保环境变量加载完成）
-        
-        # 5. 实时读取输出并解析（参考工作代码的方式）
-        output = ""
-        start_time = time.time()
-        timeout = 5  # 读取超时时间5秒
-        
-        print(f"[系统信息调试] 开始接收输出（超时时间{timeout}秒）...")
-        
-        while time.time() - start_time < timeout:
-            if channel.recv_ready():
-                # 读取通道数据（按字节读取，避免截断）
-                data = channel.recv(4096).decode('utf-8', errors='ignore')
-                if data:
-                    output += data
-                    print(f"[系统信息调试] 接收到数据: {data.strip()}")  # 打印原始输出
-                    # 如果已经获取到所有需要的信息，可以提前退出
-                    if all(key in output for key in ['PRODUCT_NAME=', 'HOSTNAME=', 'APP_VERSION=']):
-                        print(f"[系统信息调试] 已获取到所有需要的信息，提前退出")
-                        break
-            time.sleep(0.5)  # 每隔0.5秒读取一次
-        
-        # 6. 关闭通道
-        channel.close()
-        
-        print(f"[系统信息调试] 原始输出内容:\n{output}")
-        
-        # 7. 解析输出，提取环境变量
-        system_info = {}
-        
-        if output:
-            # 使用正则表达式提取环境变量（匹配格式：PRODUCT_NAME=值）
-            env_patterns = {
-                'PRODUCT_NAME': r'PRODUCT_NAME\s*=\s*([^\s\n\r;]+)',
-                'PRODUCT_NAME_EXTERNAL': r'PRODUCT_NAME_EXTERNAL\s*=\s*([^\s\n\r;]+)',
-                'HOSTNAME': r'HOSTNAME\s*=\s*([^\s\n\r;]+)',
-                'APP_VERSION': r'APP_VERSION\s*=\s*([^\s\n\r;]+)'
-            }
-            
-            # 正则匹配
-            for key, pattern in env_patterns.items():
-                match = re.search(pattern, output)
-                if match:
-                    value = match.group(1).strip()
-                    # 过滤掉未解析的变量（如 $HOSTNAME）
-                    if not value.startswith('$'):
-                        system_info[key] = value
-                        print(f"[系统信息调试] 正则匹配: {key}={value}")
-                    else:
-                        print(f"[系统信息调试] 警告: {key} 的值未解析: {value}")
-            
-            # 如果正则匹配失败，使用行解析方式
-            if len(system_info) < 3:
-                print(f"[系统信息调试] 正则匹配不完整（只匹配到{len(system_info)}个字段），使用行解析方式")
-                lines = output.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    # 提取包含环境变量的行，排除提示符和命令回显
-                    if '=' in line and any(key in line for key in ['PRODUCT_NAME', 'PRODUCT_NAME_EXTERNAL', 'HOSTNAME', 'APP_VERSION']):
-                        # 移除可能的提示符前缀（如 [user@host ~]$ 等）
-                        if line.startswith('[') and ']' in line:
-                            line = line.split(']', 1)[1].strip()
-                        # 移除命令回显（如 echo PRODUCT_NAME=...）
-                        if line.startswith('echo '):
-                            continue
-                        if line and '=' in line:
-                            key, value = line.split('=', 1)
-                            key = key.strip()
-                            value = value.strip()
-                            # 过滤掉未解析的变量
-                            if key in ['PRODUCT_NAME', 'PRODUCT_NAME_EXTERNAL', 'HOSTNAME', 'APP_VERSION'] and not value.startswith('$'):
-                                system_info[key] = value
-                                print(f"[系统信息调试] 行解析: {key}={value}")
         
-        # 8. 检查是否成功获取到系统信息
-        if system_info and len(system_info) >= 3:  # 至少获取到3个关键字段
-            ssh.close()
-            print(f"[系统信息调试] ✅ 成功获取系统信息: {system_info}")
-            
-            return jsonify({
-                "status": "success",
-                "data": {
-                    "PRODUCT_NAME": system_info.get('PRODUCT_NAME', ''),
-                    "PRODUCT_NAME_EXTERNAL": system_info.get('PRODUCT_NAME_EXTERNAL', ''),
-                    "HOSTNAME": system_info.get('HOSTNAME', ''),
-                    "APP_VERSION": system_info.get('APP_VERSION', '')
-                }
-            })
-        else:
-            # 如果获取失败
-            print(f"[系统信息调试] ❌ 获取系统信息失败")
-            print(f"[系统信息调试] 解析到的系统信息: {system_info}")
-            print(f"[系统信息调试] 原始输出: {output[:500]}...")
-            
-            ssh.close()
-            return jsonify({
-                "status": "error", 
-                "message": f"无法获取系统信息。请检查环境变量是否正确设置。解析到的信息: {system_info}, 原始输出长度: {len(output) if output else 0}"
-            }), 500
+        result = SystemAPI.get_system_info(ssh_host, ssh_user, ssh_password)
+        if result.get('status') == 'error':
+            return jsonify(result), 500
+        return jsonify(result)
             
     except paramiko.AuthenticationException:
         return jsonify({"status": "error", "message": "SSH认证失败"}), 401
@@ -594,10 +210,8 @@ def get_vehicle_tabs():
         "categories": categories
     })
 
-@app.route('/api/send_command', methods=['POST'])
-def send_command():
-    """发送指令到串口（根据测试类型路由到对应的API处理器，通过SSH执行）"""
-    data = request.json
+def _dispatch_send_command(data):
+    """根据测试类型把send_command请求路由到对应的API处理器，返回 (结果字典, HTTP状态码)"""
     item_id = data.get('item_id')
     test_id = data.get('test_id')  # 可选，用于确定使用哪个API处理器
     ssh_host = data.get('ssh_host')  # SSH主机地址（从URL的carip参数获取）
@@ -637,14 +251,37 @@ def send_command():
         result = api_handler.send_command(item_id, command_map=None, ssh_host=ssh_host, ssh_user=ssh_user, ssh_password=ssh_password)
     
     if result.get('status') == 'error':
-        return jsonify(result), 400 if '未知' in result.get('message', '') else 500
-    return jsonify(result)
+        return result, 400 if '未知' in result.get('message', '') else 500
+    return result, 200
+
+def _submit_job(kind, func, data):
+    """把耗时的请求提交到后台任务线程池，立即返回job_id（HTTP 202）"""
+    params = {key: data.get(key) for key in ('item_id', 'test_id', 'ssh_host', 'ip_address') if data.get(key)}
+    try:
+        job = job_manager.submit(kind, func, data, params=params)
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    return jsonify({
+        "status": "accepted",
+        "job_id": job.id,
+        "job_url": f"/api/jobs/{job.id}"
+    }), 202
+
+@app.route('/api/send_command', methods=['POST'])
+def send_command():
+    """发送指令到串口（根据测试类型路由到对应的API处理器，通过SSH执行）
+    
+    请求中 async=true 时在后台执行，立即返回job_id，通过 /api/jobs/<job_id> 获取结果
+    """
+    data = request.json
+    if data.get('async'):
+        return _submit_job('send_command', _dispatch_send_command, data)
+    result, http_status = _dispatch_send_command(data)
+    return jsonify(result), http_status
 
 @app.route('/api/camera/connect_ssh', methods=['POST'])
 def camera_connect_ssh():
-    """建立相机测试的SSH连接（进入camera tab时调用）"""
-    import paramiko
-    
+    """预先建立相机测试的SSH连接（进入camera tab时调用，连接放入共享连接池）"""
     data = request.json
     ssh_host = data.get('ssh_host')
     ssh_user = data.get('ssh_user') or config.SSH_USER
@@ -653,68 +290,54 @@ def camera_connect_ssh():
     if not ssh_host:
         return jsonify({"status": "error", "message": "未提供SSH主机地址"}), 400
     
-    with ssh_lock:
-        # 如果连接已存在，先关闭旧连接
-        if ssh_host in camera_ssh_connections:
-            try:
-                old_ssh = camera_ssh_connections[ssh_host]['ssh']
-                old_ssh.close()
-            except:
-                pass
-            del camera_ssh_connections[ssh_host]
-        
-        try:
-            # 建立新的SSH连接
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(
-                hostname=ssh_host,
-                username=ssh_user,
-                password=ssh_password,
-                timeout=config.SSH_TIMEOUT,
-                look_for_keys=False,
-                allow_agent=False
-            )
-            
-            # 保存连接
-            camera_ssh_connections[ssh_host] = {
-                'ssh': ssh,
-                'lock': threading.Lock()
-            }
-            
-            print(f"[相机测试] ✅ SSH连接已建立并保存: {ssh_host}")
-            return jsonify({"status": "success", "message": f"SSH连接已建立: {ssh_host}"})
-        except Exception as e:
-            print(f"[相机测试] ❌ SSH连接失败: {str(e)}")
-            return jsonify({"status": "error", "message": f"SSH连接失败: {str(e)}"}), 500
+    try:
+        ssh_pool.warm_up(ssh_host, ssh_user, ssh_password)
+        print(f"[相机测试] ✅ SSH连接已建立（连接池）: {ssh_host}")
+        return jsonify({"status": "success", "message": f"SSH连接已建立: {ssh_host}"})
+    except Exception as e:
+        print(f"[相机测试] ❌ SSH连接失败: {str(e)}")
+        return jsonify({"status": "error", "message": f"SSH连接失败: {str(e)}"}), 500
 
 @app.route('/api/camera/disconnect_ssh', methods=['POST'])
 def camera_disconnect_ssh():
-    """断开相机测试的SSH连接（退出camera tab时调用）"""
+    """退出camera tab时调用（连接由连接池统一管理，其他测试仍可复用，空闲超时后自动回收）"""
     data = request.json
     ssh_host = data.get('ssh_host')
     
     if not ssh_host:
         return jsonify({"status": "error", "message": "未提供SSH主机地址"}), 400
     
-    with ssh_lock:
-        if ssh_host in camera_ssh_connections:
-            try:
-                ssh = camera_ssh_connections[ssh_host]['ssh']
-                ssh.close()
-                print(f"[相机测试] 🔌 SSH连接已断开: {ssh_host}")
-            except Exception as e:
-                print(f"[相机测试] ⚠️ 断开SSH连接时出错: {str(e)}")
-            finally:
-                del camera_ssh_connections[ssh_host]
-            return jsonify({"status": "success", "message": f"SSH连接已断开: {ssh_host}"})
-        else:
-            return jsonify({"status": "success", "message": f"SSH连接不存在: {ssh_host}"})
+    print(f"[相机测试] 退出相机测试，SSH连接保留在连接池中: {ssh_host}")
+    return jsonify({"status": "success", "message": f"SSH连接由连接池管理，空闲{config.SSH_POOL_IDLE_TIMEOUT}秒后自动断开: {ssh_host}"})
 
-@app.route('/api/check_io', methods=['POST'])
-def check_io():
-    """检查IO信号状态（根据测试类型路由到对应的API处理器）"""
-    data = request.json
+def _dispatch_camera_check_all(data):
+    """同时检测车辆上所有相机/激光/TOF设备，返回 (结果字典, HTTP状态码)"""
+    ssh_host = data.get('ssh_host')
+    vehicle_model = data.get('vehicle_model') or 'X100'
+    # 默认检测该设备型号在相机TAB中显示的全部设备，IP默认值与 /api/test_data/camera 一致，页面上修改过的IP优先
+    devices = data.get('devices') or list(get_test_plan(vehicle_model).camera_devices)
+    ip_map = dict(config.get_camera_ip_map('X100'))
+    ip_map.update(data.get('ip_addresses') or {})
+    
+    result = apis.CameraAPI.check_all_devices(ssh_host, devices, ip_map, data.get('ssh_user'), data.get('ssh_password'), vehicle_model)
+    if result.get('status') == 'error':
+        return result, 400 if not ssh_host else 500
+    return result, 200
+
+@app.route('/api/camera/check_all', methods=['POST'])
+def camera_check_all():
+    """相机TAB一键检测：所有设备的ping和TOF订阅在同一SSH连接的多个通道上并发执行，返回汇总结果
+    
+    请求: {"ssh_host", "vehicle_model", "devices"（可选）, "ip_addresses": {设备ID: IP}（可选）, "async"（可选）}
+    """
+    data = request.json or {}
+    if data.get('async'):
+        return _submit_job('camera_check_all', _dispatch_camera_check_all, data)
+    result, http_status = _dispatch_camera_check_all(data)
+    return jsonify(result), http_status
+
+def _dispatch_check_io(data):
+    """根据测试类型把check_io请求路由到对应的API处理器，返回 (结果字典, HTTP状态码)"""
     item_id = data.get('item_id')
     test_id = data.get('test_id')  # 可选，用于确定使用哪个API处理器
     ssh_host = data.get('ssh_host')  # SSH主机地址
@@ -726,23 +349,15 @@ def check_io():
     if not test_id:
         if item_id in config.IO_INDEX_MAP:
             test_id = 'light'
-        elif vehicle_model:
-            # 如果有车型信息，检查是否在按键IO映射中
-            button_io_map = config.get_button_io_map(vehicle_model)
-            if item_id in button_io_map:
-                test_id = 'button'
-            else:
-                test_id = 'default'
+        elif any(item_id in io_map for io_map in config.BUTTON_IO_INDEX_MAP_BY_VEHICLE.values()):
+            # 按键测试项（车型未配置时由按键测试处理器返回未知车型的错误）
+            test_id = 'button'
         else:
-            # 如果没有车型信息，尝试使用默认X100的映射
-            default_button_map = config.get_button_io_map('X100')
-            if item_id in default_button_map:
-                test_id = 'button'
-            else:
-                test_id = 'default'
+            test_id = 'default'
     
     # 获取对应的API处理器
     api_handler = apis.get_api_handler(test_id)
+    started_at = time.time()
     
     # 调用对应的检查IO方法，传递SSH信息和车型信息
     if test_id in ['button', 'touch', 'display']:
@@ -753,311 +368,303 @@ def check_io():
         result = api_handler.check_io(item_id, ssh_host, ssh_user, ssh_password)
     elif test_id == 'camera':
         # 相机测试：检查是否是TOF测试项（使用订阅方式）
+        # SSH连接统一从连接池获取（进入camera tab时已预先建立）
         if item_id in ['front_tof', 'rear_tof']:
             # TOF测试：使用订阅方式
-            ssh_connection = None
-            use_existing_ssh = False
-            if ssh_host and ssh_host in camera_ssh_connections:
-                ssh_connection = camera_ssh_connections[ssh_host]['ssh']
-                use_existing_ssh = True
-            result = api_handler.check_tof_subscribe(item_id, ssh_host, ssh_user, ssh_password, vehicle_model, test_id, use_existing_ssh=use_existing_ssh, ssh_connection=ssh_connection)
+            result = api_handler.check_tof_subscribe(item_id, ssh_host, ssh_user, ssh_password, vehicle_model, test_id)
         else:
             # 其他相机测试：需要IP地址和SSH信息（通过SSH在远程设备上执行ping）
             ip_address = data.get('ip_address')
-            # 检查是否有已存在的SSH连接，如果有则传递SSH对象
-            ssh_connection = None
-            use_existing_ssh = False
-            if ssh_host and ssh_host in camera_ssh_connections:
-                ssh_connection = camera_ssh_connections[ssh_host]['ssh']
-                use_existing_ssh = True
-            result = api_handler.check_io(item_id, ssh_host, ssh_user, ssh_password, vehicle_model, test_id, ip_address, use_existing_ssh=use_existing_ssh, ssh_connection=ssh_connection)
+            result = api_handler.check_io(item_id, ssh_host, ssh_user, ssh_password, vehicle_model, test_id, ip_address)
     else:
         result = api_handler.check_io(item_id)
     
+    # 得到判定结果的检查写入结果存储（按键超时未按下记为异常；连接失败等错误不记录，页面会重试）
+    if result.get('test_status') in ('normal', 'abnormal'):
+        results_store.record([make_row(
+            'check_io', item_id, result['test_status'], category=test_id,
+            hostname=data.get('hostname'), carip=ssh_host, vehicle_model=vehicle_model,
+            elapsed=time.time() - started_at, data=result, recorded_at=started_at)])
+    
     if result.get('status') == 'error':
-        return jsonify(result), 400 if '未知' in result.get('message', '') else 500
-    return jsonify(result)
+        return result, 400 if '未知' in result.get('message', '') else 500
+    return result, 200
 
-@app.route('/api/submit_test', methods=['POST'])
-def submit_test():
+@app.route('/api/check_io', methods=['POST'])
+def check_io():
+    """检查IO信号状态（根据测试类型路由到对应的API处理器）
+    
+    请求中 async=true 时在后台执行，立即返回job_id，通过 /api/jobs/<job_id> 获取结果
+    """
     data = request.json
-    # 这里可以保存测试结果到数据库
-    print(f"收到测试结果: {data}")
-    return jsonify({"status": "success", "message": "测试结果已保存"})
+    if data.get('async'):
+        return _submit_job('check_io', _dispatch_check_io, data)
+    result, http_status = _dispatch_check_io(data)
+    return jsonify(result), http_status
 
-@app.route('/api/test_report', methods=['POST'])
-def get_test_report():
-    """获取测试报告数据"""
-    data = request.json
-    test_results = data.get('test_results', {})
-    vehicle_model = data.get('vehicle_model', 'X100')
-    hostname = data.get('hostname', '')
-    test_time = data.get('test_time', '')  # 获取前端传递的测试时间
+@app.route('/api/jobs')
+def list_jobs():
+    """列出后台任务（调试用）"""
+    return jsonify({
+        "status": "success",
+        "stats": job_manager.stats(),
+        "jobs": [job.to_dict() for job in job_manager.list_jobs()]
+    })
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """查询后台任务状态和结果
     
-    # 调试：打印接收到的测试结果
-    print(f"[报告调试] 接收到的测试结果: {test_results}")
-    print(f"[报告调试] 车型: {vehicle_model}")
-    print(f"[报告调试] 测试时间: {test_time}")
+    ?wait=N 长轮询：任务未完成时最多等待N秒（不超过JOB_LONG_POLL_TIMEOUT），完成后立即返回
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": f"任务不存在或已过期: {job_id}"}), 404
     
-    # 根据车型获取对应的测试类别
-    categories = get_categories_by_vehicle(vehicle_model)
+    wait = request.args.get('wait', type=float)
+    if wait and not job.done:
+        job.wait(min(wait, config.JOB_LONG_POLL_TIMEOUT))
     
-    # 构建报告数据
-    report_data = []
-    for category in categories:
-        category_id = category['id']
-        category_name = category['name']
-        category_results = test_results.get(category_id, {})
-        
-        # 调试：打印每个类别的结果
-        print(f"[报告调试] 类别 {category_id} ({category_name}) 的结果: {category_results}")
-        
-        # 获取该类别的测试详情
-        test_detail = test_data.TEST_DETAILS.get(category_id, {})
-        sections = test_detail.get('sections', [])
-        
-        # 根据测试类型过滤测试项
-        allowed_item_ids = None
-        if category_id == 'camera':
-            # 相机测试：只显示CSV配置中指定的设备
-            camera_devices = TABdisplayconfig.get_camera_devices_by_device_model(vehicle_model)
-            allowed_item_ids = set(camera_devices)
-            print(f"[报告调试] 相机测试允许的设备: {allowed_item_ids}")
-        elif category_id == 'button':
-            # 按键测试：只显示该车型允许的按钮
-            allowed_items = config.get_button_test_items(vehicle_model)
-            allowed_item_ids = set(allowed_items)
-            print(f"[报告调试] 按键测试允许的按钮: {allowed_item_ids}")
-        
-        for section in sections:
-            for item in section.get('items', []):
-                item_id = item['id']
-                
-                # 如果有限制列表，检查是否在允许列表中
-                if allowed_item_ids is not None:
-                    if item_id not in allowed_item_ids:
-                        print(f"[报告调试] 跳过未显示的测试项: {item_id}")
-                        continue
-                
-                item_name = item['name']
-                result = category_results.get(item_id, '未测试')
-                
-                # 调试：打印每个测试项的结果
-                print(f"[报告调试] 测试项 {item_id} ({item_name}): {result}")
-                
-                # 转换结果为中文
-                if result == 'normal':
-                    result_text = '正常'
-                elif result == 'abnormal':
-                    result_text = '异常'
-                else:
-                    result_text = '未测试'
-                
-                report_data.append({
-                    'category': category_name,
-                    'item': item_name,
-                    'result': result_text
-                })
+    return jsonify({"status": "success", **job.to_dict()})
+
+@app.route('/api/jobs/<job_id>/stream')
+def stream_job(job_id):
+    """以Server-Sent Events推送后台任务的状态变化，任务完成后推送result事件并结束"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": f"任务不存在或已过期: {job_id}"}), 404
+    
+    def generate():
+        version = -1
+        while True:
+            if job.version != version:
+                version = job.version
+                event = "result" if job.done else "status"
+                yield f"event: {event}\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+                if job.done:
+                    return
+            if not job.wait(15, since_version=version) and job.version == version:
+                yield ": keepalive\n\n"  # 保持连接，防止代理超时断开
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/events')
+def stream_events():
+    """实时事件推送（Server-Sent Events）
+    
+    事件类型：io（IO值变化）、ping（每个ping回包）、tof（TOF话题收到数据）、job（后台任务完成）、batch（批量测试项完成）
+    ?host=<车辆IP> 只接收该车辆的事件，?types=io,ping 只接收指定类型的事件
+    断线重连时浏览器自动携带Last-Event-ID，补发断线期间的事件
+    """
+    host = request.args.get('host') or None
+    types = [t for t in request.args.get('types', '').split(',') if t] or None
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    
+    # IO事件来自常驻订阅：订阅该车辆的IO话题（已订阅时直接复用）
+    if host and (types is None or 'io' in types):
+        get_io_subscriber(host)
     
+    subscription = event_bus.subscribe(host, types, last_event_id)
+    
+    def generate():
+        try:
+            yield "retry: 3000\n\n"  # 断线后3秒重连
+            while True:
+                event = subscription.get(timeout=config.EVENT_KEEPALIVE_INTERVAL)
+                if event is None:
+                    if host and (types is None or 'io' in types):
+                        get_io_subscriber(host)  # 浏览器仍在监听，保持IO订阅不因空闲被停止
+                    yield ": keepalive\n\n"  # 保持连接，防止代理超时断开
+                    continue
+                yield event_bus.format_sse(event)
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/batch_test', methods=['POST'])
+def start_batch_test():
+    """多车批量测试：对多台车辆同时执行相机/激光ping、TOF、系统信息、车辆ID检测
+    
+    请求: {"vehicles": [{"hostname": "车辆ID", "carip": "车辆IP", "vehiclemodel": "设备型号"}, ...],
+           "items": ["upper_camera", "system_info", ...]（可选，默认该车型全部可自动判定的测试项）}
+    立即返回batch_id，通过 /api/batch_test/<batch_id> 或 /api/events 的batch事件获取每个测试项的结果
+    """
+    data = request.json or {}
+    try:
+        run = orchestrator.start(data.get('vehicles') or [], data.get('items') or None,
+                                 data.get('ssh_user'), data.get('ssh_password'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({
+        "status": "accepted",
+        "batch_id": run.id,
+        "batch_url": f"/api/batch_test/{run.id}",
+        "progress": run.progress()
+    }), 202
+
+@app.route('/api/batch_test')
+def list_batch_tests():
+    """列出批量测试（只包含每台车辆的汇总结果）"""
     return jsonify({
-        'status': 'success',
-        'data': report_data,
-        'title': '机器人静态测试报告',
-        'vehicle_model': vehicle_model,
-        'hostname': hostname,
-        'test_time': test_time if test_time else '-'  # 使用前端传递的测试时间，如果没有则显示"-"
+        "status": "success",
+        "stats": orchestrator.stats(),
+        "batches": [run.to_dict(include_items=False) for run in orchestrator.list_runs()]
     })
 
+@app.route('/api/batch_test/<batch_id>')
+def get_batch_test(batch_id):
+    """查询批量测试的进度和每台车辆每个测试项的结果
+    
+    ?wait=N 长轮询：最多等待N秒（不超过JOB_LONG_POLL_TIMEOUT），有测试项完成或全部完成时立即返回
+    ?since=<version> 配合wait使用，只在版本号大于since时返回
+    """
+    run = orchestrator.get(batch_id)
+    if not run:
+        return jsonify({"status": "error", "message": f"批量测试不存在或已过期: {batch_id}"}), 404
+    
+    wait = request.args.get('wait', type=float)
+    if wait and not run.done:
+        run.wait(min(wait, config.JOB_LONG_POLL_TIMEOUT), since_version=request.args.get('since', type=int))
+    
+    return jsonify({"status": "success", "version": run.version, **run.to_dict()})
+
+@app.route('/api/batch_test/<batch_id>/report')
+def download_batch_report(batch_id):
+    """下载批量测试报告（Excel，每台车辆的每个测试项一行，未完成的测试项显示为未完成）"""
+    run = orchestrator.get(batch_id)
+    if not run:
+        return jsonify({"status": "error", "message": f"批量测试不存在或已过期: {batch_id}"}), 404
+    
+    writer = ReportWriter()
+    writer.write_batch_report(run.to_dict())
+    created = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime(run.created_at))
+    return send_file(
+        writer.save(),
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=f'机器人批量测试报告_{created}.xlsx'
+    )
+
+@app.route('/api/submit_test', methods=['POST'])
+def submit_test():
+    """保存页面的测试结果（请求体同 /api/test_report）
+
+    同一设备同一次测试（设备序列号+测试开始时间）重复提交时替换之前的记录，未测试的测试项不保存
+    """
+    data = request.json or {}
+    report = TestReport.from_request(data)
+    test_results = data.get('test_results') or {}
+    hostname = report.info['hostname']
+    test_time = report.info['test_time']
+    recorded_at = parse_time(test_time) or time.time()
+    session = f"submit:{hostname}:{test_time}" if test_time else None
+    rows = [
+        make_row('submit', item_id, test_results[category_id][item_id], category=category_id,
+                 hostname=hostname, vehicle_model=report.info['vehicle_model'], session=session,
+                 recorded_at=recorded_at)
+        for category_id, _, item_id, _, _ in report.rows
+        if test_results.get(category_id, {}).get(item_id) in ('normal', 'abnormal')
+    ]
+    results_store.record(rows, replace_session=session)
+    print(f"[结果存储] 收到 {hostname or '-'} 的测试结果: {len(rows)} 项")
+    return jsonify({"status": "success", "message": "测试结果已保存", "saved": len(rows)})
+
+def _result_filters():
+    """/api/results 的查询条件：过滤字段、时间范围（since/until 或最近 days 天）、分页"""
+    filters = {field: request.args.get(field) for field in FILTER_FIELDS if request.args.get(field)}
+    since = parse_time(request.args.get('since'))
+    until = parse_time(request.args.get('until'))
+    days = request.args.get('days', type=float)
+    if days and since is None:
+        since = time.time() - days * 86400
+    limit = min(request.args.get('limit', 100, type=int), config.RESULTS_QUERY_LIMIT)
+    return filters, since, until, max(limit, 1)
+
+@app.route('/api/results')
+def query_results():
+    """查询保存的测试结果，如 /api/results?item=front_tof&result=abnormal&days=7
+
+    过滤参数: hostname / carip / vehicle_model / family / category / item / result / source / session，
+    since / until（时间戳或 "2026-01-13"、"2026-01-13 11:13:20"），days，limit / offset
+    """
+    filters, since, until, limit = _result_filters()
+    rows, total = results_store.query(filters, since, until, limit, request.args.get('offset', 0, type=int))
+    return jsonify({"status": "success", "total": total, "count": len(rows), "results": rows})
+
+@app.route('/api/analytics')
+def query_analytics():
+    """测试结果汇总统计（从增量维护的汇总表读取），如 /api/analytics?group=family,item&category=camera&days=7
+
+    group: 分组维度 day / family / category / item（逗号分隔，默认 family,item），
+    过滤参数: family / category / item，since / until（日期，包含until当天）或 days（最近N天）
+    """
+    group_by = [field.strip() for field in request.args.get('group', 'family,item').split(',') if field.strip()]
+    unknown = [field for field in group_by if field not in analytics.GROUP_FIELDS]
+    if unknown:
+        return jsonify({"status": "error", "message": f"未知的分组维度: {', '.join(unknown)}（支持: {', '.join(analytics.GROUP_FIELDS)}）"}), 400
+    filters = {field: request.args.get(field) for field in analytics.GROUP_FIELDS if request.args.get(field)}
+    since = request.args.get('since')
+    days = request.args.get('days', type=int)
+    if days and not since:
+        since = time.strftime('%Y-%m-%d', time.localtime(time.time() - (days - 1) * 86400))
+    groups = analytics.query(group_by, filters, since, request.args.get('until'))
+    return jsonify({"status": "success", "group": group_by, "since": since, "count": len(groups), "groups": groups})
+
+@app.route('/api/results/failures')
+def query_failures():
+    """按设备汇总异常的测试结果，如 /api/results/failures?item=front_tof&days=7（本周front_tof异常的车辆）"""
+    filters, since, until, limit = _result_filters()
+    vehicles = results_store.failures(filters, since, until, limit)
+    return jsonify({"status": "success", "count": len(vehicles), "vehicles": vehicles})
+
+@app.route('/api/test_report', methods=['POST'])
+def get_test_report():
+    """获取测试报告数据"""
+    data = request.json or {}
+    report = TestReport.from_request(data)
+    print(f"[报告] 车型: {report.info['vehicle_model']}, 测试时间: {report.info['test_time']}, 结果统计: {report.summary()}")
+    return jsonify(report.to_dict())
+
 @app.route('/api/download_report', methods=['POST'])
 def download_report():
-    """下载测试报告为Excel文件"""
+    """下载测试报告（format: xlsx（默认）/csv/json）"""
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill
-        
-        data = request.json
-        test_results = data.get('test_results', {})
-        vehicle_model = data.get('vehicle_model', 'X100')
-        hostname = data.get('hostname', '')
-        test_time = data.get('test_time', '')  # 获取前端传递的测试时间
-        
-        # 如果没有传递测试时间，使用"-"
-        if not test_time:
-            test_time = '-'
-        
-        # 根据车型获取对应的测试类别
-        categories = get_categories_by_vehicle(vehicle_model)
-        
-        # 创建Excel工作簿
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "测试报告"
-        
-        # 设置标题
-        ws.merge_cells('A1:C1')
-        title_cell = ws['A1']
-        title_cell.value = '机器人静态测试报告'
-        title_cell.font = Font(size=16, bold=True)
-        title_cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # 使用前端传递的测试时间（已在上面处理）
-        
-        # 信息区域样式
-        info_label_font = Font(bold=True, size=12)
-        info_value_font = Font(size=12)
-        
-        # 信息区域对齐样式
-        info_alignment = Alignment(horizontal='center', vertical='center')
-        
-        # 型号
-        ws['A3'] = '型号:'
-        ws['A3'].font = info_label_font
-        ws['A3'].alignment = info_alignment
-        ws['B3'] = vehicle_model
-        ws['B3'].font = info_value_font
-        ws['B3'].alignment = info_alignment
-        
-        # 软件版本（从请求中获取APP_VERSION）
-        app_version = data.get('app_version', '-')
-        ws['A4'] = '软件版本:'
-        ws['A4'].font = info_label_font
-        ws['A4'].alignment = info_alignment
-        ws['B4'] = app_version if app_version else '-'
-        ws['B4'].font = info_value_font
-        ws['B4'].alignment = info_alignment
-        
-        # 设备序列号
-        ws['A5'] = '设备序列号:'
-        ws['A5'].font = info_label_font
-        ws['A5'].alignment = info_alignment
-        ws['B5'] = hostname if hostname else '-'
-        ws['B5'].font = info_value_font
-        ws['B5'].alignment = info_alignment
-        
-        # 测试时间
-        ws['A6'] = '测试时间:'
-        ws['A6'].font = info_label_font
-        ws['A6'].alignment = info_alignment
-        ws['B6'] = test_time
-        ws['B6'].font = info_value_font
-        ws['B6'].alignment = info_alignment
-        
-        # 测试人员
-        tester = data.get('tester', '张三')
-        ws['A7'] = '测试人员:'
-        ws['A7'].font = info_label_font
-        ws['A7'].alignment = info_alignment
-        ws['B7'] = tester
-        ws['B7'].font = info_value_font
-        ws['B7'].alignment = info_alignment
-        
-        # 设置表格表头
-        headers = ['测试类别', '测试项', '测试结果']
-        ws.append([])  # 空行（第8行）
-        ws.append(headers)  # 第9行
-        
-        # 设置表头样式
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for col in range(1, 4):
-            cell = ws.cell(row=9, column=col)  # 表格表头在第9行
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # 填充数据
-        row_num = 10  # 数据从第10行开始
-        for category in categories:
-            category_id = category['id']
-            category_name = category['name']
-            category_results = test_results.get(category_id, {})
-            
-            # 获取该类别的测试详情
-            test_detail = test_data.TEST_DETAILS.get(category_id, {})
-            sections = test_detail.get('sections', [])
-            
-            # 根据测试类型过滤测试项
-            allowed_item_ids = None
-            if category_id == 'camera':
-                # 相机测试：只显示CSV配置中指定的设备
-                camera_devices = TABdisplayconfig.get_camera_devices_by_device_model(vehicle_model)
-                allowed_item_ids = set(camera_devices)
-            elif category_id == 'button':
-                # 按键测试：只显示该车型允许的按钮
-                allowed_items = config.get_button_test_items(vehicle_model)
-                allowed_item_ids = set(allowed_items)
-            
-            for section in sections:
-                for item in section.get('items', []):
-                    item_id = item['id']
-                    
-                    # 如果有限制列表，检查是否在允许列表中
-                    if allowed_item_ids is not None:
-                        if item_id not in allowed_item_ids:
-                            continue  # 跳过未显示的测试项
-                    
-                    item_name = item['name']
-                    result = category_results.get(item_id, '未测试')
-                    
-                    # 转换结果为中文
-                    if result == 'normal':
-                        result_text = '正常'
-                    elif result == 'abnormal':
-                        result_text = '异常'
-                    else:
-                        result_text = '未测试'
-                    
-                    ws.append([category_name, item_name, result_text])
-                    
-                    # 设置结果列颜色
-                    result_cell = ws.cell(row=row_num, column=3)
-                    if result_text == '正常':
-                        result_cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                    elif result_text == '异常':
-                        result_cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-                    
-                    row_num += 1
-        
-        # 调整列宽
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 30
-        ws.column_dimensions['C'].width = 15
-        
-        # 设置对齐方式
-        for row in ws.iter_rows(min_row=5, max_row=row_num-1):
-            for cell in row:
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # 保存到内存
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # 生成文件名，使用测试开始时间戳（如果有），否则使用当前时间
-        test_time = data.get('test_time', '')  # 获取前端传递的测试时间
-        if test_time and test_time != '-':
-            # 将格式从 "2026-01-13 11:13:20" 转换为 "2026-01-13_11-13-20"（文件名中不能有冒号）
-            time_str = test_time.replace(' ', '_').replace(':', '-')
-        else:
-            # 如果没有测试开始时间，使用当前时间
-            time_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f'机器人静态测试报告_{vehicle_model}_{time_str}.xlsx'
-        
+        data = request.json or {}
+        fmt = data.get('format', 'xlsx')
+        report = TestReport.from_request(data)
+        # 报告流式写入临时文件，直接作为响应返回
         return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            report_pipeline.render(report, fmt),
+            mimetype=report_pipeline.REPORT_FORMATS[fmt],
             as_attachment=True,
-            download_name=filename
+            download_name=report.filename(fmt)
         )
+    except ReportError as e:
+        return jsonify({"status": "error", "message": str(e)}), e.status
     except Exception as e:
         return jsonify({"status": "error", "message": f"生成报告失败: {str(e)}"}), 500
 
+@app.route('/api/publish_report', methods=['POST'])
+def publish_report():
+    """在服务端生成测试报告并保存到report文件夹，upload为true时再上传到飞书云文档（请求体同 /api/download_report）"""
+    try:
+        data = request.json or {}
+        report = TestReport.from_request(data)
+        return jsonify(report_pipeline.publish(report, data.get('format', 'xlsx'), bool(data.get('upload'))))
+    except ReportError as e:
+        print(f"[云端同步] 失败: {e}")
+        return jsonify({"status": "error", "message": str(e)}), e.status
+    except Exception as e:
+        print(f"[云端同步] 失败: {str(e)}")
+        return jsonify({"status": "error", "message": f"保存报告失败: {str(e)}"}), 500
+
 @app.route('/api/save_report', methods=['POST'])
 def save_report():
-    """保存测试报告到本地report文件夹"""
+    """保存浏览器上传的报告文件到本地report文件夹（页面已改用 /api/publish_report 在服务端生成，保留给旧版页面）"""
     try:
-        import os
-        
         # 检查是否有文件
         if 'file' not in request.files:
             return jsonify({"status": "error", "message": "未找到文件"}), 400
@@ -1068,22 +675,13 @@ def save_report():
         if not cloudname:
             return jsonify({"status": "error", "message": "缺少文件名参数"}), 400
         
-        # 获取项目根目录
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        report_dir = os.path.join(base_dir, 'report')
-        
-        # 确保report目录存在
-        if not os.path.exists(report_dir):
-            os.makedirs(report_dir)
-            print(f"[保存报告] 创建report目录: {report_dir}")
+        report_dir = report_pipeline.report_dir()
+        os.makedirs(report_dir, exist_ok=True)
         
-        # 文件完整路径
+        # 文件完整路径（只取文件名，不能写到report目录之外）
+        cloudname = os.path.basename(cloudname)
         file_path = os.path.join(report_dir, cloudname)
-        
-        # 保存文件
         file.save(file_path)
-        
-        # 获取文件大小
         cloudsize = os.path.getsize(file_path)
         
         print(f"[保存报告] 文件已保存: {file_path}, 大小: {cloudsize}字节")
@@ -1100,89 +698,74 @@ def save_report():
 
 @app.route('/api/upload_to_cloud', methods=['POST'])
 def upload_to_cloud():
-    """上传测试报告到飞书云文档"""
+    """上传report文件夹中已保存的测试报告到飞书云文档"""
+    data = request.json or {}
+    cloudname = data.get('cloudname')  # 文件名（含后缀）
+    cloudsize = data.get('cloudsize')  # 文件大小（字节）
+    
+    if not cloudname or not cloudsize:
+        return jsonify({"status": "error", "message": "缺少文件名或文件大小参数"}), 400
+    
     try:
-        import os
-        import subprocess
-        
-        data = request.json
-        cloudname = data.get('cloudname')  # 文件名（含后缀）
-        cloudsize = data.get('cloudsize')  # 文件大小（字节）
-        
-        if not cloudname or not cloudsize:
-            return jsonify({"status": "error", "message": "缺少文件名或文件大小参数"}), 400
-        
-        # 获取项目根目录
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        report_dir = os.path.join(base_dir, 'report')
-        
-        # 文件完整路径
-        file_path = os.path.join(report_dir, cloudname)
-        
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            return jsonify({"status": "error", "message": f"文件不存在: {file_path}"}), 400
-        
-        # 验证文件大小
-        actual_size = os.path.getsize(file_path)
-        if actual_size != cloudsize:
-            print(f"[云端同步] ⚠️ 文件大小不匹配: 预期{cloudsize}字节，实际{actual_size}字节，使用实际大小")
-            cloudsize = actual_size
-        
-        print(f"[云端同步] 准备上传文件: {cloudname}, 大小: {cloudsize}字节, 路径: {file_path}")
-        
-        # 执行上传脚本
-        script_path = os.path.join(base_dir, 'fs_files_upload.py')
-        if not os.path.exists(script_path):
-            return jsonify({"status": "error", "message": f"上传脚本不存在: {script_path}"}), 500
-        
-        # 调用Python脚本，传递参数
-        try:
-            result = subprocess.run(
-                ['python', script_path, cloudname, str(cloudsize)],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                cwd=base_dir
-            )
-            
-            print(f"[云端同步] 脚本执行完成，返回码: {result.returncode}")
-            print(f"[云端同步] 脚本输出:\n{result.stdout}")
-            if result.stderr:
-                print(f"[云端同步] 脚本错误输出:\n{result.stderr}")
-            
-            if result.returncode == 0:
-                return jsonify({
-                    "status": "success",
-                    "message": f"文件已成功上传到云端: {cloudname}",
-                    "output": result.stdout
-                })
-            else:
-                return jsonify({
-                    "status": "error",
-                    "message": f"上传脚本执行失败: {result.stderr or result.stdout}",
-                    "output": result.stdout,
-                    "error": result.stderr
-                }), 500
-                
-        except subprocess.TimeoutExpired:
-            return jsonify({"status": "error", "message": "上传脚本执行超时"}), 500
-        except Exception as e:
-            return jsonify({"status": "error", "message": f"执行上传脚本失败: {str(e)}"}), 500
-        print(f"[云端同步] 文件大小: {len(file_content)} 字节")
-        print(f"[云端同步] 目标文件夹: https://thundersoft.feishu.cn/drive/folder/K5RAfwXaNl0Mc2dmp5dcpmFinKb")
-        
-        # 临时方案：保存文件到本地，提示用户手动上传
-        # 或者返回文件夹链接，让用户手动上传
-        
-        return jsonify({
-            "status": "success",
-            "message": f"报告已准备上传\n文件名: {filename}\n请访问以下链接手动上传:\nhttps://thundersoft.feishu.cn/drive/folder/K5RAfwXaNl0Mc2dmp5dcpmFinKb"
-        })
-        
+        output = report_pipeline.upload(cloudname, cloudsize)
+    except ReportError as e:
+        return jsonify({"status": "error", "message": str(e)}), e.status
+    return jsonify({
+        "status": "success",
+        "message": f"文件已成功上传到云端: {cloudname}",
+        "output": output
+    })
+
+# 服务状态（用于就绪检查和优雅退出）
+_service_state = {"started_at": time.time(), "shutting_down": False}
+
+@app.route('/api/ready')
+def readiness():
+    """就绪检查：服务已加载配置、可以接收测试请求时返回200，正在退出时返回503"""
+    checks = {}
+    try:
+        checks["tab_config"] = bool(TABdisplayconfig.load_tab_config_from_csv())
     except Exception as e:
-        print(f"[云端同步] 上传失败: {str(e)}")
-        return jsonify({"status": "error", "message": f"上传失败: {str(e)}"}), 500
+        checks["tab_config"] = False
+        print(f"[就绪检查] TAB配置加载失败: {e}")
+    checks["accepting_jobs"] = not _service_state["shutting_down"]
+    
+    ready = all(checks.values())
+    return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "uptime": round(time.time() - _service_state["started_at"], 1),
+        "ssh_pool": ssh_pool.stats(),
+        "jobs": job_manager.stats(),
+        "batch": orchestrator.stats(),
+        "events": event_bus.stats(),
+        "config": config_store.stats(),
+        "test_plans": test_plans.stats(),
+        "results": results_store.stats()
+    }), 200 if ready else 503
+
+def shutdown_services(timeout=None):
+    """优雅退出：停止接收后台任务，停止IO订阅，关闭连接池中的所有SSH连接"""
+    if _service_state["shutting_down"]:
+        return
+    _service_state["shutting_down"] = True
+    timeout = config.SERVE_SHUTDOWN_TIMEOUT if timeout is None else timeout
+    print(f"[服务] 正在退出，等待正在执行的后台任务（最多{timeout}秒）...")
+    
+    job_manager.shutdown(wait=False)
+    orchestrator.shutdown(wait=False)
+    deadline = time.time() + timeout
+    while job_manager.stats()["jobs"].get("running") and time.time() < deadline:
+        time.sleep(0.2)
+    
+    stop_all_subscribers()
+    ssh_pool.close_all()
+    results_store.close()
+    print(f"[服务] 已退出")
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # 本地开发调试入口；生产环境请使用 python serve.py
+    try:
+        app.run(debug=config.FLASK_DEBUG, host=config.SERVE_HOST, port=config.SERVE_PORT, threaded=True)
+    finally:
+        shutdown_services(timeout=0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+int_data解析器性能测试脚本
+用模拟的rostopic echo输出对比两种解析方式：
+1. 旧方式：每次recv后把数据追加到all_output，再对整个all_output执行re.findall
+2. IntDataStreamParser：按块增量解析，每个int_data只解析一次
+
+用法: python bench_int_data_parser.py [帧数] [每次recv的字节数]
+"""
+
+import random
+import re
+import sys
+import time
+
+from apis.int_data_parser import IntDataStreamParser
+
+
+def make_rostopic_output(frame_count, io_count=32):
+    """生成模拟的 rostopic echo /Dev_input_output 输出"""
+    random.seed(0)
+    parts = []
+    for seq in range(frame_count):
+        values = ', '.join(str(random.choice((0, 1))) for _ in range(io_count))
+        parts.append(
+            "header: \n"
+            f"  seq: {seq}\n"
+            "  stamp: \n"
+            f"    secs: {1700000000 + seq // 10}\n"
+            f"    nsecs: {seq % 10 * 100000000}\n"
+            "  frame_id: ''\n"
+            f"int_data: [{values}]\n"
+            "float_data: []\n"
+            "---\n"
+        )
+    return ''.join(parts).encode('utf-8')
+
+
+def split_chunks(data, chunk_size):
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def bench_findall(chunks):
+    """旧方式：累积全部输出，每块都重新findall"""
+    all_output = ""
+    int_data = None
+    for chunk in chunks:
+        all_output += chunk.decode('utf-8', errors='ignore')
+        matches = re.findall(r'int_data:\s*\[([0-9, \n]*)\]', all_output, re.MULTILINE | re.DOTALL)
+        for int_data_str in reversed(matches):
+            int_data_str = int_data_str.replace('\n', ' ').strip()
+            if int_data_str:
+                int_data = [int(x.strip()) for x in int_data_str.split(',') if x.strip()]
+                break
+    return int_data
+
+
+def bench_stream(chunks):
+    """增量解析：每块只扫描新数据"""
+    parser = IntDataStreamParser()
+    int_data = None
+    for chunk in chunks:
+        for frame in parser.feed(chunk):
+            int_data = frame
+    return int_data, parser.frames_parsed
+
+
+def run(frame_count, chunk_size):
+    data = make_rostopic_output(frame_count)
+    chunks = split_chunks(data, chunk_size)
+    print(f"帧数: {frame_count}, 数据量: {len(data) / 1024:.1f} KB, recv块大小: {chunk_size}字节, 块数: {len(chunks)}")
+
+    start = time.perf_counter()
+    old_last = bench_findall(chunks)
+    old_time = time.perf_counter() - start
+    print(f"  re.findall(累积输出):   {old_time * 1000:10.2f} ms")
+
+    start = time.perf_counter()
+    new_last, parsed = bench_stream(chunks)
+    new_time = time.perf_counter() - start
+    print(f"  IntDataStreamParser:    {new_time * 1000:10.2f} ms（解析出{parsed}帧）")
+
+    if old_last != new_last:
+        print("  ✗ 两种方式解析出的最后一帧不一致！")
+        return False
+    print(f"  ✓ 结果一致，提速 {old_time / new_time if new_time else float('inf'):.1f} 倍")
+    return True
+
+
+if __name__ == '__main__':
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300  # 约30秒、10Hz的话题数据
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 256  # 话题按消息发布，channel.recv(4096)实际每次约返回一条消息
+
+    ok = True
+    for count in (frame_count // 10, frame_count, frame_count * 4):
+        ok = run(count, chunk_size) and ok
+        print("-" * 60)
+    sys.exit(0 if ok else 1)
@@ -46,8 +46,25 @@ def check_mapping():
     
     return all_missing
 
+def check_csv_mapping():
+    """打印devices_data.csv编译后的按钮映射（按测试项ID）和共用IO索引的冲突报告"""
+    from test_data.button_mapping import get_button_mapping_table
+    table = get_button_mapping_table()
+    
+    print("\ndevices_data.csv 编译后的按钮映射:")
+    for vehicle in sorted(table.families):
+        mapping = table.get(vehicle)
+        print(f"\n{vehicle}（列: {mapping.column}）:")
+        for item_id, entry in sorted(mapping.by_item_id.items()):
+            print(f"    {item_id}: IO索引{entry['io_index']}（{entry['button_name']}）")
+        for io_index, names in sorted(mapping.conflicts['shared_index'].items()):
+            print(f"  ⚠️ IO索引{io_index} 由多个按钮共用: {', '.join(names)}")
+        for name, indexes in mapping.conflicts['duplicate_name'].items():
+            print(f"  ⚠️ 按钮 '{name}' 出现在多个IO索引: {indexes}")
+
 if __name__ == '__main__':
     missing = check_mapping()
+    check_csv_mapping()
     if missing:
         print("\n⚠️ 发现缺失的映射，需要检查CSV文件或补充配置")
     else:
@@ -0,0 +1,208 @@
+# 配置编译
+# 部署前运行：校验所有配置来源（test_data下的CSV、config.py中的映射、test_data测试数据模块），
+# 校验通过后生成预编译配置包（config.CONFIG_BUNDLE_PATH），服务启动时一次读取，不再逐行解析CSV。
+# 存在错误时不生成配置包并返回非0退出码，避免错误的映射在按下按钮时才被发现
+#
+# 用法：
+#   python compile_config.py                 # 校验并生成配置包
+#   python compile_config.py --check         # 只校验，不生成配置包
+#   python compile_config.py -o other.bin    # 指定输出路径
+
+import argparse
+import contextlib
+import hashlib
+import io
+import ipaddress
+import os
+import sys
+
+import config
+import test_data
+from test_data import TABdisplayconfig, csv_loader, io_maps
+from test_data import button_mapping, vehicle_catalog  # 注册按钮映射和设备型号目录
+from test_data.config_bundle import build_bundle, write_bundle
+from test_data.config_store import config_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="校验配置并生成预编译配置包")
+    parser.add_argument("-o", "--output", default=config.CONFIG_BUNDLE_PATH,
+                        help="配置包输出路径（默认: %(default)s）")
+    parser.add_argument("--check", action="store_true", help="只校验，不生成配置包")
+    parser.add_argument("-v", "--verbose", action="store_true", help="显示解析过程中的日志")
+    return parser.parse_args()
+
+
+def _test_item_ids():
+    """{测试类别ID: 测试项ID集合}"""
+    return {
+        test_id: {item.get('id') for section in detail.get('sections', []) for item in section.get('items', [])}
+        for test_id, detail in test_data.TEST_DETAILS.items()
+    }
+
+
+def validate_test_data(errors, warnings):
+    """test_data 测试数据模块：类别完整、测试项有id和名称、同一类别内id不重复"""
+    for category in test_data.TEST_CATEGORIES:
+        if category['id'] not in test_data.TEST_DETAILS:
+            errors.append(f"test_data: 测试类别 {category['id']} 没有测试数据")
+    for test_id, detail in test_data.TEST_DETAILS.items():
+        seen = set()
+        for section in detail.get('sections', []):
+            for item in section.get('items', []):
+                if not item.get('id') or not item.get('name'):
+                    errors.append(f"test_data/{test_id}: 测试项缺少id或name: {item}")
+                elif item['id'] in seen:
+                    errors.append(f"test_data/{test_id}: 测试项ID重复: {item['id']}")
+                seen.add(item.get('id'))
+
+
+def validate_config_maps(errors, warnings):
+    """config.py 中的映射：引用的测试项存在、IO索引为非负整数、IP地址合法"""
+    item_ids = _test_item_ids()
+    io_maps = [
+        ('BUTTON_IO_INDEX_MAP_BY_VEHICLE', config.BUTTON_IO_INDEX_MAP_BY_VEHICLE, 'button'),
+        ('TOUCH_IO_INDEX_MAP_BY_VEHICLE', config.TOUCH_IO_INDEX_MAP_BY_VEHICLE, 'touch'),
+        ('DISPLAY_IO_INDEX_MAP_BY_VEHICLE', config.DISPLAY_IO_INDEX_MAP_BY_VEHICLE, 'display'),
+    ]
+    for map_name, maps, test_id in io_maps:
+        for vehicle, io_map in maps.items():
+            for item_id, io_index in io_map.items():
+                if item_id not in item_ids[test_id]:
+                    errors.append(f"config.{map_name}[{vehicle}]: 未知的测试项 {item_id}")
+                if not isinstance(io_index, int) or io_index < 0:
+                    errors.append(f"config.{map_name}[{vehicle}][{item_id}]: IO索引必须是非负整数，当前为 {io_index!r}")
+    for vehicle, items in config.BUTTON_TEST_ITEMS_BY_VEHICLE.items():
+        for item_id in items:
+            if item_id not in item_ids['button']:
+                errors.append(f"config.BUTTON_TEST_ITEMS_BY_VEHICLE[{vehicle}]: 未知的按键测试项 {item_id}")
+    for vehicle, ip_map in config.CAMERA_IP_MAP_BY_VEHICLE.items():
+        for device_id, ip in ip_map.items():
+            if device_id not in item_ids['camera']:
+                errors.append(f"config.CAMERA_IP_MAP_BY_VEHICLE[{vehicle}]: 未知的设备 {device_id}")
+            try:
+                ipaddress.ip_address(ip)
+            except ValueError:
+                errors.append(f"config.CAMERA_IP_MAP_BY_VEHICLE[{vehicle}][{device_id}]: IP地址不合法: {ip!r}")
+    categories = {category['id'] for category in test_data.TEST_CATEGORIES}
+    for vehicle, tab_ids in config.VEHICLE_TAB_CONFIG.items():
+        for tab_id in tab_ids:
+            if tab_id not in categories:
+                errors.append(f"config.VEHICLE_TAB_CONFIG[{vehicle}]: 未知的测试类别 {tab_id}")
+    for map_name, command_map, test_id in [('COMMAND_MAP', config.COMMAND_MAP, 'light'),
+                                           ('VOICE_COMMAND_MAP', config.VOICE_COMMAND_MAP, 'voice')]:
+        for item_id in sorted(item_ids[test_id] - set(command_map)):
+            warnings.append(f"config.{map_name}: 测试项 {item_id} 没有配置指令")
+    # 电机指令按高度/角度分组，每组都需要包含全部测试项（旋转电机的归零使用单独的指令）
+    motor_maps = [
+        ('LIFT_MOTOR_COMMAND_MAP', config.LIFT_MOTOR_COMMAND_MAP, item_ids['lift_motor'], config.LIFT_MOTOR_DEFAULT_HEIGHT),
+        ('ROTATION_MOTOR_COMMAND_MAP', config.ROTATION_MOTOR_COMMAND_MAP, item_ids['rotation_motor'] - {'reset'},
+         config.ROTATION_MOTOR_DEFAULT_ANGLE),
+    ]
+    for map_name, command_maps, expected, default in motor_maps:
+        if default not in command_maps:
+            errors.append(f"config.{map_name}: 没有默认参数 {default} 的指令")
+        for param, command_map in command_maps.items():
+            for item_id in sorted(expected - set(command_map)):
+                errors.append(f"config.{map_name}[{param}]: 测试项 {item_id} 没有配置指令")
+
+
+def validate_tab_csv(errors, warnings):
+    """TABdisplay_data.csv：每个型号都有TAB，TAB名称和相机设备名称可识别，型号不重复"""
+    rows = csv_loader.load_rows(TABdisplayconfig.CSV_FILE_PATH)
+    seen = set()
+    for line_no, row in enumerate(rows[1:], start=2):
+        if not row or not row[0].strip():
+            continue
+        device_model = row[0].strip()
+        if device_model in seen:
+            warnings.append(f"TABdisplay_data.csv 第{line_no}行: 型号 {device_model} 重复，使用最后一行的配置")
+        seen.add(device_model)
+        tab_lines = [line.strip() for line in (row[1] if len(row) > 1 else '').split('\n') if line.strip()]
+        if not tab_lines:
+            errors.append(f"TABdisplay_data.csv 第{line_no}行: 型号 {device_model} 没有配置TAB")
+        for tab_line in tab_lines:
+            if tab_line.startswith("相机/激光/TOF测试"):
+                device_desc = tab_line.split("--", 1)[1] if "--" in tab_line else ""
+                for name in (name.strip() for name in device_desc.split("/")):
+                    known = name in TABdisplayconfig.CAMERA_DEVICE_NAME_TO_ID or any(
+                        prefix in name and kind in name for prefix in ("上下", "前后") for kind in ("相机", "激光", "TOF"))
+                    if name and not known:
+                        errors.append(f"TABdisplay_data.csv 第{line_no}行: 型号 {device_model} 的相机设备名称无法识别: {name}")
+            elif tab_line not in TABdisplayconfig.TAB_NAME_TO_ID:
+                errors.append(f"TABdisplay_data.csv 第{line_no}行: 型号 {device_model} 的TAB名称无法识别: {tab_line}")
+
+
+def validate_button_mapping(errors, warnings):
+    """devices_data.csv：每个车型显示的按键/触边测试项都能找到IO索引，同一按钮不能出现在多个IO索引，
+    生成的IO信号映射（test_data/io_maps.py）与CSV一致"""
+    with open(button_mapping.CSV_FILE_PATH, 'rb') as f:
+        if hashlib.sha1(f.read()).hexdigest() != io_maps.SOURCE_SHA1:
+            errors.append("test_data/io_maps.py: 不是由当前的 devices_data.csv 生成的，请运行 python parse_vehicle_mapping.py 重新生成")
+    table = config_store.get('button_mapping')
+    if table is None:
+        errors.append("devices_data.csv: 按钮映射加载失败")
+        return
+    touch_items = _test_item_ids()['touch']
+    for family, mapping in table.families.items():
+        expected = list(config.BUTTON_TEST_ITEMS_BY_VEHICLE.get(family, [])) + sorted(touch_items)
+        fallback = dict(config.BUTTON_IO_INDEX_MAP_BY_VEHICLE.get(family, {}))
+        fallback.update(config.TOUCH_IO_INDEX_MAP_BY_VEHICLE.get(family, {}))
+        for item_id in expected:
+            if item_id not in mapping.by_item_id and item_id not in fallback:
+                errors.append(f"devices_data.csv[{family}]: 测试项 {item_id} 在CSV和config.py中都没有IO索引")
+        for name, indexes in mapping.conflicts['duplicate_name'].items():
+            errors.append(f"devices_data.csv[{family}]: 按钮 '{name}' 出现在多个IO索引 {indexes}")
+        for io_index, names in mapping.conflicts['shared_index'].items():
+            warnings.append(f"devices_data.csv[{family}]: IO索引 {io_index} 由多个按钮共用: {' '.join(names)}")
+    for family in config.BUTTON_TEST_ITEMS_BY_VEHICLE:
+        if family not in table.families:
+            warnings.append(f"devices_data.csv: 没有车型 {family} 的列，按键测试将使用config.py中的IO映射")
+
+
+VALIDATORS = [validate_test_data, validate_config_maps, validate_tab_csv, validate_button_mapping]
+
+
+def validate_all(verbose=False):
+    """运行全部校验，返回 (错误列表, 警告列表)"""
+    errors, warnings = [], []
+    # 解析过程会逐行打印调试日志，默认不显示
+    output = io.StringIO()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        config_store.reload_if_changed(force=True)
+        for name, entry in config_store.entries().items():
+            if entry.error:
+                errors.append(f"{os.path.basename(entry.path)}（{name}）: 解析失败: {entry.error}")
+        for validator in VALIDATORS:
+            validator(errors, warnings)
+    return errors, warnings
+
+
+def main():
+    args = parse_args()
+    errors, warnings = validate_all(args.verbose)
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+    for error in errors:
+        print(f"❌ {error}")
+    if errors:
+        print(f"\n配置校验失败：{len(errors)} 个错误，{len(warnings)} 个警告，未生成配置包")
+        return 1
+    print(f"\n配置校验通过（{len(warnings)} 个警告）")
+    if args.check:
+        return 0
+
+    output = args.output if os.path.isabs(args.output) else os.path.join(BASE_DIR, args.output)
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        bundle = build_bundle()
+    size = write_bundle(bundle, output)
+    print(f"已生成配置包: {output}（版本 {bundle['version']}，{size} 字节）")
+    for name, source in bundle['sources'].items():
+        print(f"  - {name}: {source['path']} sha1={source['sha1'][:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,4 @@
 # 测试系统配置文件
-import re
 
 # IO检查超时时间（秒）
 IO_CHECK_TIMEOUT = 30
@@ -24,69 +23,35 @@ IO_INDEX_MAP = {
     "clearance_light": 4 # 示廓灯对应的IO索引（请根据实际情况修改）
 }
 
-# 按键测试IO信号索引映射（按车型配置）
-# 格式：车型 -> {按钮ID: IO索引}
-# 注意：此配置由parse_vehicle_mapping.py自动生成
-BUTTON_IO_INDEX_MAP_BY_VEHICLE = {
-    "X060": {
-        "front_right_confirm": 4,      # 右前确认按钮对应的IO索引
-        "back_right_confirm": 11,      # 右后确认按钮对应的IO索引
-        "front_right_maintenance": 2,      # 右前维修按钮对应的IO索引
-        "back_right_maintenance": 9,      # 右后维修按钮对应的IO索引
-        "back_right_emergency": 10,      # 右后急停按钮对应的IO索引
-        "front_left_emergency": 3,      # 左前急停按钮对应的IO索引
-    },
-    "X080": {
-        "front_right_confirm": 4,      # 右前确认按钮对应的IO索引
-        "back_right_confirm": 11,      # 右后确认按钮对应的IO索引
-        "front_right_maintenance": 2,      # 右前维修按钮对应的IO索引
-        "back_right_maintenance": 9,      # 右后维修按钮对应的IO索引
-        "back_right_emergency": 10,      # 右后急停按钮对应的IO索引
-        "front_left_emergency": 3,      # 左前急停按钮对应的IO索引
-    },
-    "X100": {
-        "front_right_confirm": 3,      # 右前确认按钮对应的IO索引
-        "back_right_confirm": 9,      # 右后确认按钮对应的IO索引
-        "front_right_maintenance": 1,      # 右前维修按钮对应的IO索引
-        "back_right_maintenance": 11,      # 右后维修按钮对应的IO索引
-        "front_right_emergency": 7,      # 右前急停按钮对应的IO索引
-        "back_right_emergency": 7,      # 右后急停按钮对应的IO索引
-        "back_left_emergency": 7,      # 左后急停按钮对应的IO索引
-        "front_left_emergency": 7,      # 左前急停按钮对应的IO索引
-    },
-    "X150": {
-        "front_right_confirm": 3,      # 右前确认按钮对应的IO索引
-        "back_right_confirm": 9,      # 右后确认按钮对应的IO索引
-        "front_right_maintenance": 1,      # 右前维修按钮对应的IO索引
-        "back_right_maintenance": 11,      # 右后维修按钮对应的IO索引
-        "front_right_emergency": 7,      # 右前急停按钮对应的IO索引
-        "back_right_emergency": 7,      # 右后急停按钮对应的IO索引
-        "back_left_emergency": 7,      # 左后急停按钮对应的IO索引
-        "front_left_emergency": 7,      # 左前急停按钮对应的IO索引
-    },
-    # 可以在这里添加更多车型配置
-}
+# 按键/触边测试IO信号映射（按车型配置）
+# 注意：映射由 parse_vehicle_mapping.py 根据 test_data/devices_data.csv 生成到 test_data/io_maps.py，
+# 格式为 车型 -> int_data各下标对应的测试项ID元组；修改CSV后重新运行该脚本，不要在这里手工维护
+from test_data.button_test import BUTTON_TEST_DATA as _BUTTON_TEST_DATA
+from test_data.io_maps import IO_SIGNALS_BY_VEHICLE
+from test_data.touch_test import TOUCH_TEST_DATA as _TOUCH_TEST_DATA
+from test_data.vehicle_model import family_of
 
-# 触边测试IO信号索引映射（按车型配置）
-# 格式：车型 -> {触边ID: IO索引}
-TOUCH_IO_INDEX_MAP_BY_VEHICLE = {
-    "X060": {
-        "front_touch": 1,      # 前触边对应的IO索引
-        "back_touch": 8,       # 后触边对应的IO索引
-    },
-    "X080": {
-        "front_touch": 1,      # 前触边对应的IO索引
-        "back_touch": 8,       # 后触边对应的IO索引
-    },
-    "X100": {
-        "front_touch": 5,      # 前触边对应的IO索引
-        "back_touch": 8,       # 后触边对应的IO索引
-    },
-    "X150": {
-        "front_touch": 5,      # 前触边对应的IO索引
-        "back_touch": 8,       # 后触边对应的IO索引
-    },
-}
+
+class UnknownVehicleModelError(ValueError):
+    """设备型号无法识别为已配置IO映射的车型（不再默认使用X100的映射，避免按错误的IO索引等待到超时）"""
+    pass
+
+
+def _build_io_index_maps(test_data):
+    """从生成的IO信号映射中取出某个测试类别的测试项，格式：车型 -> {测试项ID: IO索引}"""
+    item_ids = {item['id'] for section in test_data['sections'] for item in section['items']}
+    return {
+        vehicle: {item_id: io_index for io_index, signal_ids in enumerate(signals)
+                  for item_id in signal_ids if item_id in item_ids}
+        for vehicle, signals in IO_SIGNALS_BY_VEHICLE.items()
+    }
+
+
+# 按键测试IO信号索引映射，格式：车型 -> {按钮ID: IO索引}
+BUTTON_IO_INDEX_MAP_BY_VEHICLE = _build_io_index_maps(_BUTTON_TEST_DATA)
+
+# 触边测试IO信号索引映射，格式：车型 -> {触边ID: IO索引}
+TOUCH_IO_INDEX_MAP_BY_VEHICLE = _build_io_index_maps(_TOUCH_TEST_DATA)
 
 # 显示屏测试IO信号索引映射（按车型配置）
 # 格式：车型 -> {显示屏测试ID: IO索引}
@@ -106,20 +71,36 @@ DISPLAY_IO_INDEX_MAP_BY_VEHICLE = {
     },
 }
 
+def _vehicle_io_map(maps, vehicle_model, kind):
+    """从完整设备型号或车型中识别车型，返回该车型的IO索引映射；车型未配置时抛出UnknownVehicleModelError"""
+    if not vehicle_model:
+        raise UnknownVehicleModelError(f"未提供车型，无法确定{kind}的IO索引")
+    vehicle = vehicle_model if vehicle_model in maps else _extract_vehicle_code(vehicle_model)
+    if vehicle not in maps:
+        raise UnknownVehicleModelError(
+            f"未知车型 '{vehicle_model}'：没有{kind}的IO映射（已配置车型: {', '.join(sorted(maps))}），"
+            f"请在 devices_data.csv 中添加该车型后运行 parse_vehicle_mapping.py")
+    return maps[vehicle]
+
 # 获取指定车型的按键IO索引映射
 def get_button_io_map(vehicle_model):
-    """根据车型获取对应的按键IO索引映射"""
-    return BUTTON_IO_INDEX_MAP_BY_VEHICLE.get(vehicle_model, BUTTON_IO_INDEX_MAP_BY_VEHICLE.get("X100", {}))
+    """根据车型获取对应的按键IO索引映射，车型未配置时抛出UnknownVehicleModelError"""
+    return _vehicle_io_map(BUTTON_IO_INDEX_MAP_BY_VEHICLE, vehicle_model, "按键测试")
 
 # 获取指定车型的触边IO索引映射
 def get_touch_io_map(vehicle_model):
-    """根据车型获取对应的触边IO索引映射"""
-    return TOUCH_IO_INDEX_MAP_BY_VEHICLE.get(vehicle_model, TOUCH_IO_INDEX_MAP_BY_VEHICLE.get("X100", {}))
+    """根据车型获取对应的触边IO索引映射，车型未配置时抛出UnknownVehicleModelError"""
+    return _vehicle_io_map(TOUCH_IO_INDEX_MAP_BY_VEHICLE, vehicle_model, "触边测试")
 
 # 获取指定车型的显示屏IO索引映射
 def get_display_io_map(vehicle_model):
-    """根据车型获取对应的显示屏IO索引映射"""
-    return DISPLAY_IO_INDEX_MAP_BY_VEHICLE.get(vehicle_model, DISPLAY_IO_INDEX_MAP_BY_VEHICLE.get("X100", {}))
+    """根据车型获取对应的显示屏IO索引映射，车型未配置时抛出UnknownVehicleModelError"""
+    return _vehicle_io_map(DISPLAY_IO_INDEX_MAP_BY_VEHICLE, vehicle_model, "显示屏测试")
+
+# 获取指定车型int_data各下标对应的测试项ID（下标 -> 测试项ID元组）
+def get_io_signals(vehicle_model):
+    """根据车型获取IO信号映射，车型未配置时抛出UnknownVehicleModelError"""
+    return _vehicle_io_map(IO_SIGNALS_BY_VEHICLE, vehicle_model, "按键/触边测试")
 
 # 按键测试项配置（按车型配置）
 # 定义每个车型显示哪些按键测试项
@@ -168,22 +149,7 @@ def get_button_test_items(vehicle_model):
     根据车型获取对应的按键测试项ID列表
     支持完整设备型号（如 X-060-V1-LV-2L2T-C-1A-DHF）或简单车型（如 X060）
     """
-    import re
-    
-    # 从完整设备型号中提取车型代码（如从 'X-060-V1-LV-2L2T-C-1A-DHF' 提取 'X060'）
-    extracted_vehicle = vehicle_model
-    vehicle_match = re.search(r'X[_-]?(\d{3})', vehicle_model)
-    if vehicle_match:
-        extracted_vehicle = 'X' + vehicle_match.group(1)
-        print(f"[按键测试配置] 从设备型号 '{vehicle_model}' 提取车型: '{extracted_vehicle}'")
-    else:
-        # 如果正则匹配失败，检查是否已经是车型格式（如 X060, X080, X100, X150）
-        if re.match(r'^X\d{3}$', vehicle_model):
-            extracted_vehicle = vehicle_model
-            print(f"[按键测试配置] '{vehicle_model}' 已经是车型格式，直接使用")
-    
-    # 根据提取的车型获取对应的按键测试项
-    return BUTTON_TEST_ITEMS_BY_VEHICLE.get(extracted_vehicle, BUTTON_TEST_ITEMS_BY_VEHICLE.get("X100", []))
+    return BUTTON_TEST_ITEMS_BY_VEHICLE.get(_extract_vehicle_code(vehicle_model), BUTTON_TEST_ITEMS_BY_VEHICLE.get("X100", []))
 
 # 灯光测试指令映射
 COMMAND_MAP = {
@@ -270,9 +236,64 @@ SSH_USER = "robot"  # SSH用户名（可根据实际情况修改）
 SSH_PASSWORD = "robot"  # SSH密码（可根据实际情况修改）
 SSH_TIMEOUT = 10   # SSH连接超时时间（秒）
 SSH_KEY_PATH = None  # SSH密钥路径（如果使用密钥认证，设置此路径；如果为None，使用密码认证）
-SSH_CONNECTION_HOLD_TIME = 30  # SSH连接保持时间（秒），按钮点击后保持连接的时间
 # 注意：使用SSH密码认证需要安装paramiko库：pip install paramiko
 
+# SSH连接池配置（apis/ssh_pool.py，所有API处理器共享，按 主机+用户名 复用连接）
+SSH_POOL_MAX_PER_HOST = 2  # 每台主机最多保持的SSH连接数
+SSH_POOL_MAX_CHANNELS_PER_CONNECTION = 8  # 每条连接上最多同时打开的通道数（sshd默认MaxSessions为10）
+SSH_POOL_IDLE_TIMEOUT = 300  # 空闲连接回收时间（秒）
+SSH_POOL_HEALTH_CHECK_INTERVAL = 15  # 借出连接前的探测间隔（秒），间隔内只检查传输层是否存活
+SSH_POOL_ACQUIRE_TIMEOUT = 30  # 连接池已满时等待可用连接的超时时间（秒）
+SSH_POOL_KEEPALIVE_INTERVAL = 15  # SSH keepalive间隔（秒），0表示不发送
+
+# IO话题常驻订阅配置（apis/io_subscriber.py，每台车辆只订阅一次ROS_TOPIC）
+IO_SUBSCRIBER_BUFFER_SIZE = 500  # 环形缓冲区保存的最近帧数
+IO_SUBSCRIBER_MAX_AGE = 2  # 缓存中的最新帧在多少秒内视为当前IO状态
+IO_SUBSCRIBER_IDLE_TIMEOUT = 600  # 超过多少秒无查询后停止订阅（秒）
+
+# 后台任务配置（job_manager.py，send_command/check_io 传入 async=true 时在后台线程池执行）
+JOB_MAX_WORKERS = 8  # 同时执行的后台任务数
+JOB_MAX_PENDING = 32  # 未完成（排队+执行中）任务上限，超过时拒绝提交
+JOB_RESULT_TTL = 600  # 已完成任务的结果保留时间（秒）
+JOB_LONG_POLL_TIMEOUT = 25  # /api/jobs/<job_id>?wait=N 长轮询的最长等待时间（秒）
+
+# 实时事件推送配置（event_bus.py，/api/events 以Server-Sent Events推送IO变化、ping、TOF、任务完成）
+EVENT_QUEUE_SIZE = 1000  # 每个浏览器连接的事件队列长度，处理不过来时丢弃
+EVENT_HISTORY_SIZE = 500  # 保留的最近事件数（断线重连时按Last-Event-ID补发）
+EVENT_KEEPALIVE_INTERVAL = 15  # 无事件时发送心跳的间隔（秒）
+
+# 配置文件热加载（test_data/config_store.py，TABdisplay_data.csv、devices_data.csv 修改后无需重启服务）
+CONFIG_STORE_CHECK_INTERVAL = 2  # 检查CSV文件修改时间的间隔（秒）
+CONFIG_BUNDLE_PATH = "config_bundle.bin"  # python compile_config.py 生成的预编译配置包（相对项目目录），存在时启动直接加载，CSV打包后修改过则照常解析
+TEST_PLAN_CACHE_SIZE = 256  # 缓存的车型测试计划数量（test_plan.py，超过后淘汰最久未使用的车型）
+
+# 多车批量测试配置（orchestrator.py，/api/batch_test 同时对多台车辆执行可自动判定的测试项）
+BATCH_MAX_WORKERS = 128  # 所有车辆合计同时执行的测试项数（测试项大多在等待SSH输出，线程开销很小）
+BATCH_PER_HOST_CONCURRENCY = 6  # 每台车辆同时执行的测试项数（需小于SSH连接池单主机可用通道数）
+BATCH_MAX_VEHICLES = 50  # 单次批量测试最多车辆数
+BATCH_RESULT_TTL = 3600  # 已完成批量测试的结果保留时间（秒）
+
+# 测试报告生成配置（report_writer.py / report_pipeline.py，报告流式写入临时文件后直接返回或保存）
+REPORT_SPOOL_SIZE = 8 * 1024 * 1024  # 报告文件不超过此大小（字节）时在内存中生成，超过后转存为磁盘临时文件
+REPORT_ARCHIVE_DIR = "report"  # 保存报告的目录（相对项目目录），云端同步从这里上传
+CLOUD_UPLOAD_TIMEOUT = 60  # 上传报告到飞书云文档的超时时间（秒）
+
+# 测试结果存储配置（results_store.py，IO检查和提交的测试结果写入SQLite，/api/results 查询）
+RESULTS_DB_PATH = "results.db"  # 数据库文件（相对项目目录）
+RESULTS_BATCH_SIZE = 500  # 每个事务最多写入的结果条数
+RESULTS_FLUSH_INTERVAL = 1.0  # 结果在写入队列中最多等待的时间（秒），期间到达的结果合并到一个事务写入
+RESULTS_BUSY_TIMEOUT = 10  # 数据库被其他连接锁定时的等待时间（秒）
+RESULTS_QUERY_LIMIT = 1000  # 单次查询最多返回的记录数
+
+# 服务运行配置（serve.py 生产模式；python app.py 仅用于本地开发调试）
+SERVE_HOST = "0.0.0.0"
+SERVE_PORT = 5000
+SERVE_BACKEND = "waitress"  # waitress（Windows/Linux，多线程）或 gunicorn（仅Linux，支持多进程）
+SERVE_THREADS = 32  # 每个进程的工作线程数（每个SSE事件连接、长轮询都会占用一个线程）
+SERVE_WORKERS = 1  # 进程数（仅gunicorn）。后台任务、事件推送、SSH连接池都在进程内，多进程时需要负载均衡保持同一浏览器固定到同一进程
+SERVE_SHUTDOWN_TIMEOUT = 10  # 优雅退出时等待正在执行的请求/任务的时间（秒）
+FLASK_DEBUG = False  # python app.py 开发模式是否启用调试器和自动重载（生产环境不要开启）
+
 # 车型TAB显示配置
 # 定义每个车型显示哪些测试TAB
 # 格式：车型名称 -> TAB ID列表（按顺序）
@@ -361,6 +382,18 @@ def get_camera_devices(vehicle_model):
 # Ping测试超时时间（秒）
 PING_TEST_TIMEOUT = 10
 
+# Ping测试方式
+# probe：一次exec_command执行 ping -c N -i 间隔 -q，只解析统计行（丢包率、最小/平均/最大延迟、抖动），多个IP并行探测
+# shell：交互式Shell中持续ping PING_TEST_TIMEOUT 秒，逐行解析并实时推送每个回包
+PING_TEST_MODE = "probe"
+PING_PROBE_COUNT = 20  # 每个IP发送的包数
+PING_PROBE_INTERVAL = 0.2  # 发包间隔（秒），普通用户最小0.2
+
+# 从完整设备型号中提取车型代码（按钮映射按车型查表）
+def _extract_vehicle_code(vehicle_model):
+    """如从 'X-060-V1-LV-2L2T-C-1A-DHF' 提取 'X060'（解析结果由 test_data/vehicle_model.py 缓存），无法识别时返回原始值"""
+    return family_of(vehicle_model) or vehicle_model
+
 # 解析devices_data.csv文件，根据车型和按钮名称匹配int_data下标和值的含义
 def parse_button_mapping_from_csv(vehicle_model, button_name):
     """
@@ -377,151 +410,21 @@ def parse_button_mapping_from_csv(vehicle_model, button_name):
             'button_name': str  # 匹配到的按钮名称
         } 或 None（如果未找到）
     """
-    import csv
-    import os
-    import re
+    extracted_vehicle = _extract_vehicle_code(vehicle_model)
     
-    csv_path = os.path.join(os.path.dirname(__file__), 'test_data', 'devices_data.csv')
-    
-    # 从完整设备型号中提取车型代码（如从 'X-060-V1-LV-2L2T-C-1A-DHF' 提取 'X060'）
-    # 支持格式：X-060-... 或 X060-... 或 X060
-    extracted_vehicle = vehicle_model
-    vehicle_match = re.search(r'X[_-]?(\d{3})', vehicle_model)
-    if vehicle_match:
-        extracted_vehicle = 'X' + vehicle_match.group(1)
-        print(f"[CSV解析调试] 从设备型号 '{vehicle_model}' 提取车型: '{extracted_vehicle}'")
+    # devices_data.csv 由配置存储缓存并预先编译为按车型的查找表（文件修改后自动重新编译），这里只做字典查找
+    from test_data.button_mapping import get_button_mapping_table
+    mapping = get_button_mapping_table().lookup(extracted_vehicle, button_name)
+    if mapping:
+        print(f"[CSV解析调试] 匹配成功: '{button_name}' -> '{mapping['button_name']}' (IO索引: {mapping['io_index']})")
     else:
-        # 如果正则匹配失败，检查是否已经是车型格式（如 X060, X080, X100, X150）
-        # 如果已经是车型格式，直接使用
-        if re.match(r'^X\d{3}$', vehicle_model):
-            extracted_vehicle = vehicle_model
-            print(f"[CSV解析调试] '{vehicle_model}' 已经是车型格式，直接使用")
-        else:
-            print(f"[CSV解析调试] 无法从 '{vehicle_model}' 提取车型，使用原始值")
-    
-    # 尝试不同的编码
-    encodings = ['utf-8', 'gbk', 'gb2312', 'utf-8-sig']
-    
-    for encoding in encodings:
-        try:
-            with open(csv_path, 'r', encoding=encoding) as f:
-                reader = csv.reader(f)
-                rows = list(reader)
-                
-                if len(rows) < 1:
-                    continue
-                
-                # 读取表头，自动匹配车型对应的列
-                header = rows[0]
-                name_col = None
-                desc_col = None
-                
-                # 在表头中查找包含当前车型的列（包含关系匹配）
-                # 使用提取出的车型代码进行匹配
-                for col_idx, col_name in enumerate(header):
-                    col_name_str = str(col_name).strip()
-                    # 检查列名是否包含提取出的车型（包含关系：只要车型字符串在列名中即匹配）
-                    # 例如：X060 在 "X150/X100/X060" 中 → 匹配成功
-                    #       X080 在 "X061/X080" 中 → 匹配成功
-                    if extracted_vehicle in col_name_str:
-                        # 找到车型列，确定按钮名称列
-                        name_col = col_idx
-                        
-                        # 查找对应的"值的含义"列
-                        # 值的含义列通常在按钮名称列的下一列，且表头包含"值的含义"
-                        # 遍历后续列，查找"值的含义"列
-                        for next_col_idx in range(col_idx + 1, len(header)):
-                            next_col_name = str(header[next_col_idx]).strip()
-                            if '值的含义' in next_col_name or '含义' in next_col_name:
-                                desc_col = next_col_idx
-                                break
-                        
-                        # 如果没找到明确的"值的含义"列，使用下一列作为默认
-                        if desc_col is None and col_idx + 1 < len(header):
-                            desc_col = col_idx + 1
-                        
-                        print(f"[CSV解析调试] 车型 '{extracted_vehicle}' (从 '{vehicle_model}' 提取) 自动匹配到列: '{col_name_str}' (按钮名称列索引: {name_col}, 值的含义列索引: {desc_col})")
-                        break
-                
-                # 如果没找到匹配的列，返回None
-                if name_col is None or desc_col is None:
-                    print(f"[CSV解析调试] 警告: 未找到车型 '{extracted_vehicle}' (从 '{vehicle_model}' 提取) 对应的列，表头: {header}")
-                    continue
-                
-                # 跳过表头，从第二行开始
-                for row in rows[1:]:
-                    if len(row) < max(name_col, desc_col) + 1:
-                        continue
-                    
-                    # 第一列是int_data下标
-                    index_str = str(row[0]).strip()
-                    if not index_str or not index_str.isdigit():
-                        continue
-                    
-                    io_index = int(index_str)
-                    
-                    # 获取按钮名称列
-                    button_name_in_csv = str(row[name_col]).strip() if len(row) > name_col else ""
-                    # 获取值的含义列
-                    value_meaning = str(row[desc_col]).strip() if len(row) > desc_col else ""
-                    
-                    if not button_name_in_csv:
-                        continue
-                    
-                    # 调试：打印正在检查的行
-                    print(f"[CSV解析调试] 检查行 {io_index}: CSV按钮名称='{button_name_in_csv}', 查找按钮='{button_name}'")
-                    
-                    # 处理多个按钮的情况（用空格分隔）
-                    button_names = [name.strip() for name in button_name_in_csv.split() if name.strip()]
-                    
-                    # 匹配按钮名称（支持部分匹配，如"右前维护按钮"匹配"右前维护键"）
-                    # 同时支持"维修"和"维护"、"键"和"按钮"的匹配
-                    for csv_button_name in button_names:
-                        # 移除括号中的内容进行匹配（如"右前维护按钮（需要按一段时间）"匹配"右前维护按钮"）
-                        csv_button_name_clean = re.sub(r'[（(].*?[）)]', '', csv_button_name)
-                        button_name_clean = re.sub(r'[（(].*?[）)]', '', button_name)
-                        
-                        # 统一"维修"和"维护"为"维护"进行匹配
-                        # 统一"键"和"按钮"为"键"进行匹配
-                        csv_button_name_normalized = csv_button_name_clean.replace('维修', '维护').replace('按钮', '键')
-                        button_name_normalized = button_name_clean.replace('维修', '维护').replace('按钮', '键')
-                        
-                        # 检查是否匹配（支持部分匹配）
-                        # 使用完全匹配或包含匹配
-                        # 先检查原始名称是否完全匹配（最优先）
-                        if button_name_clean == csv_button_name_clean:
-                            print(f"[CSV解析调试] 匹配成功: '{button_name}' -> '{csv_button_name}' (IO索引: {io_index})")
-                            return {
-                                'io_index': io_index,
-                                'value_meaning': value_meaning,
-                                'button_name': csv_button_name
-                            }
-                        
-                        # 再检查标准化后的名称是否匹配
-                        if (button_name_normalized == csv_button_name_normalized or
-                            button_name_normalized in csv_button_name_normalized or 
-                            csv_button_name_normalized in button_name_normalized):
-                            print(f"[CSV解析调试] 匹配成功: '{button_name}' -> '{csv_button_name}' (IO索引: {io_index})")
-                            return {
-                                'io_index': io_index,
-                                'value_meaning': value_meaning,
-                                'button_name': csv_button_name
-                            }
-                        
-                        # 最后检查原始名称的包含关系
-                        if (button_name_clean in csv_button_name_clean or 
-                            csv_button_name_clean in button_name_clean):
-                            print(f"[CSV解析调试] 匹配成功: '{button_name}' -> '{csv_button_name}' (IO索引: {io_index})")
-                            return {
-                                'io_index': io_index,
-                                'value_meaning': value_meaning,
-                                'button_name': csv_button_name
-                            }
-                
-                # 如果所有编码都失败，返回None
-                break
-        except Exception as e:
-            print(f"[CSV解析] 使用 {encoding} 编码失败: {e}")
-            continue
-    
-    return None
+        print(f"[CSV解析调试] 未找到按钮 '{button_name}' 在车型 '{extracted_vehicle}' (从 '{vehicle_model}' 提取) 中的映射")
+    return mapping
+
+# 根据车型和测试项ID（button_test.py / touch_test.py 中的id）获取按钮映射
+def get_button_mapping_by_item(vehicle_model, item_id):
+    """返回 {'io_index', 'value_meaning', 'button_name', 'item_name'}，未找到时返回None"""
+    if not vehicle_model:
+        return None
+    from test_data.button_mapping import get_button_mapping_table
+    return get_button_mapping_table().lookup_item(_extract_vehicle_code(vehicle_model), item_id)
@@ -0,0 +1,104 @@
+# 实时事件推送
+# 后端各处（IO订阅、ping、TOF、后台任务）发布事件，/api/events 以Server-Sent Events推送给浏览器，
+# 前端收到事件立即刷新状态，无需反复POST轮询
+
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+import config
+
+
+class EventSubscription:
+    """一个浏览器连接的事件队列（按主机和事件类型过滤）"""
+
+    def __init__(self, host=None, types=None, max_queue=None):
+        self.host = host
+        self.types = set(types) if types else None
+        self.queue = queue.Queue(maxsize=max_queue or config.EVENT_QUEUE_SIZE)
+        self.dropped = 0  # 浏览器处理不过来时丢弃的事件数
+
+    def accepts(self, event):
+        if self.types is not None and event["type"] not in self.types:
+            return False
+        if self.host and event.get("host") and event["host"] != self.host:
+            return False
+        return True
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """进程内的发布/订阅
+
+    - publish() 不阻塞：每个订阅者有独立的有界队列，队列满时丢弃该订阅者的事件
+    - 保留最近 history_size 条事件，浏览器断线重连时按 Last-Event-ID 补发
+    """
+
+    def __init__(self, history_size=None):
+        self._subscriptions = set()
+        self._history = deque(maxlen=history_size or config.EVENT_HISTORY_SIZE)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data, host=None):
+        with self._lock:
+            event = {
+                "id": next(self._ids),
+                "type": event_type,
+                "host": host,
+                "time": time.time(),
+                "data": data,
+            }
+            self._history.append(event)
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.accepts(event):
+                subscription.put(event)
+        return event
+
+    def subscribe(self, host=None, types=None, last_event_id=None):
+        """订阅事件；提供last_event_id时先补发之后的历史事件"""
+        subscription = EventSubscription(host, types)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if last_event_id is not None:
+                for event in self._history:
+                    if event["id"] > last_event_id and subscription.accepts(event):
+                        subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "history": len(self._history),
+                "dropped": sum(s.dropped for s in self._subscriptions),
+            }
+
+    @staticmethod
+    def format_sse(event):
+        """格式化为Server-Sent Events消息"""
+        payload = dict(event["data"], host=event["host"], time=event["time"])
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+# 全局共享的事件总线
+event_bus = EventBus()
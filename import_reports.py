@@ -0,0 +1,227 @@
+# 历史测试报告导入
+# 把report目录下已保存的测试报告（机器人静态测试报告_<型号>_<测试时间>.xlsx）导入测试结果存储（results_store.py），
+# 导入后可以通过 /api/results、/api/analytics 查询，不再逐个打开Excel。
+# 报告用openpyxl只读模式在进程池中并行解析；导入过的文件按 路径+修改时间+大小 跳过，
+# 修改时间变化但内容（sha1）未变的文件只更新记录，内容变化的文件重新导入并替换之前导入的结果。
+# 同一次测试已通过 /api/submit_test 保存过时（设备序列号和测试时间相同），导入的结果替换之前保存的记录，不会重复统计
+#
+# 用法：
+#   python import_reports.py                  # 导入report目录中新增或修改过的报告
+#   python import_reports.py --dir old/report # 导入其他目录
+#   python import_reports.py --force          # 忽略导入记录，全部重新导入
+#   python import_reports.py -j 8             # 指定解析进程数
+
+import argparse
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+import analytics  # 导入的结果同时更新汇总表
+from report_writer import RESULT_TEXT
+from results_store import make_row, parse_time, results_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,          -- 相对报告目录的路径
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    session TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+# 测试结果中文 -> normal/abnormal（未测试的测试项不导入）
+RESULT_CODES = {text: code for code, text in RESULT_TEXT.items()}
+# 报告信息行的标签
+INFO_LABELS = {'型号': 'vehicle_model', '软件版本': 'app_version', '设备序列号': 'hostname',
+               '测试时间': 'test_time', '测试人员': 'tester'}
+# 文件名中的测试时间（机器人静态测试报告_<型号>_2026-01-13_11-13-20.xlsx）
+_FILENAME_TIME = re.compile(r'_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.xlsx$')
+
+# 解析进程中的名称映射（每个进程只生成一次）
+_names = None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="把report目录中的历史测试报告导入测试结果存储")
+    parser.add_argument("--dir", default=os.path.join(BASE_DIR, config.REPORT_ARCHIVE_DIR),
+                        help="报告目录（默认: %(default)s）")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="解析进程数（默认: %(default)s）")
+    parser.add_argument("--force", action="store_true", help="忽略导入记录，全部重新导入")
+    return parser.parse_args()
+
+
+def _name_maps():
+    """{类别名称: 类别ID}, {(类别ID, 测试项名称): 测试项ID}"""
+    global _names
+    if _names is None:
+        import test_data
+        categories = {category['name']: category['id'] for category in test_data.TEST_CATEGORIES}
+        items = {(test_id, item['name']): item['id']
+                 for test_id, detail in test_data.TEST_DETAILS.items()
+                 for section in detail.get('sections', []) for item in section.get('items', [])}
+        _names = (categories, items)
+    return _names
+
+
+def _cell_text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def parse_report(path, known_sha1=None):
+    """解析一个报告文件（在解析进程中执行）
+
+    返回 {'sha1', 'info', 'results': [(类别ID, 测试项ID, normal/abnormal)]}；内容与 known_sha1 相同时 results 为None
+    """
+    from openpyxl import load_workbook
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    sha1 = hashlib.sha1(content).hexdigest()
+    if sha1 == known_sha1:
+        return {'sha1': sha1, 'info': None, 'results': None}
+
+    categories, items = _name_maps()
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        info = {}
+        results = []
+        in_table = False
+        for row in workbook.worksheets[0].iter_rows(max_col=3, values_only=True):
+            first = _cell_text(row[0] if row else None)
+            if not in_table:
+                label = first.rstrip(':：')
+                if label in INFO_LABELS and len(row) > 1:
+                    info[INFO_LABELS[label]] = _cell_text(row[1])
+                elif first == '测试类别':
+                    in_table = True
+                continue
+            if len(row) < 3 or not first:
+                continue
+            code = RESULT_CODES.get(_cell_text(row[2]))
+            if code is None:
+                continue
+            category_id = categories.get(first, first)
+            item_name = _cell_text(row[1])
+            results.append((category_id, items.get((category_id, item_name), item_name), code))
+    finally:
+        workbook.close()
+    if not in_table:
+        raise ValueError("不是测试报告（没有测试结果表头）")
+    return {'sha1': sha1, 'info': info, 'results': results}
+
+
+def _report_time(info, filename, mtime):
+    """测试时间：报告中的测试时间，没有时使用文件名中的时间，都没有时使用文件修改时间"""
+    recorded_at = parse_time(info.get('test_time'))
+    if recorded_at is None:
+        match = _FILENAME_TIME.search(filename)
+        recorded_at = parse_time(match.group(1)) if match else None
+    return recorded_at or mtime
+
+
+def _session(info, relpath):
+    """与 /api/submit_test 相同的测试标识（设备序列号+测试时间），报告中没有测试时间时按文件区分"""
+    test_time = info.get('test_time')
+    if test_time and test_time != '-':
+        return f"submit:{info.get('hostname') or ''}:{test_time}"
+    return f"import:{relpath}"
+
+
+def scan(directory):
+    """报告目录中的xlsx文件 {相对路径: (绝对路径, 修改时间, 大小)}"""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith('.xlsx') and not name.startswith('~$'):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files[os.path.relpath(path, directory)] = (path, stat.st_mtime, stat.st_size)
+    return files
+
+
+def main():
+    args = parse_args()
+    args.workers = max(1, args.workers)
+    start = time.time()
+    if not os.path.isdir(args.dir):
+        print(f"❌ 报告目录不存在: {args.dir}")
+        return 1
+
+    results_store.open()  # 打开数据库（创建结果表和汇总表）
+    conn = sqlite3.connect(results_store.path, timeout=config.RESULTS_BUSY_TIMEOUT)
+    conn.executescript(_SCHEMA)
+    imported = {row[0]: row[1:] for row in conn.execute("SELECT path, mtime, size, sha1 FROM imported_files")}
+
+    files = scan(args.dir)
+    pending = {relpath: entry for relpath, entry in files.items()
+               if args.force or imported.get(relpath, (None, None))[:2] != (entry[1], entry[2])}
+    print(f"[导入报告] {args.dir}: 共 {len(files)} 个报告，{len(pending)} 个需要解析（{len(files) - len(pending)} 个已导入）")
+
+    counts = {'imported': 0, 'unchanged': 0, 'failed': 0, 'rows': 0}
+    bookkeeping = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            relpaths = list(pending)
+            known = [None if args.force else imported.get(relpath, (None, None, None))[2] for relpath in relpaths]
+            futures = executor.map(_parse_safe, [pending[relpath][0] for relpath in relpaths], known,
+                                   chunksize=max(1, len(relpaths) // (args.workers * 8)))
+            for index, (relpath, parsed) in enumerate(zip(relpaths, futures), start=1):
+                path, mtime, size = pending[relpath]
+                if 'error' in parsed:
+                    counts['failed'] += 1
+                    print(f"  ❌ {relpath}: {parsed['error']}")
+                    continue
+                if parsed['results'] is None:
+                    # 内容未变，只更新修改时间
+                    counts['unchanged'] += 1
+                    bookkeeping.append(("UPDATE imported_files SET mtime = ?, size = ? WHERE path = ?", (mtime, size, relpath)))
+                    continue
+                info = parsed['info']
+                session = _session(info, relpath)
+                recorded_at = _report_time(info, os.path.basename(relpath), mtime)
+                rows = [make_row('import', item_id, result, category=category_id, hostname=info.get('hostname'),
+                                 vehicle_model=info.get('vehicle_model'), session=session, recorded_at=recorded_at)
+                        for category_id, item_id, result in parsed['results']]
+                results_store.record(rows, replace_session=session)
+                counts['imported'] += 1
+                counts['rows'] += len(rows)
+                bookkeeping.append((
+                    "INSERT OR REPLACE INTO imported_files (path, mtime, size, sha1, session, rows, imported_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (relpath, mtime, size, parsed['sha1'], session, len(rows), time.time())))
+                if index % 500 == 0:
+                    print(f"[导入报告] 已解析 {index}/{len(relpaths)}")
+
+    # 结果写入数据库后再记录导入状态（中途退出时未记录的文件下次重新导入，按测试标识替换，不会重复）
+    if not results_store.flush(timeout=600):
+        print("❌ 写入测试结果超时，导入记录未更新")
+        return 1
+    with conn:
+        for sql, params in bookkeeping:
+            conn.execute(sql, params)
+    conn.close()
+    print(f"[导入报告] 导入 {counts['imported']} 个报告（{counts['rows']} 条结果），内容未变 {counts['unchanged']} 个，"
+          f"失败 {counts['failed']} 个，耗时 {time.time() - start:.1f} 秒")
+    return 1 if counts['failed'] else 0
+
+
+def _parse_safe(path, known_sha1):
+    try:
+        return parse_report(path, known_sha1)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+if __name__ == "__main__":
+    sys.exit(main())
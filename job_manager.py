@@ -0,0 +1,160 @@
+# 后台任务管理
+# 语音测试、ping、TOF订阅、按键等待等耗时的测试步骤提交到有上限的线程池中执行，
+# 接口立即返回job_id，前端通过 /api/jobs/<job_id> 轮询（支持长轮询）、/api/jobs/<job_id>/stream 或 /api/events 的job事件获取结果，
+# 避免多个工位同时测试时耗尽Flask的工作线程
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from event_bus import event_bus
+
+
+class JobQueueFull(Exception):
+    """排队中的任务过多或线程池已关闭，拒绝提交新任务"""
+    pass
+
+
+class Job:
+    """一个后台任务
+
+    状态：pending（排队中） -> running（执行中） -> finished（执行完成） / failed（执行异常）
+    result 为处理函数返回的结果字典，http_status 为同步调用时应返回的HTTP状态码
+    """
+
+    def __init__(self, kind, params=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind  # 任务类型，如 send_command / check_io
+        self.params = params or {}  # 任务参数摘要（用于展示，不包含密码）
+        self.status = "pending"
+        self.result = None
+        self.http_status = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.version = 0  # 每次状态变化加1，用于stream接口判断是否需要推送
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ("finished", "failed")
+
+    def _set(self, **fields):
+        with self._changed:
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, timeout, since_version=None):
+        """等待任务完成（或状态版本大于since_version），返回是否完成"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while not self.done and (since_version is None or self.version <= since_version):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self.done
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "job_status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.started_at:
+            data["elapsed"] = round((self.finished_at or time.time()) - self.started_at, 3)
+        if self.status == "finished":
+            data["result"] = self.result
+            data["http_status"] = self.http_status
+        elif self.status == "failed":
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """有上限的后台任务执行器
+
+    - 最多 max_workers 个任务同时执行，其余排队
+    - 未完成的任务超过 max_pending 个时拒绝提交（JobQueueFull）
+    - 完成超过 result_ttl 秒的任务自动清理
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, result_ttl=None):
+        self.max_workers = max_workers or config.JOB_MAX_WORKERS
+        self.max_pending = max_pending or config.JOB_MAX_PENDING
+        self.result_ttl = result_ttl or config.JOB_RESULT_TTL
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._jobs = {}  # {job_id: Job}
+        self._lock = threading.Lock()
+
+    def _cleanup(self):
+        """清理过期的已完成任务（调用方需持有锁）"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.done and now - job.finished_at > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, kind, func, *args, params=None, **kwargs):
+        """提交任务，func返回 (结果字典, HTTP状态码)"""
+        job = Job(kind, params)
+        with self._lock:
+            self._cleanup()
+            pending = sum(1 for j in self._jobs.values() if not j.done)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"排队中的任务过多（{pending}个），请稍后重试")
+            self._jobs[job.id] = job
+        try:
+            self._executor.submit(self._run, job, func, args, kwargs)
+        except RuntimeError:
+            # 线程池已关闭（服务退出中），移除任务，不占用排队数量
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise JobQueueFull("后台任务线程池已关闭，请稍后重试")
+        print(f"[后台任务] 已提交 {kind} {job.id}: {job.params}")
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job._set(status="running", started_at=time.time())
+        try:
+            result, http_status = func(*args, **kwargs)
+            job._set(status="finished", result=result, http_status=http_status, finished_at=time.time())
+        except Exception as e:
+            print(f"[后台任务] ❌ {job.kind} {job.id} 执行异常: {e}\n{traceback.format_exc()}")
+            job._set(status="failed", error=str(e), finished_at=time.time())
+        print(f"[后台任务] {job.kind} {job.id} {job.status}，耗时 {job.finished_at - job.started_at:.2f} 秒")
+        event_bus.publish("job", job.to_dict(), host=job.params.get("ssh_host"))
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            self._cleanup()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"max_workers": self.max_workers, "max_pending": self.max_pending, "jobs": counts}
+
+    def shutdown(self, wait=False):
+        """停止接收新任务（服务退出时调用）"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# 全局共享的后台任务管理器
+job_manager = JobManager()
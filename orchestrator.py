@@ -0,0 +1,342 @@
+# 多车批量测试编排
+# 下线检测时一次提交多台车辆 (hostname, carip, vehiclemodel)，服务端对每台车同时执行所有可自动判定的测试项：
+# 相机/激光ping、TOF订阅、系统信息、车辆ID检测。
+# 每台车辆的并发数有上限（同一台车的SSH通道数有限），所有车辆合计的并发数也有上限，
+# 各车辆的测试项互不等待，20台车的检测耗时与1台车基本相同
+
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from event_bus import event_bus
+from results_store import make_row, results_store
+from test_plan import get_test_plan
+
+# 可自动判定的测试项：{测试项ID: (测试类型, 测试项名称)}
+# 相机设备的名称来自车型测试计划（与相机TAB中显示的设备一致）
+SYSTEM_ITEMS = {
+    "system_info": ("system", "系统信息"),
+    "vehicle_id": ("system", "车辆ID检测"),
+}
+TOF_ITEMS = ("front_tof", "rear_tof")
+
+
+def plan_vehicle_items(vehicle_model, only=None):
+    """根据车型生成该车辆需要执行的测试项列表 [(测试项ID, 测试类型, 名称)]
+
+    耗时较长的ping/TOF排在前面先启动，系统信息等短任务在后面补空
+    only: 只执行指定的测试项ID（None表示全部）
+    """
+    items = []
+    # 与测试页面使用同一份测试计划：显示相机TAB时检测该TAB中显示的全部设备
+    plan = get_test_plan(vehicle_model)
+    if plan.has_category("camera"):
+        names = {item_id: name for category_id, _, item_id, name in plan.items if category_id == "camera"}
+        for device_id in plan.camera_devices:
+            if device_id in names:
+                items.append((device_id, "tof" if device_id in TOF_ITEMS else "ping", names[device_id]))
+    for item_id, (kind, name) in SYSTEM_ITEMS.items():
+        items.append((item_id, kind, name))
+    if only:
+        items = [item for item in items if item[0] in only]
+    return items
+
+
+class BatchItem:
+    """一台车辆上的一个测试项"""
+
+    def __init__(self, item_id, kind, name):
+        self.item_id = item_id
+        self.kind = kind  # ping / tof / system
+        self.name = name
+        self.status = "pending"  # pending -> running -> finished / failed
+        self.test_status = None  # normal / abnormal / error
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in ("finished", "failed")
+
+    def to_dict(self):
+        data = {
+            "item_id": self.item_id,
+            "name": self.name,
+            "item_status": self.status,
+            "test_status": self.test_status,
+        }
+        if self.started_at:
+            data["elapsed"] = round((self.finished_at or time.time()) - self.started_at, 3)
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class BatchVehicle:
+    """批量测试中的一台车辆"""
+
+    def __init__(self, hostname, carip, vehiclemodel, items):
+        self.hostname = hostname
+        self.carip = carip
+        self.vehiclemodel = vehiclemodel
+        self.items = items
+
+    @property
+    def test_status(self):
+        """车辆汇总结果：全部正常为normal，有未完成项为running，否则为abnormal"""
+        if not all(item.done for item in self.items):
+            return "running"
+        return "normal" if all(item.test_status == "normal" for item in self.items) else "abnormal"
+
+    def to_dict(self):
+        return {
+            "hostname": self.hostname,
+            "carip": self.carip,
+            "vehiclemodel": self.vehiclemodel,
+            "test_status": self.test_status,
+            "items": [item.to_dict() for item in self.items],
+        }
+
+
+class BatchRun:
+    """一次批量测试"""
+
+    def __init__(self, vehicles, ssh_user=None, ssh_password=None):
+        self.id = uuid.uuid4().hex
+        self.vehicles = vehicles
+        self.ssh_user = ssh_user
+        self.ssh_password = ssh_password
+        self.created_at = time.time()
+        self.finished_at = None
+        self.version = 0  # 每完成一个测试项加1，用于长轮询
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def _item_changed(self):
+        """测试项状态变化后调用，返回本次调用是否使批量测试完成"""
+        completed = False
+        with self._changed:
+            if self.finished_at is None and all(item.done for v in self.vehicles for item in v.items):
+                self.finished_at = time.time()
+                completed = True
+            self.version += 1
+            self._changed.notify_all()
+        return completed
+
+    def wait(self, timeout, since_version=None):
+        """等待批量测试完成（或状态版本大于since_version），返回是否完成"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while not self.done and (since_version is None or self.version <= since_version):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self.done
+
+    def progress(self):
+        items = [item for vehicle in self.vehicles for item in vehicle.items]
+        return {
+            "total": len(items),
+            "done": sum(1 for item in items if item.done),
+            "normal": sum(1 for item in items if item.test_status == "normal"),
+            "abnormal": sum(1 for item in items if item.test_status == "abnormal"),
+            "error": sum(1 for item in items if item.test_status == "error"),
+        }
+
+    def to_dict(self, include_items=True):
+        data = {
+            "batch_id": self.id,
+            "batch_status": "finished" if self.done else "running",
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 3),
+            "progress": self.progress(),
+        }
+        if include_items:
+            data["vehicles"] = [vehicle.to_dict() for vehicle in self.vehicles]
+        else:
+            data["vehicles"] = [{"hostname": v.hostname, "carip": v.carip, "test_status": v.test_status}
+                                for v in self.vehicles]
+        return data
+
+
+def _execute_item(item, vehicle, ssh_user, ssh_password):
+    """执行一个测试项，返回 (结果字典, test_status)"""
+    from apis.camera_api import CameraAPI
+    from apis.system_api import SystemAPI
+
+    if item.kind == "ping":
+        # 与相机TAB、一键检测使用同一份设备IP（测试计划中的default_ip）
+        ip_address = get_test_plan(vehicle.vehiclemodel).ip_addresses.get(item.item_id)
+        if not ip_address:
+            return {"status": "error", "message": f"未配置 {item.name} 的IP地址"}, "error"
+        result = CameraAPI.check_io(item.item_id, vehicle.carip, ssh_user, ssh_password,
+                                    vehicle.vehiclemodel, "camera", ip_address)
+    elif item.kind == "tof":
+        result = CameraAPI.check_tof_subscribe(item.item_id, vehicle.carip, ssh_user, ssh_password,
+                                               vehicle.vehiclemodel, "camera")
+    elif item.item_id == "system_info":
+        result = SystemAPI.get_system_info(vehicle.carip, ssh_user, ssh_password)
+        if result.get("status") == "success":
+            result["test_status"] = "normal"
+    elif item.item_id == "vehicle_id":
+        if not vehicle.hostname:
+            return {"status": "error", "message": "未提供车辆ID（hostname）"}, "error"
+        result = SystemAPI.check_vehicle_id(vehicle.hostname, vehicle.carip, ssh_user, ssh_password)
+        if result.get("status") == "success":
+            result["test_status"] = "normal" if result.get("matched") else "abnormal"
+    else:
+        return {"status": "error", "message": f"未知测试项: {item.item_id}"}, "error"
+
+    if result.get("status") == "error":
+        return result, "error"
+    return result, result.get("test_status", "abnormal")
+
+
+class TestOrchestrator:
+    """多车批量测试调度器
+
+    - 每台车辆一个待执行队列，同一车辆最多 per_host 个测试项同时执行
+    - 所有车辆共享一个最多 max_workers 个线程的线程池
+    - 某台车的测试项完成后才从该车队列中取下一项提交，等待中的测试项不占用线程
+    """
+
+    def __init__(self, max_workers=None, per_host=None, result_ttl=None):
+        self.max_workers = max_workers or config.BATCH_MAX_WORKERS
+        self.per_host = per_host or config.BATCH_PER_HOST_CONCURRENCY
+        self.result_ttl = result_ttl or config.BATCH_RESULT_TTL
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch")
+        self._runs = {}  # {batch_id: BatchRun}
+        self._queues = {}  # {carip: deque[(BatchRun, BatchVehicle, BatchItem)]}
+        self._running = {}  # {carip: 正在执行的测试项数}
+        self._lock = threading.Lock()
+
+    def _cleanup(self):
+        """清理过期的已完成批量测试（调用方需持有锁）"""
+        now = time.time()
+        expired = [run_id for run_id, run in self._runs.items()
+                   if run.done and now - run.finished_at > self.result_ttl]
+        for run_id in expired:
+            del self._runs[run_id]
+
+    def start(self, vehicles, items=None, ssh_user=None, ssh_password=None):
+        """提交批量测试
+
+        vehicles: [{"hostname": 车辆ID, "carip": 车辆IP, "vehiclemodel": 设备型号}, ...]
+        items: 只执行指定的测试项ID（None表示该车型全部可自动判定的测试项）
+        """
+        if not vehicles:
+            raise ValueError("未提供车辆列表")
+        if len(vehicles) > config.BATCH_MAX_VEHICLES:
+            raise ValueError(f"单次最多测试 {config.BATCH_MAX_VEHICLES} 台车辆，当前 {len(vehicles)} 台")
+
+        batch_vehicles = []
+        seen = set()
+        for vehicle in vehicles:
+            carip = (vehicle.get("carip") or "").strip()
+            if not carip:
+                raise ValueError(f"车辆缺少carip: {vehicle}")
+            if carip in seen:
+                raise ValueError(f"车辆IP重复: {carip}")
+            seen.add(carip)
+            vehiclemodel = (vehicle.get("vehiclemodel") or "X100").strip()
+            planned = [BatchItem(*item) for item in plan_vehicle_items(vehiclemodel, items)]
+            batch_vehicles.append(BatchVehicle((vehicle.get("hostname") or "").strip(), carip, vehiclemodel, planned))
+
+        run = BatchRun(batch_vehicles, ssh_user, ssh_password)
+        with self._lock:
+            self._cleanup()
+            self._runs[run.id] = run
+            for vehicle in batch_vehicles:
+                queue = self._queues.setdefault(vehicle.carip, deque())
+                queue.extend((run, vehicle, item) for item in vehicle.items)
+        print(f"[批量测试] 已提交 {run.id}: {len(batch_vehicles)} 台车辆，共 {run.progress()['total']} 个测试项")
+
+        for vehicle in batch_vehicles:
+            self._dispatch(vehicle.carip)
+        if not run.progress()["total"]:
+            run._item_changed()  # 没有可执行的测试项，直接完成
+        return run
+
+    def _dispatch(self, carip):
+        """从车辆队列中取测试项提交到线程池，直到达到该车辆的并发上限"""
+        with self._lock:
+            queue = self._queues.get(carip)
+            while queue and self._running.get(carip, 0) < self.per_host:
+                run, vehicle, item = queue.popleft()
+                self._running[carip] = self._running.get(carip, 0) + 1
+                self._executor.submit(self._run_item, run, vehicle, item)
+            if not queue and not self._running.get(carip):
+                self._queues.pop(carip, None)
+                self._running.pop(carip, None)
+
+    def _run_item(self, run, vehicle, item):
+        item.status = "running"
+        item.started_at = time.time()
+        try:
+            item.result, item.test_status = _execute_item(item, vehicle, run.ssh_user, run.ssh_password)
+            item.status = "finished"
+        except Exception as e:
+            print(f"[批量测试] ❌ {vehicle.carip} {item.item_id} 执行异常: {e}\n{traceback.format_exc()}")
+            item.error = str(e)
+            item.test_status = "error"
+            item.status = "failed"
+        item.finished_at = time.time()
+        print(f"[批量测试] {vehicle.carip} {item.name}: {item.test_status}，耗时 {item.finished_at - item.started_at:.2f} 秒")
+        results_store.record([make_row(
+            "batch", item.item_id, item.test_status, category="system" if item.kind == "system" else "camera",
+            hostname=vehicle.hostname, carip=vehicle.carip, vehicle_model=vehicle.vehiclemodel, session=run.id,
+            elapsed=item.finished_at - item.started_at, data=item.result, recorded_at=item.started_at)])
+
+        with self._lock:
+            self._running[vehicle.carip] -= 1
+        completed = run._item_changed()
+        event_bus.publish("batch", {
+            "batch_id": run.id,
+            "hostname": vehicle.hostname,
+            "item": item.to_dict(),
+            "vehicle_status": vehicle.test_status,
+            "progress": run.progress(),
+            "batch_status": "finished" if run.done else "running",
+        }, host=vehicle.carip)
+        if completed:
+            print(f"[批量测试] ✅ {run.id} 完成，耗时 {run.finished_at - run.created_at:.2f} 秒: {run.progress()}")
+        self._dispatch(vehicle.carip)
+
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def list_runs(self):
+        with self._lock:
+            self._cleanup()
+            return sorted(self._runs.values(), key=lambda run: run.created_at, reverse=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "per_host": self.per_host,
+                "running": dict(self._running),
+                "queued": {carip: len(queue) for carip, queue in self._queues.items()},
+            }
+
+    def shutdown(self, wait=False):
+        """停止接收新的测试项（服务退出时调用）"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# 全局共享的批量测试调度器
+orchestrator = TestOrchestrator()
@@ -2,35 +2,21 @@
 """
 安全解析devices_data.csv文件（支持多种编码）
 """
-import csv
 import sys
 
 def parse_csv_file(file_path):
     """解析CSV文件并显示内容"""
-    # 尝试不同的编码
-    encodings = ['utf-8', 'gbk', 'gb2312', 'utf-8-sig', 'latin-1']
-    
-    content = None
-    used_encoding = None
-    
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                used_encoding = encoding
-                print(f"成功使用 {encoding} 编码读取文件\n")
-                break
-        except Exception as e:
-            continue
-    
-    if not content:
-        print("无法读取文件，尝试了所有编码格式")
+    # 编码自动识别（只识别一次），解析结果缓存在源文件旁边
+    from test_data import csv_loader
+    try:
+        loaded = csv_loader.load(file_path)
+    except OSError as e:
+        print(f"无法读取文件: {e}")
         return
     
-    # 解析CSV
-    import io
-    reader = csv.reader(io.StringIO(content))
-    rows = list(reader)
+    rows = loaded['rows']
+    used_encoding = loaded['encoding']
+    print(f"成功使用 {used_encoding} 编码读取文件\n")
     
     print("=" * 80)
     print("CSV文件解析报告")
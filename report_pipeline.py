@@ -0,0 +1,217 @@
+# 测试报告流水线
+# 测试结果 -> 报告模型（TestReport）-> 渲染（JSON / XLSX / CSV）-> 保存到report目录 -> 上传飞书云文档（可选）
+# 报告页面、下载报告、云端同步都从同一个报告模型生成：按车型测试计划（test_plan.py）筛选测试项、
+# normal/abnormal 转换为 正常/异常 只做一次；云端同步在服务端生成并保存报告后直接上传，
+# 不再由浏览器下载Excel后再上传回服务器
+
+import csv
+import io
+import json
+import os
+import subprocess
+import tempfile
+
+import config
+from report_writer import REPORT_TITLE, XLSX_MIMETYPE, ReportWriter, report_filename, result_text
+from test_plan import get_test_plan
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 支持的报告格式 {格式: MIME类型}
+REPORT_FORMATS = {
+    'xlsx': XLSX_MIMETYPE,
+    'csv': 'text/csv',
+    'json': 'application/json',
+}
+
+
+class ReportError(Exception):
+    """报告生成、保存或上传失败（status 为接口返回的HTTP状态码）"""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+class TestReport:
+    """单车测试报告模型
+
+    - info: {'vehicle_model', 'app_version', 'hostname', 'test_time', 'tester'}
+    - rows: 按车型测试计划的顺序 [(类别ID, 类别名称, 测试项ID, 测试项名称, 测试结果中文)]
+    """
+
+    def __init__(self, info, rows):
+        self.info = info
+        self.rows = rows
+
+    @classmethod
+    def from_request(cls, data):
+        """根据页面提交的测试结果生成报告（/api/test_report、/api/download_report、/api/publish_report 的请求体）"""
+        test_results = data.get('test_results') or {}
+        vehicle_model = data.get('vehicle_model', 'X100')
+        # 根据车型的测试计划获取报告中的测试项（已按TAB顺序排列，相机和按键测试只包含页面上显示的测试项）
+        plan = get_test_plan(vehicle_model)
+        rows = [
+            (category_id, category_name, item_id, item_name,
+             result_text(test_results.get(category_id, {}).get(item_id)))
+            for category_id, category_name, item_id, item_name in plan.items
+        ]
+        info = {
+            'vehicle_model': vehicle_model,
+            'app_version': data.get('app_version', '-'),  # 软件版本（从请求中获取APP_VERSION）
+            'hostname': data.get('hostname', ''),  # 设备序列号
+            'test_time': data.get('test_time', ''),  # 前端传递的测试开始时间
+            'tester': data.get('tester', '张三'),
+        }
+        return cls(info, rows)
+
+    @property
+    def filename_stem(self):
+        return os.path.splitext(report_filename(self.info['vehicle_model'], self.info['test_time']))[0]
+
+    def filename(self, fmt='xlsx'):
+        """报告文件名：机器人静态测试报告_<型号>_<测试开始时间>.<格式>"""
+        return f'{self.filename_stem}.{fmt}'
+
+    def summary(self):
+        counts = {'正常': 0, '异常': 0, '未测试': 0}
+        for row in self.rows:
+            counts[row[4]] = counts.get(row[4], 0) + 1
+        return counts
+
+    def to_dict(self):
+        """/api/test_report 的响应内容"""
+        return {
+            'status': 'success',
+            'data': [{'category': category_name, 'item': item_name, 'result': result,
+                      'category_id': category_id, 'item_id': item_id}
+                     for category_id, category_name, item_id, item_name, result in self.rows],
+            'title': REPORT_TITLE,
+            'vehicle_model': self.info['vehicle_model'],
+            'hostname': self.info['hostname'],
+            'test_time': self.info['test_time'] or '-',  # 没有测试时间时显示"-"
+            'summary': self.summary(),
+        }
+
+
+def _render_xlsx(report):
+    writer = ReportWriter()
+    writer.write_vehicle_report(report.info, ((row[1], row[3], row[4]) for row in report.rows))
+    return writer.save()
+
+
+def _render_csv(report):
+    output = tempfile.SpooledTemporaryFile(max_size=config.REPORT_SPOOL_SIZE)
+    # 带BOM的UTF-8，Excel直接打开不乱码
+    text = io.TextIOWrapper(output, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    for label, key in (('型号', 'vehicle_model'), ('软件版本', 'app_version'), ('设备序列号', 'hostname'),
+                       ('测试时间', 'test_time'), ('测试人员', 'tester')):
+        writer.writerow([label, report.info.get(key) or '-'])
+    writer.writerow([])
+    writer.writerow(['测试类别', '测试项', '测试结果'])
+    writer.writerows((row[1], row[3], row[4]) for row in report.rows)
+    text.flush()
+    text.detach()
+    output.seek(0)
+    return output
+
+
+def _render_json(report):
+    output = tempfile.SpooledTemporaryFile(max_size=config.REPORT_SPOOL_SIZE)
+    output.write(json.dumps(dict(report.to_dict(), info=report.info), ensure_ascii=False).encode('utf-8'))
+    output.seek(0)
+    return output
+
+
+_RENDERERS = {'xlsx': _render_xlsx, 'csv': _render_csv, 'json': _render_json}
+
+
+def render(report, fmt='xlsx'):
+    """渲染报告，返回定位到开头的临时文件（由调用方或send_file关闭）"""
+    if fmt not in _RENDERERS:
+        raise ReportError(f"不支持的报告格式: {fmt}（支持: {', '.join(REPORT_FORMATS)}）", 400)
+    return _RENDERERS[fmt](report)
+
+
+def report_dir():
+    return os.path.join(BASE_DIR, config.REPORT_ARCHIVE_DIR)
+
+
+def archive(report, fmt='xlsx'):
+    """渲染报告并保存到report目录（先写临时文件再替换，上传脚本不会读到写了一半的文件），返回 (文件名, 路径, 大小)"""
+    directory = report_dir()
+    os.makedirs(directory, exist_ok=True)
+    filename = report.filename(fmt)
+    file_path = os.path.join(directory, filename)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f, render(report, fmt) as rendered:
+            while True:
+                chunk = rendered.read(64 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    size = os.path.getsize(file_path)
+    print(f"[保存报告] 文件已保存: {file_path}, 大小: {size}字节")
+    return filename, file_path, size
+
+
+def upload(cloudname, cloudsize=None):
+    """调用 fs_files_upload.py 把report目录中的报告上传到飞书云文档，返回脚本输出；失败时抛出 ReportError"""
+    file_path = os.path.join(report_dir(), os.path.basename(cloudname))
+    # 检查文件是否存在
+    if not os.path.exists(file_path):
+        raise ReportError(f"文件不存在: {file_path}", 400)
+
+    # 验证文件大小
+    actual_size = os.path.getsize(file_path)
+    if cloudsize is not None and actual_size != cloudsize:
+        print(f"[云端同步] ⚠️ 文件大小不匹配: 预期{cloudsize}字节，实际{actual_size}字节，使用实际大小")
+    print(f"[云端同步] 准备上传文件: {cloudname}, 大小: {actual_size}字节, 路径: {file_path}")
+
+    script_path = os.path.join(BASE_DIR, 'fs_files_upload.py')
+    if not os.path.exists(script_path):
+        raise ReportError(f"上传脚本不存在: {script_path}")
+    try:
+        result = subprocess.run(
+            ['python', script_path, os.path.basename(cloudname), str(actual_size)],
+            capture_output=True,
+            text=True,
+            timeout=config.CLOUD_UPLOAD_TIMEOUT,
+            cwd=BASE_DIR
+        )
+    except subprocess.TimeoutExpired:
+        raise ReportError("上传脚本执行超时")
+    except Exception as e:
+        raise ReportError(f"执行上传脚本失败: {str(e)}")
+
+    print(f"[云端同步] 脚本执行完成，返回码: {result.returncode}")
+    print(f"[云端同步] 脚本输出:\n{result.stdout}")
+    if result.stderr:
+        print(f"[云端同步] 脚本错误输出:\n{result.stderr}")
+    if result.returncode != 0:
+        raise ReportError(f"上传脚本执行失败: {result.stderr or result.stdout}")
+    return result.stdout
+
+
+def publish(report, fmt='xlsx', upload_to_cloud=False):
+    """保存报告到report目录，需要时上传到云端，返回接口响应内容"""
+    cloudname, file_path, cloudsize = archive(report, fmt)
+    response = {
+        "status": "success",
+        "message": "文件已保存到本地",
+        "cloudname": cloudname,
+        "cloudsize": cloudsize,
+        "file_path": file_path,
+        "summary": report.summary(),
+    }
+    if upload_to_cloud:
+        response["output"] = upload(cloudname, cloudsize)
+        response["message"] = f"文件已成功上传到云端: {cloudname}"
+    return response
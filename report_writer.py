@@ -0,0 +1,231 @@
+# 测试报告Excel生成
+# 直接按行写出xlsx（Office Open XML）：工作表的XML逐行写入zip条目，不在内存中建立单元格对象；
+# 样式在styles.xml中注册为命名样式，每种样式只定义一次，单元格只引用样式编号
+# （不再逐个单元格新建Font/Alignment/PatternFill，也不需要写完后再遍历一遍设置对齐）。
+# openpyxl的只写模式同样不保留单元格，但每个带样式的单元格都要单独解析样式并逐个元素序列化XML，
+# 几千行的批量报告需要数秒；这里每行拼接一次XML，几万行也在一秒左右完成。
+# 生成的xlsx写入临时文件（不超过REPORT_SPOOL_SIZE时在内存中，超过后转存磁盘），由接口直接作为响应流返回，
+# 单车报告和包含几千行的多车批量报告内存占用都保持平稳
+
+import re
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import config
+
+REPORT_TITLE = '机器人静态测试报告'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# 测试结果的中文显示
+RESULT_TEXT = {'normal': '正常', 'abnormal': '异常'}
+# 批量测试中测试项的结果（error为执行失败，未完成的测试项没有结果）
+BATCH_RESULT_TEXT = {'normal': '正常', 'abnormal': '异常', 'error': '错误'}
+
+
+def result_text(result):
+    """normal/abnormal -> 正常/异常，其他（未提交结果）为未测试"""
+    return RESULT_TEXT.get(result, '未测试')
+
+
+# 字体 (字号, 加粗, 颜色)，0为默认字体
+_FONTS = [(11, False, None), (16, True, None), (12, True, None), (12, False, None), (11, True, 'FFFFFFFF')]
+# 填充色，0为无填充
+_FILLS = [None, 'FF4472C4', 'FFC6EFCE', 'FFFFC7CE']
+# 报告使用的命名样式 (样式名, 字体, 填充)，均为水平垂直居中
+_NAMED_STYLES = [
+    ('report_title', 1, 0),
+    ('report_label', 2, 0),
+    ('report_value', 3, 0),
+    ('report_header', 4, 1),
+    ('report_cell', 0, 0),
+    ('report_normal', 0, 2),
+    ('report_abnormal', 0, 3),
+]
+# {样式名: 单元格样式编号}（0为默认样式）
+_STYLE_IDS = {name: index for index, (name, _, _) in enumerate(_NAMED_STYLES, start=1)}
+
+# 结果列的样式
+_RESULT_STYLES = {'正常': 'report_normal', '异常': 'report_abnormal', '错误': 'report_abnormal'}
+
+# XML中不允许出现的控制字符
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_COLUMNS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+
+
+def _styles_xml():
+    """styles.xml：字体、填充、命名样式（cellStyleXfs/cellStyles）和引用它们的单元格样式（cellXfs）"""
+    fonts = []
+    for size, bold, color in _FONTS:
+        bold_tag = '<b/>' if bold else ''
+        color_tag = f'<color rgb="{color}"/>' if color else ''
+        fonts.append(f'<font>{bold_tag}<sz val="{size}"/>{color_tag}<name val="Calibri"/><family val="2"/><scheme val="minor"/></font>')
+    # 前两个填充是规范要求的保留项
+    fills = ['<fill><patternFill patternType="none"/></fill>', '<fill><patternFill patternType="gray125"/></fill>']
+    for color in _FILLS[1:]:
+        fills.append(f'<fill><patternFill patternType="solid"><fgColor rgb="{color}"/><bgColor rgb="{color}"/></patternFill></fill>')
+
+    def xf(font, fill, xf_id=''):
+        fill_id = fill + 1 if fill else 0
+        return (f'<xf numFmtId="0" fontId="{font}" fillId="{fill_id}" borderId="0"{xf_id} applyFont="1" applyFill="1" '
+                f'applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>')
+
+    default_xf = '<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+    style_xfs = [default_xf] + [xf(font, fill) for _, font, fill in _NAMED_STYLES]
+    cell_xfs = ['<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'] + [
+        xf(font, fill, f' xfId="{_STYLE_IDS[name]}"') for name, font, fill in _NAMED_STYLES]
+    cell_styles = ['<cellStyle name="Normal" xfId="0" builtinId="0"/>'] + [
+        f'<cellStyle name="{name}" xfId="{_STYLE_IDS[name]}"/>' for name, _, _ in _NAMED_STYLES]
+    return (
+        f'{_XML_HEADER}<styleSheet xmlns="{_MAIN_NS}">'
+        f'<fonts count="{len(fonts)}">{"".join(fonts)}</fonts>'
+        f'<fills count="{len(fills)}">{"".join(fills)}</fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        f'<cellStyleXfs count="{len(style_xfs)}">{"".join(style_xfs)}</cellStyleXfs>'
+        f'<cellXfs count="{len(cell_xfs)}">{"".join(cell_xfs)}</cellXfs>'
+        f'<cellStyles count="{len(cell_styles)}">{"".join(cell_styles)}</cellStyles>'
+        '</styleSheet>'
+    )
+
+
+def _cell(ref, value, style):
+    """单元格XML：数字写为数值，其他写为内联字符串"""
+    style_attr = f' s="{_STYLE_IDS[style]}"' if style else ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    text = escape(_INVALID_XML_CHARS.sub('', str(value)))
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class _SheetStream:
+    """正在写入的工作表，每次写入一行XML"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.row_count = 0
+
+    def row(self, values=(), style=None):
+        """写入一行，style 为统一的样式名或与values等长的样式名列表（None表示不设置样式），值为None的单元格留空"""
+        self.row_count += 1
+        styles = style if isinstance(style, (list, tuple)) else [style] * len(values)
+        cells = ''.join(_cell(f'{_COLUMNS[column]}{self.row_count}', value, cell_style)
+                        for column, (value, cell_style) in enumerate(zip(values, styles)) if value is not None)
+        self.stream.write(f'<row r="{self.row_count}">{cells}</row>'.encode('utf-8'))
+
+
+class ReportWriter:
+    """流式写入的测试报告工作簿（每个实例生成一个文件，save() 后不能再写入）"""
+
+    def __init__(self):
+        self.output = tempfile.SpooledTemporaryFile(max_size=config.REPORT_SPOOL_SIZE)
+        self.archive = zipfile.ZipFile(self.output, 'w', zipfile.ZIP_DEFLATED)
+        self.sheet_titles = []
+
+    def _write_sheet(self, title, widths, write_rows, merged=(), freeze_rows=0):
+        """写入一个工作表，write_rows(sheet) 逐行写入；列宽、冻结行、合并单元格在写入前指定"""
+        self.sheet_titles.append(title[:31])  # Excel工作表名称最多31个字符
+        name = f'xl/worksheets/sheet{len(self.sheet_titles)}.xml'
+        with self.archive.open(name, 'w', force_zip64=True) as stream:
+            head = [f'{_XML_HEADER}<worksheet xmlns="{_MAIN_NS}">']
+            if freeze_rows:
+                head.append(f'<sheetViews><sheetView workbookViewId="0"><pane ySplit="{freeze_rows}" '
+                            f'topLeftCell="A{freeze_rows + 1}" activePane="bottomLeft" state="frozen"/>'
+                            f'</sheetView></sheetViews>')
+            head.append('<cols>')
+            head.extend(f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>' for i, width in enumerate(widths, start=1))
+            head.append('</cols><sheetData>')
+            stream.write(''.join(head).encode('utf-8'))
+            write_rows(_SheetStream(stream))
+            tail = ['</sheetData>']
+            if merged:
+                tail.append(f'<mergeCells count="{len(merged)}">')
+                tail.extend(f'<mergeCell ref="{ref}"/>' for ref in merged)
+                tail.append('</mergeCells>')
+            tail.append('</worksheet>')
+            stream.write(''.join(tail).encode('utf-8'))
+
+    def write_vehicle_report(self, info, rows, title='测试报告'):
+        """单车测试报告
+
+        info: {'vehicle_model', 'app_version', 'hostname', 'test_time', 'tester'}
+        rows: [(测试类别, 测试项, 测试结果中文)]，可以是生成器
+        """
+        def write_rows(sheet):
+            sheet.row([REPORT_TITLE], 'report_title')
+            sheet.row()
+            for label, key in (('型号:', 'vehicle_model'), ('软件版本:', 'app_version'), ('设备序列号:', 'hostname'),
+                               ('测试时间:', 'test_time'), ('测试人员:', 'tester')):
+                sheet.row([label, info.get(key) or '-'], ['report_label', 'report_value'])
+            sheet.row()
+            sheet.row(['测试类别', '测试项', '测试结果'], 'report_header')
+            for category, item, result in rows:
+                sheet.row([category, item, result], ['report_cell', 'report_cell', _RESULT_STYLES.get(result, 'report_cell')])
+
+        self._write_sheet(title, [20, 30, 15], write_rows, merged=['A1:C1'])
+
+    def write_batch_report(self, run, title='批量测试报告'):
+        """多车批量测试报告，每台车辆的每个测试项一行
+
+        run: BatchRun.to_dict() 的结果
+        """
+        def write_rows(sheet):
+            sheet.row(['设备序列号', '车辆IP', '型号', '测试项', '测试结果', '耗时(秒)', '说明'], 'report_header')
+            for vehicle in run.get('vehicles', []):
+                for item in vehicle.get('items', []):
+                    result = BATCH_RESULT_TEXT.get(item.get('test_status'), '未完成')
+                    detail = item.get('error') or (item.get('result') or {}).get('message', '')
+                    sheet.row([vehicle.get('hostname'), vehicle.get('carip'), vehicle.get('vehiclemodel'),
+                               item.get('name'), result, item.get('elapsed'), detail],
+                              ['report_cell'] * 4 + [_RESULT_STYLES.get(result, 'report_cell'), 'report_cell', None])
+
+        self._write_sheet(title, [20, 16, 30, 22, 10, 10, 40], write_rows, freeze_rows=1)
+
+    def save(self):
+        """写出工作簿、样式和包结构，返回定位到开头的临时文件（由调用方或send_file关闭）"""
+        count = len(self.sheet_titles)
+        sheets = ''.join(f'<sheet name={quoteattr(title)} sheetId="{i}" r:id="rId{i}"/>'
+                         for i, title in enumerate(self.sheet_titles, start=1))
+        sheet_rels = ''.join(f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                             for i in range(1, count + 1))
+        sheet_types = ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{_CONTENT_TYPE}worksheet+xml"/>'
+                              for i in range(1, count + 1))
+        parts = {
+            '[Content_Types].xml': (
+                f'{_XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                f'<Override PartName="/xl/workbook.xml" ContentType="{_CONTENT_TYPE}sheet.main+xml"/>'
+                f'<Override PartName="/xl/styles.xml" ContentType="{_CONTENT_TYPE}styles+xml"/>'
+                f'{sheet_types}</Types>'),
+            '_rels/.rels': (
+                f'{_XML_HEADER}<Relationships xmlns="{_PACKAGE_REL_NS}">'
+                f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'),
+            'xl/workbook.xml': (
+                f'{_XML_HEADER}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheets}</sheets></workbook>'),
+            'xl/_rels/workbook.xml.rels': (
+                f'{_XML_HEADER}<Relationships xmlns="{_PACKAGE_REL_NS}">{sheet_rels}'
+                f'<Relationship Id="rId{count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/></Relationships>'),
+            'xl/styles.xml': _styles_xml(),
+        }
+        for name, content in parts.items():
+            self.archive.writestr(name, content)
+        self.archive.close()
+        self.output.seek(0)
+        return self.output
+
+
+def report_filename(vehicle_model, test_time=None):
+    """报告文件名：机器人静态测试报告_<型号>_<测试开始时间>.xlsx（没有测试时间时使用当前时间）"""
+    from datetime import datetime
+    if test_time and test_time != '-':
+        # 将格式从 "2026-01-13 11:13:20" 转换为 "2026-01-13_11-13-20"（文件名中不能有冒号）
+        time_str = test_time.replace(' ', '_').replace(':', '-')
+    else:
+        time_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return f'{REPORT_TITLE}_{vehicle_model}_{time_str}.xlsx'
@@ -0,0 +1,298 @@
+# 测试结果存储
+# 每次IO检查（/api/check_io、批量测试）的结果和页面提交的测试结果（/api/submit_test）写入本地SQLite数据库（WAL模式），
+# 按设备序列号、设备型号、车型、测试类别、测试项、时间建立索引，
+# "本周哪些车辆的front_tof异常" 这类问题直接查询，不再逐个打开report目录下的Excel报告。
+# 写入由单独的写线程批量执行：接口只把结果放入队列，写线程每 RESULTS_FLUSH_INTERVAL 秒
+# 或积累 RESULTS_BATCH_SIZE 条时在一个事务中写入；查询使用每个线程自己的只读连接，与写入互不阻塞
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import config
+from test_data.vehicle_model import family_of
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,      -- 测试时间（Unix时间戳）
+    source TEXT NOT NULL,           -- check_io / batch / submit / import
+    session TEXT,                   -- 同一次测试的标识（设备序列号+测试开始时间），重复提交时替换
+    hostname TEXT,                  -- 设备序列号
+    carip TEXT,
+    vehicle_model TEXT,
+    family TEXT,                    -- 车型（X060等）
+    category TEXT,                  -- 测试类别ID
+    item TEXT,                      -- 测试项ID
+    result TEXT,                    -- normal / abnormal / error
+    elapsed REAL,                   -- 检查耗时（秒），按键测试即按下按钮的用时
+    data TEXT                       -- 处理器返回的测量值（JSON）
+);
+CREATE INDEX IF NOT EXISTS idx_results_time ON results (recorded_at);
+CREATE INDEX IF NOT EXISTS idx_results_hostname ON results (hostname, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_results_model ON results (vehicle_model, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_results_family ON results (family, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_results_category ON results (category, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_results_item ON results (item, result, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_results_session ON results (session);
+"""
+
+COLUMNS = ('recorded_at', 'source', 'session', 'hostname', 'carip', 'vehicle_model', 'family',
+            'category', 'item', 'result', 'elapsed', 'data')
+_INSERT = f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# 保存的处理器结果字段（测量值），其他字段（如原始输出）不保存
+RECORDED_FIELDS = ('message', 'io_index', 'io_value', 'expected_value', 'avg_delay', 'min_delay', 'max_delay',
+                   'jitter', 'packet_loss_rate', 'sent', 'received', 'matched')
+
+# 可用于查询过滤的字段
+FILTER_FIELDS = ('hostname', 'carip', 'vehicle_model', 'family', 'category', 'item', 'result', 'source', 'session')
+
+
+def parse_time(value):
+    """时间参数：Unix时间戳，或 "2026-01-13"、"2026-01-13 11:13:20" 格式的本地时间；无法识别时返回None"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d_%H-%M-%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def make_row(source, item, result, category=None, hostname=None, carip=None, vehicle_model=None,
+             session=None, elapsed=None, data=None, recorded_at=None):
+    """生成一条测试结果记录"""
+    measured = {key: data[key] for key in RECORDED_FIELDS if data and data.get(key) is not None}
+    return (
+        recorded_at or time.time(), source, session, hostname or None, carip or None, vehicle_model or None,
+        family_of(vehicle_model) if vehicle_model else None, category, item, result,
+        round(elapsed, 3) if elapsed is not None else None,
+        json.dumps(measured, ensure_ascii=False) if measured else None,
+    )
+
+
+def _row_dict(row):
+    result = dict(row)
+    result['data'] = json.loads(result['data']) if result.get('data') else {}
+    result['time'] = datetime.fromtimestamp(result['recorded_at']).strftime('%Y-%m-%d %H:%M:%S')
+    return result
+
+
+class ResultsStore:
+    """SQLite测试结果存储（写线程批量写入，查询使用线程本地连接）"""
+
+    def __init__(self, path=None):
+        self._path = path
+        self._queue = queue.Queue()
+        self._writer = None
+        self._start_lock = threading.Lock()
+        self._local = threading.local()
+        self._listeners = []
+        self.written = 0
+        self.batches = 0
+        self.last_error = None
+
+    @property
+    def path(self):
+        path = self._path or config.RESULTS_DB_PATH
+        return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=config.RESULTS_BUSY_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._start_lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connect()
+            conn.executescript(_SCHEMA)
+            for listener in self._listeners:
+                listener.initialize(conn)
+            conn.close()
+            self._writer = threading.Thread(target=self._write_loop, name="results-writer", daemon=True)
+            self._writer.start()
+
+    def open(self):
+        """打开数据库：创建结果表、调用写入监听的initialize（如创建汇总表），并启动写线程"""
+        self._ensure_writer()
+
+    def add_listener(self, listener):
+        """注册写入监听（如汇总表）：listener.initialize(conn) 在打开数据库时调用，
+        listener.apply(conn, rows, sign) 在写入的同一事务中调用（sign为1表示新增，-1表示被替换删除的记录）"""
+        with self._start_lock:
+            self._listeners.append(listener)
+            running = self._writer is not None and self._writer.is_alive()
+        if running:
+            self.flush()
+            conn = self._connect()
+            try:
+                listener.initialize(conn)
+            finally:
+                conn.close()
+
+    def record(self, rows, replace_session=None):
+        """写入测试结果（放入写入队列后立即返回）；replace_session 不为空时先删除该次测试之前提交的记录"""
+        rows = list(rows)
+        if not rows and not replace_session:
+            return
+        self._ensure_writer()
+        self._queue.put((rows, replace_session))
+
+    def flush(self, timeout=5):
+        """等待队列中已有的结果写入数据库，返回是否在超时前完成"""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            pending = [self._queue.get()]
+            # 积累一批再写入（最多等待 RESULTS_FLUSH_INTERVAL 秒）
+            deadline = time.time() + config.RESULTS_FLUSH_INTERVAL
+            count = len(pending[0][0]) if isinstance(pending[0], tuple) else 0
+            while count < config.RESULTS_BATCH_SIZE and not isinstance(pending[-1], threading.Event):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(entry)
+                if isinstance(entry, tuple):
+                    count += len(entry[0])
+            self._write_batch(conn, [entry for entry in pending if isinstance(entry, tuple)])
+            for entry in pending:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+
+    def _write_batch(self, conn, entries):
+        if not entries:
+            return
+        count = sum(len(rows) for rows, _ in entries)
+        try:
+            with conn:
+                for rows, replace_session in entries:
+                    if replace_session:
+                        self._delete_session(conn, replace_session)
+                    conn.executemany(_INSERT, rows)
+                    for listener in self._listeners:
+                        listener.apply(conn, rows, 1)
+            self.written += count
+            self.batches += 1
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[结果存储] ❌ 写入 {count} 条测试结果失败: {e}")
+
+    def _delete_session(self, conn, session):
+        if self._listeners:
+            old_rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM results WHERE session = ?", (session,)).fetchall()
+            for listener in self._listeners:
+                listener.apply(conn, [tuple(row) for row in old_rows], -1)
+        conn.execute("DELETE FROM results WHERE session = ?", (session,))
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._ensure_writer()
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def execute(self, sql, params=()):
+        """执行只读查询，返回行列表"""
+        return self._reader().execute(sql, params).fetchall()
+
+    def _where(self, filters, since=None, until=None):
+        clauses, params = [], []
+        for field in FILTER_FIELDS:
+            value = filters.get(field)
+            if value:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("recorded_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("recorded_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, filters=None, since=None, until=None, limit=100, offset=0):
+        """按条件查询测试结果（按时间倒序），返回 (记录列表, 总数)"""
+        where, params = self._where(filters or {}, since, until)
+        total = self.execute(f"SELECT COUNT(*) FROM results{where}", params)[0][0]
+        rows = self.execute(f"SELECT * FROM results{where} ORDER BY recorded_at DESC LIMIT ? OFFSET ?",
+                            params + [limit, offset])
+        return [_row_dict(row) for row in rows], total
+
+    def failures(self, filters=None, since=None, until=None, limit=100):
+        """按设备汇总异常记录：[{hostname, vehicle_model, failures, tests, last_failure, items}]
+
+        单项IO检查（check_io）的结果随后还会通过 /api/submit_test 提交一次，未指定source时不计入，每次测试只统计一次
+        """
+        filters = dict(filters or {})
+        filters.pop('result', None)
+        where, params = self._where(filters, since, until)
+        if not filters.get('source'):
+            where += (" AND " if where else " WHERE ") + "source != 'check_io'"
+        failed = "result IN ('abnormal', 'error')"
+        rows = self.execute(
+            f"SELECT hostname, MAX(vehicle_model) AS vehicle_model, "
+            f"SUM({failed}) AS failures, COUNT(*) AS tests, "
+            f"MAX(CASE WHEN {failed} THEN recorded_at END) AS last_failure, "
+            f"GROUP_CONCAT(DISTINCT CASE WHEN {failed} THEN item END) AS items "
+            f"FROM results{where} GROUP BY hostname HAVING failures > 0 ORDER BY failures DESC, last_failure DESC LIMIT ?",
+            params + [limit])
+        return [{
+            "hostname": row['hostname'],
+            "vehicle_model": row['vehicle_model'],
+            "failures": row['failures'],
+            "tests": row['tests'],
+            "last_failure": datetime.fromtimestamp(row['last_failure']).strftime('%Y-%m-%d %H:%M:%S'),
+            "items": sorted((row['items'] or '').split(',')) if row['items'] else [],
+        } for row in rows]
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "last_error": self.last_error,
+        }
+
+    def close(self, timeout=5):
+        """退出前写入队列中剩余的结果"""
+        if not self.flush(timeout):
+            print(f"[结果存储] ⚠️ 退出时仍有 {self._queue.qsize()} 批测试结果未写入")
+
+
+# 全局共享的测试结果存储
+results_store = ResultsStore()
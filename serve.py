@@ -0,0 +1,94 @@
+# 生产模式启动入口
+# python app.py 使用Flask自带的开发服务器（单进程、调试模式），只适合本地调试；
+# 工位实际使用时通过本脚本用生产级WSGI服务器运行，支持配置线程数/进程数，退出时关闭连接池中的SSH连接
+#
+# 用法：
+#   python serve.py                                  # 使用config中的SERVE_*配置（默认waitress）
+#   python serve.py --port 8000 --threads 64
+#   python serve.py --backend gunicorn --workers 2   # 仅Linux，需要 pip install gunicorn
+
+import argparse
+import atexit
+import signal
+import sys
+
+import config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="机器人出厂测试系统 - 生产模式启动")
+    parser.add_argument("--backend", choices=["waitress", "gunicorn"], default=config.SERVE_BACKEND,
+                        help="WSGI服务器（默认: %(default)s）")
+    parser.add_argument("--host", default=config.SERVE_HOST, help="监听地址（默认: %(default)s）")
+    parser.add_argument("--port", type=int, default=config.SERVE_PORT, help="监听端口（默认: %(default)s）")
+    parser.add_argument("--threads", type=int, default=config.SERVE_THREADS,
+                        help="每个进程的工作线程数（默认: %(default)s）")
+    parser.add_argument("--workers", type=int, default=config.SERVE_WORKERS,
+                        help="进程数，仅gunicorn有效（默认: %(default)s）")
+    return parser.parse_args()
+
+
+def serve_waitress(args):
+    """waitress：纯Python多线程服务器，Windows和Linux都可用"""
+    from waitress import serve
+    from app import app, shutdown_services
+
+    def on_signal(signum, frame):
+        print(f"[服务] 收到信号 {signum}，准备退出")
+        shutdown_services()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    atexit.register(shutdown_services)
+
+    if args.workers > 1:
+        print(f"[服务] ⚠️ waitress只支持单进程，忽略 --workers {args.workers}，请通过 --threads 调整并发")
+    print(f"[服务] waitress 启动: http://{args.host}:{args.port}，线程数 {args.threads}")
+    # channel_timeout需大于SSE心跳间隔和长轮询时间，避免事件连接被服务器断开
+    serve(app, host=args.host, port=args.port, threads=args.threads,
+          channel_timeout=max(120, config.JOB_LONG_POLL_TIMEOUT * 2, config.EVENT_KEEPALIVE_INTERVAL * 4),
+          ident="RobotTest")
+
+
+def serve_gunicorn(args):
+    """gunicorn：多进程（gthread worker，每个进程多线程），仅Linux可用"""
+    from gunicorn.app.base import BaseApplication
+
+    class RobotTestApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("threads", args.threads)
+            self.cfg.set("worker_class", "gthread")
+            # SSE和长轮询会长时间占用连接，超时需大于心跳间隔
+            self.cfg.set("timeout", max(120, config.JOB_LONG_POLL_TIMEOUT * 2, config.EVENT_KEEPALIVE_INTERVAL * 4))
+            self.cfg.set("graceful_timeout", config.SERVE_SHUTDOWN_TIMEOUT)
+            self.cfg.set("worker_exit", on_worker_exit)
+
+        def load(self):
+            # 每个worker进程各自导入app，SSH连接池、后台任务、事件推送都在进程内
+            from app import app
+            return app
+
+    def on_worker_exit(server, worker):
+        from app import shutdown_services
+        shutdown_services()
+
+    if args.workers > 1:
+        print(f"[服务] ⚠️ {args.workers}个进程之间不共享后台任务和事件推送，"
+              f"需要负载均衡将同一浏览器固定到同一进程")
+    print(f"[服务] gunicorn 启动: http://{args.host}:{args.port}，进程数 {args.workers}，每进程线程数 {args.threads}")
+    RobotTestApplication().run()
+
+
+def main():
+    args = parse_args()
+    if args.backend == "gunicorn":
+        serve_gunicorn(args)
+    else:
+        serve_waitress(args)
+
+
+if __name__ == "__main__":
+    main()
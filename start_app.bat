@@ -43,9 +43,9 @@ if not exist "app.py" (
 
 REM 检查requirements.txt中的依赖是否已安装（可选检查）
 echo [启动] 检查Python环境...
-python -c "import flask" >nul 2>&1
+python -c "import flask, waitress" >nul 2>&1
 if %errorlevel% neq 0 (
-    echo [警告] Flask未安装，请先运行: pip install -r requirements.txt
+    echo [警告] Flask或waitress未安装，请先运行: pip install -r requirements.txt
     echo [警告] 继续尝试启动...
     echo.
 )
@@ -58,8 +58,8 @@ echo.
 echo ========================================
 echo.
 
-REM 在后台启动Flask应用（不打开新窗口）
-start /B python app.py
+REM 在后台以生产模式启动Flask应用（不打开新窗口），本地调试可改用 python app.py
+start /B python serve.py
 
 REM 等待Flask应用启动（根据网络和系统性能，等待4秒）
 echo [启动] 等待Flask应用启动...
@@ -116,6 +116,122 @@ function getSSHInfo() {
     };
 }
 
+// 从URL获取被测车辆信息（随IO检查请求提交，用于保存测试结果）
+function getTestContext() {
+    const urlParams = new URLSearchParams(window.location.search);
+    return {
+        hostname: urlParams.get('hostname') || '',
+        vehicle_model: urlParams.get('vehiclemodel') || 'X100'
+    };
+}
+
+// 实时事件推送（/api/events，Server-Sent Events）
+// 整个页面共用一个EventSource连接，按事件类型分发给各测试项的处理函数
+const serverEventHandlers = {};   // {事件类型: Set(处理函数)}
+const recentJobEvents = {};       // {job_id: 任务数据}，避免任务在注册监听前就已完成而错过事件
+let serverEventSource = null;
+
+function connectServerEvents() {
+    if (serverEventSource || typeof EventSource === 'undefined') {
+        return serverEventSource;
+    }
+    const sshHost = getSSHInfo().ssh_host;
+    serverEventSource = new EventSource(`/api/events${sshHost ? '?host=' + encodeURIComponent(sshHost) : ''}`);
+    ['io', 'ping', 'tof', 'job'].forEach(type => {
+        serverEventSource.addEventListener(type, event => {
+            const data = JSON.parse(event.data);
+            if (type === 'job') {
+                recentJobEvents[data.job_id] = data;
+            }
+            (serverEventHandlers[type] || new Set()).forEach(handler => handler(data));
+        });
+    });
+    return serverEventSource;
+}
+
+// 监听指定类型的事件，返回取消监听的函数
+function onServerEvent(type, handler) {
+    connectServerEvents();
+    if (!serverEventHandlers[type]) {
+        serverEventHandlers[type] = new Set();
+    }
+    serverEventHandlers[type].add(handler);
+    return () => serverEventHandlers[type].delete(handler);
+}
+
+function serverEventsConnected() {
+    return !!serverEventSource && serverEventSource.readyState === EventSource.OPEN;
+}
+
+// 以后台任务方式调用耗时接口（send_command / check_io）
+// 请求立即返回job_id，任务完成时通过job事件推送结果（事件通道不可用时长轮询 /api/jobs/<job_id>），返回与同步调用相同的结果数据
+function runJob(url, payload) {
+    connectServerEvents();
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(Object.assign({}, payload, { async: true }))
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status !== 'accepted' || !data.job_id) {
+            return data;  // 未进入后台执行（如排队已满），直接返回错误信息
+        }
+        return waitJob(data.job_id);
+    });
+}
+
+function waitJob(jobId) {
+    return new Promise(resolve => {
+        let settled = false;
+        let fallbackTimer = null;
+        let offJobEvent = null;
+        
+        function finish(job) {
+            if (settled) return;
+            settled = true;
+            clearTimeout(fallbackTimer);
+            if (offJobEvent) offJobEvent();
+            delete recentJobEvents[jobId];
+            if (job.job_status === 'finished') {
+                resolve(job.result);
+            } else {
+                resolve({ status: 'error', message: job.error || job.message || '后台任务执行失败' });
+            }
+        }
+        
+        // 兜底：事件通道未连接或错过事件时长轮询
+        function pollJob() {
+            if (settled) return;
+            fetch(`/api/jobs/${jobId}?wait=25`)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.job_status === 'finished' || job.job_status === 'failed' || job.status === 'error') {
+                        finish(job);
+                    } else {
+                        pollJob();
+                    }
+                })
+                .catch(() => { fallbackTimer = setTimeout(pollJob, 3000); });
+        }
+        
+        if (recentJobEvents[jobId]) {
+            finish(recentJobEvents[jobId]);
+            return;
+        }
+        offJobEvent = onServerEvent('job', job => {
+            if (job.job_id === jobId) finish(job);
+        });
+        if (serverEventsConnected()) {
+            fallbackTimer = setTimeout(pollJob, 60000);
+        } else {
+            pollJob();
+        }
+    });
+}
+
 // 页面加载时初始化
 document.addEventListener('DOMContentLoaded', function() {
     // 绑定返回测试配置面按钮
@@ -755,6 +871,32 @@ function renderTestDetails(testId, data) {
                 sectionDiv.appendChild(distanceRow);
             }
             
+            // 相机测试：先创建"一键检测"行（所有设备同时检测）
+            if (testId === 'camera' && section.items.length > 1) {
+                const checkAllRow = document.createElement('div');
+                checkAllRow.className = 'test-item';
+                checkAllRow.style.marginBottom = '15px';
+                
+                const checkAllButtonArea = document.createElement('div');
+                checkAllButtonArea.className = 'button-area';
+                
+                const checkAllButton = document.createElement('button');
+                checkAllButton.className = 'test-button camera-check-all-button';
+                checkAllButton.textContent = '一键检测';
+                checkAllButton.addEventListener('click', function() {
+                    handleCameraCheckAll(testId, section.items);
+                });
+                checkAllButtonArea.appendChild(checkAllButton);
+                checkAllRow.appendChild(checkAllButtonArea);
+                
+                // 添加一个空的result-area以保持布局一致
+                const emptyResultArea = document.createElement('div');
+                emptyResultArea.className = 'result-area';
+                checkAllRow.appendChild(emptyResultArea);
+                
+                sectionDiv.appendChild(checkAllRow);
+            }
+            
             section.items.forEach(item => {
                 // 显示屏测试：跳过"屏幕显示"项目
                 if (testId === 'display' && item.id === 'screen_display') {
@@ -1220,19 +1362,12 @@ function handleTestItem(itemId, testId) {
     const sshInfo = getSSHInfo();
     
     // 发送指令（所有TAB都支持）
-    fetch('/api/send_command', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ 
-            item_id: itemId, 
-            test_id: testId,  // 传递当前测试类型
-            ssh_host: sshInfo.ssh_host,
-            ssh_user: sshInfo.ssh_user
-        })
+    runJob('/api/send_command', {
+        item_id: itemId, 
+        test_id: testId,  // 传递当前测试类型
+        ssh_host: sshInfo.ssh_host,
+        ssh_user: sshInfo.ssh_user
     })
-    .then(response => response.json())
     .then(data => {
         if (data.status === 'success') {
             // 指令发送成功，显示提示弹窗
@@ -1586,20 +1721,13 @@ function checkButtonIO(itemId, testId) {
     
     // 只调用一次check_io，不轮询（避免重复执行rostopic echo指令）
     console.log('[前端调试] 开始检查IO状态（单次调用，不轮询）...');
-    fetch('/api/check_io', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ 
-            item_id: itemId, 
-            test_id: testId,
-            ssh_host: sshInfo.ssh_host,
-            ssh_user: sshInfo.ssh_user,
-            vehicle_model: vehicleModel  // 传递车型信息
-        })
-    })
-    .then(response => response.json())
+    runJob('/api/check_io', Object.assign(getTestContext(), {
+        item_id: itemId, 
+        test_id: testId,
+        ssh_host: sshInfo.ssh_host,
+        ssh_user: sshInfo.ssh_user,
+        vehicle_model: vehicleModel  // 传递车型信息
+    }))
     .then(data => {
         if (isCompleted) return; // 如果已经完成（超时），不再处理
         
@@ -1645,6 +1773,13 @@ function checkButtonIO(itemId, testId) {
             
             // 检查是否所有测试项都完成了
             checkAllTestsCompleted();
+        } else if (data.status === 'error' && data.error === 'unknown_vehicle_model') {
+            // 车型没有IO映射：配置问题而不是设备故障，立即提示，不等待倒计时结束也不勾选结果
+            isCompleted = true;
+            clearTimeout(timeoutTimer);
+            stopCountdownStatus(itemId);
+            updateButtonStatus(itemId, '未知车型');
+            showModal('提示', data.message);
         } else if (data.status === 'error') {
             // 后端返回错误（比如30秒内未获取到数据）
             // 等待超时定时器统一处理
@@ -1702,21 +1837,30 @@ function handleCameraPing(itemId, testId, ipAddress) {
     const startTime = Date.now();
     const pingTimeout = 10000; // 10秒超时
     
-    fetch('/api/check_io', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-            item_id: itemId,
-            test_id: testId,
-            ip_address: ipAddress.trim(),
-            ssh_host: getSSHInfo().ssh_host,
-            ssh_user: getSSHInfo().ssh_user
-        })
-    })
-    .then(response => response.json())
+    // 实时显示每个ping回包的延迟（服务器推送的ping事件）
+    const pingIp = ipAddress.trim();
+    const offPingEvent = onServerEvent('ping', sample => {
+        if (sample.ip !== pingIp) return;
+        const statusElement = getButtonStatusElement(itemId);
+        if (statusElement && sample.summary) {
+            // probe模式只推送统计结果
+            statusElement.textContent = `${itemName} 丢包${sample.summary.loss}% 平均${sample.summary.avg ?? '-'}ms`;
+        } else if (statusElement) {
+            statusElement.textContent = sample.received
+                ? `${itemName}测试中... #${sample.seq} ${sample.delay}ms`
+                : `${itemName}测试中... #${sample.seq} 超时`;
+        }
+    });
+    
+    runJob('/api/check_io', Object.assign(getTestContext(), {
+        item_id: itemId,
+        test_id: testId,
+        ip_address: ipAddress.trim(),
+        ssh_host: getSSHInfo().ssh_host,
+        ssh_user: getSSHInfo().ssh_user
+    }))
     .then(data => {
+        offPingEvent();  // 停止显示实时ping延迟
         console.log('[相机测试] 收到后端响应:', data);
         
         if (data.status === 'success') {
@@ -1791,6 +1935,7 @@ function handleCameraPing(itemId, testId, ipAddress) {
         }
     })
     .catch(error => {
+        offPingEvent();  // 停止显示实时ping延迟
         console.error('[相机测试] Ping测试错误:', error);
         
         // 错误情况，等待10秒后再勾选异常
@@ -1855,19 +2000,12 @@ function handleTofTest(itemId, testId) {
     
     console.log(`[TOF测试] 开始测试 ${itemName}，超时时间: ${timeoutSeconds}秒`);
     
-    fetch('/api/check_io', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-            item_id: itemId,
-            test_id: testId,
-            ssh_host: sshInfo.ssh_host,
-            ssh_user: sshInfo.ssh_user
-        })
-    })
-    .then(response => response.json())
+    runJob('/api/check_io', Object.assign(getTestContext(), {
+        item_id: itemId,
+        test_id: testId,
+        ssh_host: sshInfo.ssh_host,
+        ssh_user: sshInfo.ssh_user
+    }))
     .then(data => {
         console.log(`[TOF测试] ${itemName} 收到后端响应:`, data);
         
@@ -1947,6 +2085,102 @@ function handleTofTest(itemId, testId) {
     });
 }
 
+// 相机一键检测：所有设备的ping和TOF订阅在后端同时执行，耗时约等于最慢的设备
+function handleCameraCheckAll(testId, items) {
+    // 检查是否已点击"开始测试"按钮
+    if (!isTesting) {
+        showModal('提示', '请先点击"开始测试"按钮');
+        return;
+    }
+    
+    const checkAllButton = document.querySelector('.camera-check-all-button');
+    if (!checkAllButton || checkAllButton.disabled) return;
+    
+    // 跳过正在单独测试中的设备，收集页面上填写的IP地址
+    const ipRegex = /^(\d{1,3}\.){3}\d{1,3}$/;
+    const devices = [];
+    const ipAddresses = {};
+    for (const item of items) {
+        const statusText = getButtonStatusElement(item.id);
+        if (statusText && statusText.classList.contains('show') && !statusText.textContent.includes('已完成')) {
+            continue;
+        }
+        const ipInput = document.querySelector(`.ip-input[data-item-id="${item.id}"]`);
+        if (ipInput) {
+            if (!ipRegex.test(ipInput.value.trim())) {
+                showModal('错误', `${item.name} 的IP地址格式不正确`);
+                return;
+            }
+            ipAddresses[item.id] = ipInput.value.trim();
+        }
+        devices.push(item);
+    }
+    if (devices.length === 0) return;
+    
+    // 禁用所有相机测试按钮，显示测试中
+    const cameraButtons = document.querySelectorAll('.camera-check-all-button, .ping-button, .tof-test-button');
+    cameraButtons.forEach(button => button.disabled = true);
+    devices.forEach(item => startCameraCountdown(item.id, item.name, appConfig.ioCheckTimeout / 1000 || 30));
+    
+    // 实时显示每个ping回包的延迟（服务器推送的ping事件）
+    const deviceByIp = {};
+    devices.forEach(item => { if (ipAddresses[item.id]) deviceByIp[ipAddresses[item.id]] = item; });
+    const offPingEvent = onServerEvent('ping', sample => {
+        const item = deviceByIp[sample.ip];
+        const statusElement = item && getButtonStatusElement(item.id);
+        if (statusElement && sample.summary) {
+            // probe模式只推送统计结果
+            statusElement.textContent = `${item.name} 丢包${sample.summary.loss}% 平均${sample.summary.avg ?? '-'}ms`;
+        } else if (statusElement) {
+            statusElement.textContent = sample.received
+                ? `${item.name}测试中... #${sample.seq} ${sample.delay}ms`
+                : `${item.name}测试中... #${sample.seq} 超时`;
+        }
+    });
+    
+    const sshInfo = getSSHInfo();
+    const urlParams = new URLSearchParams(window.location.search);
+    
+    console.log('[相机测试] 一键检测:', devices.map(item => item.id));
+    
+    runJob('/api/camera/check_all', {
+        devices: devices.map(item => item.id),
+        ip_addresses: ipAddresses,
+        vehicle_model: urlParams.get('vehiclemodel') || 'X100',
+        ssh_host: sshInfo.ssh_host,
+        ssh_user: sshInfo.ssh_user
+    })
+    .then(data => {
+        console.log('[相机测试] 一键检测结果:', data);
+        const results = data.results || {};
+        devices.forEach(item => {
+            const result = results[item.id] || {};
+            stopCountdownStatus(item.id);
+            setTestResult(item.id, result.status === 'success' && result.test_status === 'normal' ? 'normal' : 'abnormal', testId);
+            updateButtonStatus(item.id, '已完成');
+            showButtonStatus(item.id, true);
+        });
+        if (data.status !== 'success') {
+            showModal('错误', data.message || '相机一键检测失败');
+        }
+        checkAllTestsCompleted();
+    })
+    .catch(error => {
+        console.error('[相机测试] 一键检测错误:', error);
+        devices.forEach(item => {
+            stopCountdownStatus(item.id);
+            setTestResult(item.id, 'abnormal', testId);
+            updateButtonStatus(item.id, '已完成');
+            showButtonStatus(item.id, true);
+        });
+        showModal('错误', '相机一键检测失败');
+    })
+    .finally(() => {
+        offPingEvent();  // 停止显示实时ping延迟
+        cameraButtons.forEach(button => button.disabled = false);
+    });
+}
+
 // 建立相机测试的SSH连接
 function connectCameraSSH() {
     const sshInfo = getSSHInfo();
@@ -2049,66 +2283,81 @@ function startCameraCountdown(itemId, itemName, timeoutSeconds) {
 
 // 检查IO状态
 function checkIOStatus(itemId) {
-    // 轮询检查IO状态，使用配置的超时时间和间隔
+    // 先调用一次check_io（后端从IO订阅缓存中读取），未取到数据时等待服务器推送的io事件再重试，不再定时轮询
     const startTime = Date.now();
     const timeout = appConfig.ioCheckTimeout;
-    const interval = appConfig.ioCheckInterval;
+    let finished = false;
+    let requesting = false;
+    let offIoEvent = null;
+    
+    function keepButtonDisabled() {
+        const button = document.querySelector(`.test-button[data-item-id="${itemId}"]`);
+        if (button) {
+            // 按钮保持disabled状态，不显示文本，保持置灰样式
+            button.textContent = '';
+            button.disabled = true;
+        }
+    }
     
-    const checkInterval = setInterval(() => {
+    function finish(title, message) {
+        if (finished) return;
+        finished = true;
+        clearTimeout(timeoutTimer);
+        if (offIoEvent) offIoEvent();
+        if (title) {
+            showModal(title, message);
+        }
+        keepButtonDisabled();
+    }
+    
+    function requestIO() {
+        if (finished || requesting) return;
+        requesting = true;
         fetch('/api/check_io', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ 
+            body: JSON.stringify(Object.assign(getTestContext(), {
                 item_id: itemId, 
                 test_id: 'light',
                 ssh_host: getSSHInfo().ssh_host,
                 ssh_user: getSSHInfo().ssh_user
-            })
+            }))
         })
         .then(response => response.json())
         .then(data => {
-            if (data.status === 'success') {
-                clearInterval(checkInterval);
-                // 设置测试结果
-                setTestResult(itemId, data.test_status, testId);
-                
-                // 按钮保持置灰状态，不恢复
-                const button = document.querySelector(`.test-button[data-item-id="${itemId}"]`);
-                if (button) {
-                    // 按钮保持disabled状态，不显示文本，保持置灰样式
-                    button.textContent = '';
-                    button.disabled = true;
-                }
-                
-                // 检查是否所有测试项都完成了
-                checkAllTestsCompleted();
-            } else if (Date.now() - startTime > timeout) {
-                clearInterval(checkInterval);
-                showModal('超时', `检查IO状态超时（${timeout / 1000}秒）`);
-                const button = document.querySelector(`.test-button[data-item-id="${itemId}"]`);
-                if (button) {
-                    // 超时后按钮保持置灰
-                    button.textContent = '';
-                    button.disabled = true;
-                }
-            }
+            requesting = false;
+            if (finished || data.status !== 'success') return;  // 未取到数据，等待下一个io事件
+            // 设置测试结果
+            setTestResult(itemId, data.test_status, 'light');
+            finish();
+            // 检查是否所有测试项都完成了
+            checkAllTestsCompleted();
         })
         .catch(error => {
+            requesting = false;
             console.error('检查IO错误:', error);
-            if (Date.now() - startTime > timeout) {
-                clearInterval(checkInterval);
-                showModal('错误', '检查IO状态失败');
-                const button = document.querySelector(`.test-button[data-item-id="${itemId}"]`);
-                if (button) {
-                    // 失败时保持置灰
-                    button.textContent = '';
-                    button.disabled = true;
-                }
-            }
         });
-    }, interval);
+    }
+    
+    const timeoutTimer = setTimeout(() => {
+        finish('超时', `检查IO状态超时（${timeout / 1000}秒）`);
+    }, timeout);
+    
+    offIoEvent = onServerEvent('io', requestIO);
+    requestIO();
+    
+    // 事件通道不可用时（如浏览器不支持EventSource），按配置间隔重试
+    if (!connectServerEvents()) {
+        const retryTimer = setInterval(() => {
+            if (finished || Date.now() - startTime > timeout) {
+                clearInterval(retryTimer);
+                return;
+            }
+            requestIO();
+        }, appConfig.ioCheckInterval);
+    }
 }
 
 // 设置测试结果
@@ -2630,25 +2879,34 @@ function loadTestReport() {
     
     // 获取测试结果
     console.log('当前测试结果:', testResults);
+    const reportRequest = JSON.stringify({
+        test_results: testResults,
+        vehicle_model: vehicleModel,
+        hostname: hostname,
+        app_version: systemInfo.APP_VERSION || '', // 传递APP_VERSION
+        tester: testerName, // 传递测试人员名称
+        test_time: testStartTime || '' // 传递测试开始时间
+    });
     fetch('/api/test_report', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
         },
-        body: JSON.stringify({
-            test_results: testResults,
-            vehicle_model: vehicleModel,
-            hostname: hostname,
-            app_version: systemInfo.APP_VERSION || '', // 传递APP_VERSION
-            tester: testerName, // 传递测试人员名称
-            test_time: testStartTime || '' // 传递测试开始时间
-        })
+        body: reportRequest
     })
     .then(response => response.json())
     .then(data => {
         console.log('报告数据:', data);
         if (data.status === 'success') {
             renderTestReport(data.data, data.title);
+            // 保存测试结果（同一次测试重复打开报告时服务端替换之前的记录）
+            fetch('/api/submit_test', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: reportRequest
+            }).catch(error => console.error('保存测试结果失败:', error));
         } else {
             showModal('错误', '加载测试报告失败');
         }
@@ -2800,11 +3058,23 @@ function updateTestReportInRealTime() {
     }
 }
 
+// 从响应头Content-Disposition中取出文件名（优先使用UTF-8编码的filename*）
+function parseDownloadFilename(response) {
+    const disposition = response.headers.get('Content-Disposition') || '';
+    const encoded = disposition.match(/filename\*=UTF-8''([^;]+)/i);
+    if (encoded) {
+        return decodeURIComponent(encoded[1]);
+    }
+    const plain = disposition.match(/filename="?([^";]+)"?/i);
+    return plain ? plain[1] : '';
+}
+
 // 下载测试报告
 function downloadTestReport() {
     const urlParams = new URLSearchParams(window.location.search);
     const vehicleModel = urlParams.get('vehiclemodel') || 'X100';
     const hostname = urlParams.get('hostname') || '';
+    let reportFilename = '';
     
     fetch('/api/download_report', {
         method: 'POST',
@@ -2822,6 +3092,7 @@ function downloadTestReport() {
     })
     .then(response => {
         if (response.ok) {
+            reportFilename = parseDownloadFilename(response) || `机器人静态测试报告_${vehicleModel}.xlsx`;
             return response.blob();
         } else {
             return response.json().then(data => {
@@ -2835,22 +3106,8 @@ function downloadTestReport() {
         const a = document.createElement('a');
         a.href = url;
         
-        // 生成文件名，使用测试开始时间戳（如果有），否则使用当前时间
-        let timeStr;
-        if (testStartTime) {
-            // 将格式从 "2026-01-13 11:13:20" 转换为 "2026-01-13_11-13-20"（文件名中不能有冒号）
-            timeStr = testStartTime.replace(/ /g, '_').replace(/:/g, '-');
-        } else {
-            // 如果没有测试开始时间，使用当前时间
-            const now = new Date();
-            timeStr = now.getFullYear() + '-' + 
-                     String(now.getMonth() + 1).padStart(2, '0') + '-' + 
-                     String(now.getDate()).padStart(2, '0') + '_' +
-                     String(now.getHours()).padStart(2, '0') + '-' + 
-                     String(now.getMinutes()).padStart(2, '0') + '-' + 
-                     String(now.getSeconds()).padStart(2, '0');
-        }
-        a.download = `机器人静态测试报告_${vehicleModel}_${timeStr}.xlsx`;
+        // 文件名由服务端生成（测试开始时间戳，没有时使用当前时间）
+        a.download = reportFilename;
         document.body.appendChild(a);
         a.click();
         document.body.removeChild(a);
@@ -2875,8 +3132,8 @@ function uploadToCloud() {
         cloudSyncBtn.textContent = '上传中...';
     }
     
-    // 先获取报告文件并保存到本地
-    fetch('/api/download_report', {
+    // 服务端生成报告，保存到report文件夹后直接上传
+    fetch('/api/publish_report', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
@@ -2887,68 +3144,9 @@ function uploadToCloud() {
             hostname: hostname,
             app_version: systemInfo.APP_VERSION || '',
             tester: testerName,
-            test_time: testStartTime || '' // 传递测试开始时间
-        })
-    })
-    .then(response => {
-        if (response.ok) {
-            return response.blob();
-        } else {
-            return response.json().then(data => {
-                throw new Error(data.message || '获取报告失败');
-            });
-        }
-    })
-    .then(blob => {
-        // 生成文件名，使用测试开始时间戳（如果有），否则使用当前时间
-        let timeStr;
-        if (testStartTime) {
-            // 将格式从 "2026-01-13 11:13:20" 转换为 "2026-01-13_11-13-20"（文件名中不能有冒号）
-            timeStr = testStartTime.replace(/ /g, '_').replace(/:/g, '-');
-        } else {
-            // 如果没有测试开始时间，使用当前时间
-            const now = new Date();
-            timeStr = now.getFullYear() + '-' + 
-                     String(now.getMonth() + 1).padStart(2, '0') + '-' + 
-                     String(now.getDate()).padStart(2, '0') + '_' +
-                     String(now.getHours()).padStart(2, '0') + '-' + 
-                     String(now.getMinutes()).padStart(2, '0') + '-' + 
-                     String(now.getSeconds()).padStart(2, '0');
-        }
-        const cloudname = `机器人静态测试报告_${vehicleModel}_${timeStr}.xlsx`;
-        const cloudsize = blob.size; // 获取文件大小（字节）
-        
-        console.log(`[云端同步] 文件名: ${cloudname}, 大小: ${cloudsize}字节`);
-        
-        // 第一步：保存文件到本地report文件夹
-        const formData = new FormData();
-        formData.append('file', blob, cloudname);
-        formData.append('cloudname', cloudname);
-        
-        return fetch('/api/save_report', {
-            method: 'POST',
-            body: formData
+            test_time: testStartTime || '', // 传递测试开始时间
+            upload: true
         })
-        .then(response => response.json())
-        .then(saveResult => {
-            if (saveResult.status !== 'success') {
-                throw new Error(saveResult.message || '保存文件失败');
-            }
-            
-            console.log(`[云端同步] 文件已保存到本地: ${saveResult.file_path}`);
-            
-            // 第二步：执行上传脚本
-            return fetch('/api/upload_to_cloud', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    cloudname: saveResult.cloudname,
-                    cloudsize: saveResult.cloudsize
-                })
-            });
-        });
     })
     .then(response => response.json())
     .then(data => {
@@ -0,0 +1,195 @@
+# 按钮IO映射表
+# 读取 devices_data.csv（由配置存储缓存，文件变化时自动重新加载），按车型预先编译按钮名称 -> int_data下标的查找表：
+# - 按标准化后的按钮名称建立索引（去掉括号中的说明，"维修"统一为"维护"，"按钮"统一为"键"）
+# - 按 button_test.py / touch_test.py 中的测试项ID建立索引，按键测试直接用测试项ID查表
+# - 记录多个按钮共用同一IO索引的情况（如X100/X150的四个急停按钮共用索引7）以及同名按钮出现在多个索引的情况
+# 查询时只做字典查找，不再逐行扫描CSV和执行正则替换
+
+import os
+import re
+
+from .config_store import config_store, parse_csv_rows
+from .vehicle_model import find_families
+
+# CSV文件路径
+CSV_FILE_PATH = os.path.join(os.path.dirname(__file__), 'devices_data.csv')
+
+# 括号中的说明（如"右前维护按钮（需要按一段时间）"）
+_BRACKET_PATTERN = re.compile(r'[（(].*?[）)]')
+
+
+def clean_button_name(name):
+    """移除括号中的内容"""
+    return _BRACKET_PATTERN.sub('', name)
+
+
+def normalize_button_name(name):
+    """标准化按钮名称：移除括号内容，维修统一为维护，按钮统一为键"""
+    return clean_button_name(name).replace('维修', '维护').replace('按钮', '键')
+
+
+def _test_items():
+    """按键测试和触边测试中的全部测试项 {测试项ID: 按钮名称}"""
+    from . import button_test, touch_test
+    items = {}
+    for data in (button_test.BUTTON_TEST_DATA, touch_test.TOUCH_TEST_DATA):
+        for section in data.get('sections', []):
+            for item in section.get('items', []):
+                items.setdefault(item.get('id'), item.get('name'))
+    return items
+
+
+class FamilyButtonMapping:
+    """单个车型的按钮映射（只读）
+
+    - entries: CSV中的按钮列表（保持文件顺序），每项包含 io_index、value_meaning、button_name 及预先计算的匹配键
+    - by_name: {标准化按钮名称: 映射}，同名按钮只保留第一次出现的索引
+    - by_item_id: {测试项ID: 映射}
+    - conflicts: 共用IO索引和同名多索引的报告
+    """
+
+    def __init__(self, family, column, entries, test_items):
+        self.family = family
+        self.column = column
+        self.entries = entries
+        self.by_name = {}
+        by_index = {}
+        for entry in entries:
+            self.by_name.setdefault(entry['normalized'], entry)
+            by_index.setdefault(entry['io_index'], []).append(entry['button_name'])
+        self._memo = {}  # 包含匹配的查询结果 {按钮名称: 映射或None}
+        self.by_item_id = {}
+        for item_id, name in test_items.items():
+            entry = self._find(name)
+            if entry:
+                self.by_item_id[item_id] = entry
+        self.conflicts = {
+            "shared_index": {io_index: names for io_index, names in by_index.items() if len(names) > 1},
+            "duplicate_name": {
+                entry['button_name']: sorted({e['io_index'] for e in entries if e['normalized'] == entry['normalized']})
+                for entry in entries
+                if self.by_name[entry['normalized']] is not entry
+            },
+        }
+
+    def lookup(self, button_name):
+        """按按钮名称查找映射"""
+        if button_name not in self._memo:
+            self._memo[button_name] = self._find(button_name)
+        return self._memo[button_name]
+
+    def _find(self, button_name):
+        # 标准化后完全相同的按钮直接命中
+        normalized = normalize_button_name(button_name)
+        entry = self.by_name.get(normalized)
+        if entry:
+            return entry
+        # 否则按CSV顺序做包含匹配（与原来逐行匹配的规则一致，匹配键已预先计算）
+        clean = clean_button_name(button_name)
+        for entry in self.entries:
+            if (normalized in entry['normalized'] or entry['normalized'] in normalized or
+                    clean in entry['clean'] or entry['clean'] in clean):
+                return entry
+        return None
+
+    def to_dict(self):
+        return {
+            "family": self.family,
+            "column": self.column,
+            "buttons": [public_entry(entry) for entry in self.entries],
+            "items": {item_id: public_entry(entry) for item_id, entry in self.by_item_id.items()},
+            "conflicts": self.conflicts,
+        }
+
+
+def public_entry(entry):
+    """对外返回的映射结果（不含内部匹配键）"""
+    return {
+        'io_index': entry['io_index'],
+        'value_meaning': entry['value_meaning'],
+        'button_name': entry['button_name'],
+    }
+
+
+class ButtonMappingTable:
+    """devices_data.csv 编译后的查找表 {车型: FamilyButtonMapping}（CSV变化时由配置存储整体替换）"""
+
+    def __init__(self, families, item_names=None):
+        self.families = families
+        self.item_names = item_names or {}  # {测试项ID: 按钮名称}
+
+    @classmethod
+    def from_csv(cls, raw, path=CSV_FILE_PATH):
+        """从CSV内容构建查找表（由配置存储在文件变化时调用）"""
+        rows = parse_csv_rows(raw, path)
+        if not rows:
+            return cls({})
+        header = [str(name).strip() for name in rows[0]]
+        test_items = _test_items()
+        families = {}
+        for col_idx, col_name in enumerate(header):
+            # 表头中的车型代码（如 "X060/X080" -> X060、X080）
+            codes = find_families(col_name)
+            if not codes:
+                continue
+            # 值的含义列通常在按钮名称列之后，没找到时使用下一列
+            desc_col = next((idx for idx in range(col_idx + 1, len(header)) if '含义' in header[idx]), None)
+            if desc_col is None and col_idx + 1 < len(header):
+                desc_col = col_idx + 1
+            if desc_col is None:
+                continue
+            entries = []
+            for row in rows[1:]:
+                index_str = str(row[0]).strip() if row else ""
+                if len(row) <= max(col_idx, desc_col) or not index_str.isdigit():
+                    continue
+                # 同一单元格中可能有多个按钮（用空格分隔，共用同一IO索引）
+                for name in str(row[col_idx]).split():
+                    entries.append({
+                        'io_index': int(index_str),
+                        'value_meaning': str(row[desc_col]).strip(),
+                        'button_name': name,
+                        'clean': clean_button_name(name),
+                        'normalized': normalize_button_name(name),
+                    })
+            mapping = None
+            for code in codes:
+                if code not in families:  # 车型出现在多列时使用第一列
+                    mapping = mapping or FamilyButtonMapping(code, col_name, entries, test_items)
+                    families[code] = mapping
+        table = cls(families, test_items)
+        for code, mapping in families.items():
+            for io_index, names in mapping.conflicts["shared_index"].items():
+                print(f"[按钮映射] {code}: IO索引 {io_index} 由多个按钮共用: {' '.join(names)}")
+            for name, indexes in mapping.conflicts["duplicate_name"].items():
+                print(f"[按钮映射] ⚠️ {code}: 按钮 '{name}' 出现在多个IO索引: {indexes}")
+        print(f"[按钮映射] 已编译 {len(families)} 个车型的按钮映射: {sorted(families)}")
+        return table
+
+    def get(self, family):
+        return self.families.get(family)
+
+    def lookup(self, family, button_name):
+        """按车型和按钮名称查找映射，未找到时返回None"""
+        mapping = self.families.get(family)
+        entry = mapping.lookup(button_name) if mapping else None
+        return public_entry(entry) if entry else None
+
+    def lookup_item(self, family, item_id):
+        """按车型和测试项ID查找映射，未找到时返回None"""
+        mapping = self.families.get(family)
+        entry = mapping.by_item_id.get(item_id) if mapping else None
+        if not entry:
+            return None
+        return dict(public_entry(entry), item_name=self.item_names.get(item_id))
+
+    def conflicts(self):
+        return {family: mapping.conflicts for family, mapping in self.families.items()}
+
+
+config_store.register('button_mapping', CSV_FILE_PATH, ButtonMappingTable.from_csv)
+
+
+def get_button_mapping_table():
+    """获取当前的按钮映射表（CSV修改后自动重新加载），加载失败时返回空表"""
+    return config_store.get('button_mapping') or ButtonMappingTable({})
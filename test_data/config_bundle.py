@@ -0,0 +1,117 @@
+# 预编译配置包
+# compile_config.py 校验全部配置后，把配置存储中各CSV配置的编译结果（TAB配置、设备型号目录、按钮映射表）
+# 连同源文件的修改时间、大小和哈希写入一个文件：
+#   魔数(8字节) + SHA-256校验和(32字节) + pickle内容
+# 服务启动时一次读取配置包，源文件未变化的配置直接使用包中的编译结果，不再解析CSV；
+# 源文件已修改（或配置包损坏、版本不符）的配置照常解析，之后的热加载不受影响
+
+import hashlib
+import os
+import pickle
+import time
+
+from .config_store import config_store
+
+MAGIC = b'RTCFGB01'
+# 配置包格式版本（快照结构变化时加1，旧配置包自动失效）
+BUNDLE_FORMAT = 1
+
+
+class BundleError(Exception):
+    """配置包损坏或版本不符"""
+    pass
+
+
+def build_bundle(store=config_store):
+    """把配置存储中所有已注册配置的当前快照打包，返回配置包字典（调用前需确保配置已加载且无错误）"""
+    store.reload_if_changed(force=True)
+    sources = {}
+    snapshots = {}
+    for name, entry in store.entries().items():
+        if entry.snapshot is None or entry.error:
+            raise BundleError(f"配置 {name} 加载失败: {entry.error}")
+        with open(entry.path, 'rb') as f:
+            raw = f.read()
+        sources[name] = {
+            'path': os.path.basename(entry.path),
+            'mtime': entry.mtime,
+            'size': entry.size,
+            'sha1': hashlib.sha1(raw).hexdigest(),
+        }
+        snapshots[name] = entry.snapshot
+    version = hashlib.sha1(repr(sorted((name, source['sha1']) for name, source in sources.items())).encode()).hexdigest()[:16]
+    return {
+        'format': BUNDLE_FORMAT,
+        'version': version,
+        'created_at': time.time(),
+        'sources': sources,
+        'snapshots': snapshots,
+    }
+
+
+def write_bundle(bundle, path):
+    """写入配置包（先写临时文件再替换）"""
+    payload = pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + hashlib.sha256(payload).digest() + payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+
+def read_bundle(path):
+    """读取并校验配置包"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    header_size = len(MAGIC) + 32
+    if len(data) < header_size or data[:len(MAGIC)] != MAGIC:
+        raise BundleError("不是配置包文件")
+    checksum, payload = data[len(MAGIC):header_size], data[header_size:]
+    if hashlib.sha256(payload).digest() != checksum:
+        raise BundleError("校验和不匹配，配置包已损坏")
+    bundle = pickle.loads(payload)
+    if bundle.get('format') != BUNDLE_FORMAT:
+        raise BundleError(f"配置包格式版本 {bundle.get('format')} 与当前版本 {BUNDLE_FORMAT} 不符，请重新运行 compile_config.py")
+    return bundle
+
+
+def _source_unchanged(path, source):
+    """源文件与打包时一致：修改时间和大小相同，或内容哈希相同（如部署时拷贝导致修改时间变化）"""
+    stat = os.stat(path)
+    if (stat.st_mtime, stat.st_size) == (source['mtime'], source['size']):
+        return stat
+    if stat.st_size != source['size']:
+        return None
+    with open(path, 'rb') as f:
+        if hashlib.sha1(f.read()).hexdigest() == source['sha1']:
+            return stat
+    return None
+
+
+def apply_bundle(path, store=config_store):
+    """启动时加载配置包，返回使用了配置包的配置名称列表；配置包不存在或无效时返回空列表"""
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        bundle = read_bundle(path)
+    except (OSError, BundleError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        print(f"[配置包] ⚠️ 无法使用配置包 {path}: {e}，改为解析CSV")
+        return []
+
+    applied = []
+    entries = store.entries()
+    for name, source in bundle['sources'].items():
+        entry = entries.get(name)
+        if entry is None or os.path.basename(entry.path) != source['path']:
+            continue
+        try:
+            stat = _source_unchanged(entry.path, source)
+        except OSError:
+            stat = None
+        if stat is None:
+            print(f"[配置包] {source['path']}（{name}）在打包后已修改，重新解析")
+            continue
+        store.seed(name, bundle['snapshots'][name], stat)
+        applied.append(name)
+    print(f"[配置包] 已加载配置包 {os.path.basename(path)}（版本 {bundle['version']}），使用预编译配置: {applied}")
+    return applied
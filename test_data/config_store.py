@@ -0,0 +1,148 @@
+# 配置文件存储
+# test_data 下的CSV配置（TABdisplay_data.csv、devices_data.csv）统一在这里读取和缓存：
+# - 每个配置注册一个解析函数，解析结果（编译后的快照）常驻内存，查询直接读快照
+# - 读取快照时按间隔检查文件修改时间，只重新解析发生变化的文件，解析成功后整体替换快照并增加版本号
+# - 修改CSV后无需重启服务；解析失败时保留旧快照继续使用
+
+import os
+import threading
+import time
+
+from . import csv_loader
+
+
+def parse_csv_rows(raw, path=""):
+    """把CSV内容解析为行列表（最基础的解析函数，注册时可直接使用）
+
+    编码只识别一次，解析结果缓存在源文件旁边（见 csv_loader.py），内容未变化时直接使用缓存
+    """
+    return csv_loader.rows_from_bytes(raw, path)
+
+
+class _ConfigEntry:
+    """一个已注册的配置文件"""
+
+    def __init__(self, name, path, parser):
+        self.name = name
+        self.path = path
+        self.parser = parser  # parser(原始字节, 文件路径) -> 编译后的快照
+        self.snapshot = None
+        self.version = 0
+        self.mtime = None
+        self.size = None
+        self.loaded_at = None
+        self.error = None
+
+
+class ConfigStore:
+    """按名称注册的配置快照，文件变化时自动重新加载
+
+    get(name) 在 check_interval 秒内直接返回当前快照（只读字典访问），
+    超过间隔时对文件做一次stat，修改时间或大小变化才重新解析
+    """
+
+    def __init__(self, check_interval=None):
+        self.check_interval = check_interval
+        self.version = 0  # 任意配置重新加载时加1
+        self._entries = {}
+        self._last_check = 0
+        self._lock = threading.Lock()
+
+    def _interval(self):
+        if self.check_interval is not None:
+            return self.check_interval
+        import config
+        return config.CONFIG_STORE_CHECK_INTERVAL
+
+    def register(self, name, path, parser=parse_csv_rows):
+        """注册配置文件（首次get时加载）"""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _ConfigEntry(name, path, parser)
+
+    def get(self, name):
+        """返回配置的当前快照"""
+        entry = self._entries[name]
+        if entry.snapshot is None or time.time() - self._last_check >= self._interval():
+            self.reload_if_changed()
+        return entry.snapshot
+
+    def entries(self):
+        """已注册的配置 {名称: 配置项}"""
+        with self._lock:
+            return dict(self._entries)
+
+    def seed(self, name, snapshot, stat):
+        """使用预编译的快照（见 config_bundle.py），stat 为对应源文件的状态，文件之后再修改时照常重新加载"""
+        with self._lock:
+            entry = self._entries[name]
+            entry.snapshot = snapshot
+            entry.mtime, entry.size = stat.st_mtime, stat.st_size
+            entry.loaded_at = time.time()
+            entry.error = None
+            entry.version += 1
+            self.version += 1
+
+    def entry_version(self, name):
+        return self._entries[name].version
+
+    def reload_if_changed(self, force=False):
+        """检查所有已注册的文件，重新加载发生变化的文件，返回重新加载的配置名称列表"""
+        reloaded = []
+        with self._lock:
+            self._last_check = time.time()
+            stat_cache = {}
+            raw_cache = {}  # 同一文件注册了多个配置时只读取一次
+            for entry in self._entries.values():
+                try:
+                    if entry.path not in stat_cache:
+                        stat_cache[entry.path] = os.stat(entry.path)
+                    stat = stat_cache[entry.path]
+                    if not force and entry.mtime is not None and (stat.st_mtime, stat.st_size) == (entry.mtime, entry.size):
+                        continue
+                    if entry.path not in raw_cache:
+                        with open(entry.path, 'rb') as f:
+                            raw_cache[entry.path] = f.read()
+                except OSError as e:
+                    if entry.error != str(e):
+                        print(f"[配置存储] ❌ 无法读取 {entry.path}: {e}")
+                    entry.error = str(e)
+                    continue
+                if self._load(entry, stat, raw_cache[entry.path]):
+                    reloaded.append(entry.name)
+        return reloaded
+
+    def _load(self, entry, stat, raw):
+        """解析文件并替换快照（调用方需持有锁），解析失败时保留旧快照，文件再次修改后重试"""
+        entry.mtime, entry.size = stat.st_mtime, stat.st_size
+        try:
+            snapshot = entry.parser(raw, entry.path)
+        except Exception as e:
+            entry.error = str(e)
+            print(f"[配置存储] ❌ 解析 {os.path.basename(entry.path)}（{entry.name}）失败，继续使用旧配置: {e}")
+            return False
+        is_reload = entry.snapshot is not None
+        entry.snapshot = snapshot
+        entry.loaded_at = time.time()
+        entry.error = None
+        entry.version += 1
+        self.version += 1
+        print(f"[配置存储] {'🔄 重新加载' if is_reload else '已加载'} {os.path.basename(entry.path)}（{entry.name}），版本 {entry.version}")
+        return True
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "entries": {
+                entry.name: {
+                    "path": os.path.basename(entry.path),
+                    "version": entry.version,
+                    "loaded_at": entry.loaded_at,
+                    "error": entry.error,
+                } for entry in self._entries.values()
+            },
+        }
+
+
+# 全局共享的配置存储
+config_store = ConfigStore()
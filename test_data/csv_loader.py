@@ -0,0 +1,136 @@
+# CSV读取（统一编码识别 + 解析结果缓存）
+# test_data 下的CSV可能是带BOM的UTF-8、不带BOM的UTF-8或GBK（Excel另存为），原来每个读取的地方都按编码列表逐个尝试，
+# 每次失败都要重新读取和解码整个文件。这里：
+# - 只根据BOM和文件开头的一段字节判断一次编码
+# - 解析后的行列表缓存在源文件旁边（.<文件名>.cache，pickle），按修改时间/大小和内容哈希判断是否有效，
+#   之后读取同一文件只需读一次缓存文件；缓存无法写入（如只读目录）时不影响正常读取
+
+import codecs
+import csv
+import hashlib
+import io
+import os
+import pickle
+
+# 缓存格式版本（缓存内容结构变化时加1，旧缓存自动失效）
+CACHE_FORMAT = 1
+# 判断编码时读取的字节数
+SNIFF_SIZE = 64 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+# 没有BOM时依次尝试的编码（gb18030 兼容 gbk 和 gb2312）
+_FALLBACK_ENCODINGS = ['utf-8', 'gb18030']
+
+
+def sniff_encoding(raw):
+    """根据BOM和开头的一段字节判断编码"""
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            return encoding
+    sample = raw[:SNIFF_SIZE]
+    for encoding in _FALLBACK_ENCODINGS:
+        try:
+            # 样本末尾可能截断了多字节字符，使用增量解码器且不要求结束
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=len(sample) == len(raw))
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+
+def decode(raw, path=""):
+    """解码CSV内容，返回 (文本, 编码)"""
+    encoding = sniff_encoding(raw)
+    try:
+        return raw.decode(encoding), encoding
+    except UnicodeDecodeError:
+        # 开头的样本是UTF-8但后面出现了GBK字符（手工拼接的文件）
+        print(f"[CSV读取] {os.path.basename(path)} 开头按 {encoding} 识别但完整解码失败，改用 gb18030")
+        return raw.decode('gb18030', errors='replace'), 'gb18030'
+
+
+def cache_path_of(path):
+    """缓存文件路径：与源文件同目录，文件名前加点"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.cache')
+
+
+def _read_cache(path):
+    try:
+        with open(cache_path_of(path), 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get('format') != CACHE_FORMAT:
+        return None
+    return cached
+
+
+def _write_cache(path, cached):
+    cache_path = cache_path_of(path)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)  # 原子替换，避免其他进程读到写了一半的缓存
+    except OSError as e:
+        print(f"[CSV读取] 无法写入缓存 {cache_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _parse(raw, path, stat):
+    text, encoding = decode(raw, path)
+    rows = list(csv.reader(io.StringIO(text)))
+    cached = {
+        'format': CACHE_FORMAT,
+        'mtime': stat.st_mtime if stat else None,
+        'size': stat.st_size if stat else len(raw),
+        'sha1': hashlib.sha1(raw).hexdigest(),
+        'encoding': encoding,
+        'rows': rows,
+    }
+    _write_cache(path, cached)
+    return cached
+
+
+def rows_from_bytes(raw, path):
+    """解析已读取的CSV内容（如配置存储读取的文件），内容哈希与缓存一致时直接使用缓存的行列表"""
+    cached = _read_cache(path)
+    if cached and cached['sha1'] == hashlib.sha1(raw).hexdigest():
+        return cached['rows']
+    try:
+        stat = os.stat(path)
+    except OSError:
+        stat = None
+    return _parse(raw, path, stat)['rows']
+
+
+def load(path):
+    """读取CSV文件，返回 {'rows': 行列表, 'encoding': 编码, 'sha1': 内容哈希, ...}
+    
+    修改时间和大小与缓存一致时只读取缓存文件
+    """
+    stat = os.stat(path)
+    cached = _read_cache(path)
+    if cached and (cached['mtime'], cached['size']) == (stat.st_mtime, stat.st_size):
+        return cached
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if cached and cached['sha1'] == hashlib.sha1(raw).hexdigest():
+        # 内容未变（如重新保存或拷贝），只更新修改时间
+        cached.update(mtime=stat.st_mtime, size=stat.st_size)
+        _write_cache(path, cached)
+        return cached
+    return _parse(raw, path, stat)
+
+
+def load_rows(path):
+    """读取CSV文件为行列表"""
+    return load(path)['rows']
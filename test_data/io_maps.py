@@ -0,0 +1,66 @@
+# IO信号映射（按车型）
+# 注意：此文件由 parse_vehicle_mapping.py 根据 test_data/devices_data.csv 自动生成，请勿手工修改
+# 格式：车型 -> int_data各下标对应的测试项ID元组（下标 -> 测试项ID，未使用的下标为空元组，多个按钮共用一个下标时有多个ID）
+# config.py 中的 BUTTON_IO_INDEX_MAP_BY_VEHICLE / TOUCH_IO_INDEX_MAP_BY_VEHICLE 由此生成
+
+# 生成时 devices_data.csv 的SHA-1（compile_config.py 据此检查映射是否需要重新生成）
+SOURCE_SHA1 = "b5f373d5cd015d663a793b401a5c1c7f74ea620c"
+
+IO_SIGNALS_BY_VEHICLE = {
+    "X060": (
+        (),                                      # 0
+        ("front_touch",),                        # 1 前触边
+        ("front_right_maintenance",),            # 2 右前维护按钮
+        ("front_left_emergency",),               # 3 左前急停按钮
+        ("front_right_confirm",),                # 4 右前确认按钮
+        (),                                      # 5
+        (),                                      # 6
+        (),                                      # 7
+        ("back_touch",),                         # 8 后触边
+        ("back_right_maintenance",),             # 9 右后维护按钮
+        ("back_right_emergency",),               # 10 右后急停按钮
+        ("back_right_confirm",),                 # 11 右后确认按钮
+    ),
+    "X080": (
+        (),                                      # 0
+        ("front_touch",),                        # 1 前触边
+        ("front_right_maintenance",),            # 2 右前维护按钮
+        ("front_left_emergency",),               # 3 左前急停按钮
+        ("front_right_confirm",),                # 4 右前确认按钮
+        (),                                      # 5
+        (),                                      # 6
+        (),                                      # 7
+        ("back_touch",),                         # 8 后触边
+        ("back_right_maintenance",),             # 9 右后维护按钮
+        ("back_right_emergency",),               # 10 右后急停按钮
+        ("back_right_confirm",),                 # 11 右后确认按钮
+    ),
+    "X100": (
+        (),                                      # 0
+        ("front_right_maintenance",),            # 1 右前维护按钮
+        (),                                      # 2
+        ("front_right_confirm",),                # 3 右前确认按钮
+        (),                                      # 4
+        ("front_touch",),                        # 5 前触边
+        (),                                      # 6
+        ("front_right_emergency", "back_right_emergency", "front_left_emergency", "back_left_emergency"), # 7 右后急停按钮 左后急停按钮 右前急停按钮 左前急停按钮
+        ("back_touch",),                         # 8 后触边
+        ("back_right_confirm",),                 # 9 右后确认按钮
+        (),                                      # 10
+        ("back_right_maintenance",),             # 11 右后维护按钮
+    ),
+    "X150": (
+        (),                                      # 0
+        ("front_right_maintenance",),            # 1 右前维护按钮
+        (),                                      # 2
+        ("front_right_confirm",),                # 3 右前确认按钮
+        (),                                      # 4
+        ("front_touch",),                        # 5 前触边
+        (),                                      # 6
+        ("front_right_emergency", "back_right_emergency", "front_left_emergency", "back_left_emergency"), # 7 右后急停按钮 左后急停按钮 右前急停按钮 左前急停按钮
+        ("back_touch",),                         # 8 后触边
+        ("back_right_confirm",),                 # 9 右后确认按钮
+        (),                                      # 10
+        ("back_right_maintenance",),             # 11 右后维护按钮
+    ),
+}
@@ -0,0 +1,86 @@
+# 设备型号解析
+# TAB配置按完整设备型号（如 X-060-V1-LV-2L2T-C-1A）配置，页面和接口传入的型号可能更长（多出后缀）或更短（只到某一段）
+# 按 "-" 分段建立前缀树，解析规则（按优先级）：
+# - exact: 与配置的型号完全相同
+# - extension: 传入型号是配置型号的前几段（如 X-060-V1），取前缀树中该节点下CSV中第一个型号
+# - prefix: 配置型号是传入型号的前几段（如传入 X-060-V1-LV-2L2T-C-1A-DHF），取段数最多的配置型号
+# 结果与字典顺序无关，同一型号的解析结果会被缓存
+
+import threading
+
+# 缓存的解析结果数量上限（超过后清空重新缓存）
+MEMO_LIMIT = 4096
+
+
+class _TrieNode:
+    __slots__ = ('children', 'model', 'first')
+
+    def __init__(self):
+        self.children = {}
+        self.model = None  # 到此节点为止正好是一个配置型号
+        self.first = None  # 经过此节点的第一个配置型号（CSV顺序）
+
+
+def split_model(device_model):
+    """按 "-" 分段（忽略首尾空白和空段）"""
+    return [segment for segment in device_model.strip().split('-') if segment]
+
+
+class ModelResolver:
+    """设备型号前缀树（只读，配置变化时整体重建）"""
+
+    def __init__(self, models):
+        self.models = set()
+        self._root = _TrieNode()
+        for model in models:
+            segments = split_model(model)
+            if not segments:
+                continue
+            self.models.add(model)
+            node = self._root
+            for segment in segments:
+                node = node.children.setdefault(segment, _TrieNode())
+                if node.first is None:
+                    node.first = model
+            if node.model is None:
+                node.model = model
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, device_model):
+        """返回 (配置型号, 匹配规则)，未找到时返回 (None, None)"""
+        device_model = (device_model or '').strip()
+        cached = self._memo.get(device_model)
+        if cached is None:
+            cached = self._resolve(device_model)
+            with self._lock:
+                if len(self._memo) >= MEMO_LIMIT:
+                    self._memo.clear()
+                self._memo[device_model] = cached
+        return cached
+
+    def _resolve(self, device_model):
+        if device_model in self.models:
+            return device_model, 'exact'
+        segments = split_model(device_model)
+        if not segments:
+            return None, None
+        node = self._root
+        longest_prefix = None
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.model is not None:
+                longest_prefix = node.model
+        else:
+            # 传入的每一段都匹配上了：分段写法不同的同一型号，或只传了型号的前几段
+            if node.model is not None:
+                return node.model, 'exact'
+            return node.first, 'extension'
+        if longest_prefix is not None:
+            return longest_prefix, 'prefix'
+        return None, None
+
+    def memo_size(self):
+        return len(self._memo)
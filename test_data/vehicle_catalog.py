@@ -0,0 +1,84 @@
+# 设备型号目录
+# 读取 TABdisplay_data.csv（由配置存储缓存，文件变化时自动重新加载），按设备类型（X060、X080、X100、X150等）建立型号索引，
+# /api/vehicle_types 和 /api/vehicle_models 直接查表返回，并提供ETag供浏览器缓存（未变化时返回304）
+
+import hashlib
+import json
+import os
+
+from .config_store import config_store, parse_csv_rows
+from .vehicle_model import family_of
+
+# CSV文件路径
+CSV_FILE_PATH = os.path.join(os.path.dirname(__file__), 'TABdisplay_data.csv')
+
+class VehicleCatalog:
+    """设备型号目录（只读快照，CSV变化时由配置存储整体替换）
+
+    - all_models: CSV中的全部设备型号（保持文件中的顺序）
+    - vehicle_types: 排序后的设备类型列表
+    - models_by_type: {设备类型: 排序去重后的型号列表}
+    - etag: CSV内容的哈希，内容不变则ETag不变
+    """
+
+    def __init__(self, all_models, etag):
+        models_by_type = {}
+        for device_model in all_models:
+            type_code = family_of(device_model)
+            if type_code:
+                models_by_type.setdefault(type_code, set()).add(device_model)
+        self.all_models = all_models
+        self.models_by_type = {code: sorted(models) for code, models in models_by_type.items()}
+        self.vehicle_types = sorted(self.models_by_type)
+        self.etag = etag
+        self._json_cache = {}  # 预先序列化的响应内容
+
+    @classmethod
+    def from_csv(cls, raw, path=CSV_FILE_PATH):
+        """从CSV内容构建目录（由配置存储在文件变化时调用）"""
+        all_models = []
+        # 跳过表头
+        for row in parse_csv_rows(raw, path)[1:]:
+            if row and row[0].strip():
+                all_models.append(row[0].strip())
+        catalog = cls(all_models, hashlib.sha1(raw).hexdigest()[:16])
+        print(f"[设备型号目录] 已加载 {len(all_models)} 个设备型号，设备类型: {catalog.vehicle_types}")
+        return catalog
+
+    def get_models(self, vehicle_type):
+        """根据设备类型获取型号列表（支持 X060 和 X-060 两种写法），未知类型返回空列表"""
+        return self.models_by_type.get(family_of(vehicle_type or '') or '', [])
+
+    def types_json(self):
+        """/api/vehicle_types 的响应内容（JSON字符串）"""
+        return self._cached_json('types', lambda: {
+            "status": "success",
+            "vehicle_types": self.vehicle_types,
+            "all_models": self.all_models,
+        })
+
+    def models_json(self, vehicle_type):
+        """/api/vehicle_models?type= 的响应内容（JSON字符串）"""
+        type_code = family_of(vehicle_type or '')
+        payload = lambda: {"status": "success", "vehicle_models": self.get_models(vehicle_type)}
+        if type_code not in self.models_by_type:
+            return json.dumps(payload(), ensure_ascii=False)  # 未知类型不缓存
+        return self._cached_json(f'models:{type_code}', payload)
+
+    def _cached_json(self, key, build):
+        cached = self._json_cache.get(key)
+        if cached is None:
+            cached = json.dumps(build(), ensure_ascii=False)
+            self._json_cache[key] = cached
+        return cached
+
+
+config_store.register('vehicle_catalog', CSV_FILE_PATH, VehicleCatalog.from_csv)
+
+
+def get_vehicle_catalog():
+    """获取当前的设备型号目录（CSV修改后自动重新加载）"""
+    catalog = config_store.get('vehicle_catalog')
+    if catalog is None:
+        raise ValueError(f"设备型号目录加载失败: {config_store.stats()['entries']['vehicle_catalog']['error']}")
+    return catalog
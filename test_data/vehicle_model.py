@@ -0,0 +1,114 @@
+# 设备型号规范化
+# 设备型号的命名规则（如 X-060-V2-CE-LV-2L2T-C-1A-V1.1）：
+#   X-060      车型（X060）
+#   V2         硬件版本
+#   CE         认证（可选）
+#   LV / V     电压等级
+#   2L2T       传感器布局：激光雷达数量 + L，TOF数量 + T（可选，数量为1时省略数字，如 L、LT、2LT）
+#   C-1A ...   其余选配段，末尾可能有配置版本（V1.1）和定制后缀（DHF、BD等）
+# 按键映射、IO映射、设备型号目录、配置校验都需要从型号中识别车型，这里统一用预编译的正则解析一次，
+# 解析结果（ModelDescriptor）只读并按型号缓存（LRU），各处不再各自编译正则和打印提取日志
+
+import functools
+import re
+
+# 缓存的解析结果数量上限（LRU）
+MEMO_LIMIT = 4096
+
+# 车型：X060、X-060、X_060（后面不能紧跟数字）
+_FAMILY_PATTERN = re.compile(r'X[_-]?(\d{3})(?!\d)')
+# 完整设备型号
+_MODEL_PATTERN = re.compile(
+    r'^X[_-]?(?P<code>\d{3})'
+    r'-(?P<version>V\d+)'
+    r'(?:-(?P<certification>CE))?'
+    r'-(?P<voltage>LV|V)'
+    r'(?:-(?P<sensors>(?P<lidars>\d*)L(?:(?P<tofs>\d*)T)?))?'
+    r'(?P<options>(?:-[^-]+)*?)'
+    r'(?:-(?P<revision>V\d+(?:\.\d+)+))?$'
+)
+
+
+class ModelDescriptor:
+    """设备型号的解析结果（只读，同一型号共享同一个对象）
+
+    - family: 车型（X060等），无法识别时为None
+    - version / certification / voltage / sensor_layout / revision: 对应的段，型号不符合命名规则或没有该段时为None
+    - lidar_count / tof_count: 传感器布局中的激光雷达和TOF数量
+    - options: 其余选配段（如 ('C', '1A', 'DHF')）
+    - structured: 型号是否完整符合命名规则
+    """
+
+    __slots__ = ('model', 'family', 'version', 'certification', 'voltage', 'sensor_layout',
+                 'lidar_count', 'tof_count', 'options', 'revision', 'structured')
+
+    def __init__(self, model, family=None, version=None, certification=None, voltage=None, sensor_layout=None,
+                 lidar_count=0, tof_count=0, options=(), revision=None, structured=False):
+        self.model = model
+        self.family = family
+        self.version = version
+        self.certification = certification
+        self.voltage = voltage
+        self.sensor_layout = sensor_layout
+        self.lidar_count = lidar_count
+        self.tof_count = tof_count
+        self.options = options
+        self.revision = revision
+        self.structured = structured
+
+    def __repr__(self):
+        return f"ModelDescriptor({self.model!r}, family={self.family!r})"
+
+    def to_dict(self):
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result['options'] = list(self.options)
+        return result
+
+
+def _count(digits, present):
+    """传感器数量：有字母时省略数字表示1个"""
+    if not present:
+        return 0
+    return int(digits) if digits else 1
+
+
+@functools.lru_cache(maxsize=MEMO_LIMIT)
+def parse_model(device_model):
+    """解析设备型号，返回 ModelDescriptor（结果缓存）"""
+    device_model = (device_model or '').strip()
+    match = _MODEL_PATTERN.match(device_model)
+    if match:
+        sensors = match.group('sensors')
+        return ModelDescriptor(
+            device_model,
+            family='X' + match.group('code'),
+            version=match.group('version'),
+            certification=match.group('certification'),
+            voltage=match.group('voltage'),
+            sensor_layout=sensors,
+            lidar_count=_count(match.group('lidars'), sensors),
+            tof_count=_count(match.group('tofs'), match.group('tofs') is not None),
+            options=tuple(segment for segment in match.group('options').split('-') if segment),
+            revision=match.group('revision'),
+            structured=True,
+        )
+    # 不符合命名规则（如只传了车型 X060，或其他写法）时只识别车型
+    family_match = _FAMILY_PATTERN.search(device_model)
+    if not family_match:
+        print(f"[设备型号] 无法从 '{device_model}' 识别车型")
+        return ModelDescriptor(device_model)
+    return ModelDescriptor(device_model, family='X' + family_match.group(1))
+
+
+def family_of(device_model):
+    """车型（X060等），无法识别时返回None"""
+    return parse_model(device_model).family
+
+
+def find_families(text):
+    """文本中出现的全部车型（如CSV表头 "X060/X080" -> ['X060', 'X080']）"""
+    return ['X' + code for code in _FAMILY_PATTERN.findall(text or '')]
+
+
+def cache_info():
+    return parse_model.cache_info()
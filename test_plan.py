@@ -0,0 +1,217 @@
+# 车型测试计划
+# 同一车型的测试页面、测试数据、测试报告、下载报告都需要同样的筛选结果：
+# 显示哪些测试类别（TAB顺序）、相机测试显示哪些设备及默认IP、按键测试显示哪些按钮、各测试项的IO索引和指令。
+# 这里按车型一次性生成只读的测试计划并缓存（LRU），各接口直接读取，测试数据的JSON只序列化一次；
+# TAB配置或按钮映射CSV重新加载后缓存自动失效
+
+import json
+import threading
+from collections import OrderedDict
+
+import config
+import test_data
+from test_data import TABdisplayconfig
+from test_data import button_mapping  # 注册按钮映射，与TAB配置一起加载
+from test_data.config_store import config_store
+
+# 相机设备默认IP（未在IP映射中配置时使用）
+DEFAULT_CAMERA_IP = '192.168.1.1'
+
+
+def resolve_categories(vehicle_model):
+    """根据车型获取对应的测试类别列表（优先从CSV文件读取），返回 (类别列表, 来源)"""
+    # 首先尝试从CSV文件读取配置
+    tab_config = TABdisplayconfig.get_tabs_by_device_model(vehicle_model)
+    sources = []
+    if tab_config and 'tabs' in tab_config:
+        sources.append(('csv', tab_config['tabs']))
+    # 如果CSV中没有找到，回退到config.py中的配置
+    if vehicle_model in config.VEHICLE_TAB_CONFIG:
+        sources.append(('config', config.VEHICLE_TAB_CONFIG[vehicle_model]))
+
+    category_dict = {cat['id']: cat for cat in test_data.TEST_CATEGORIES}
+    for source, tab_ids in sources:
+        # 保持配置中的顺序
+        result = [category_dict[tab_id] for tab_id in tab_ids if tab_id in category_dict]
+        if result:
+            print(f"[测试计划] 从{'CSV文件' if source == 'csv' else 'config.py'}加载 {vehicle_model} 的TAB配置: {[cat['id'] for cat in result]}")
+            return result, source
+
+    # 如果都没有配置，返回所有类别
+    print(f"[测试计划] 未找到 {vehicle_model} 的配置，返回所有TAB")
+    return list(test_data.TEST_CATEGORIES), 'default'
+
+
+def _filter_sections(sections, allowed_ids, extra=None):
+    """只保留允许的测试项，extra(item) 返回需要附加到测试项上的字段"""
+    filtered = []
+    for section in sections:
+        items = []
+        for item in section.get('items', []):
+            if item.get('id') in allowed_ids:
+                items.append(dict(item, **extra(item)) if extra else dict(item))
+        if items:
+            filtered.append({"title": section.get('title', ''), "items": items})
+    return filtered
+
+
+class TestPlan:
+    """单个车型的测试计划（只读，生成后不再修改）
+
+    - categories: 按TAB顺序排列的测试类别
+    - details: {测试类别ID: {"sections": [...]}}，相机和按键测试已按车型筛选，相机设备附带default_ip
+    - items: 报告中的测试项顺序 [(类别ID, 类别名称, 测试项ID, 测试项名称)]
+    - io_indices / ip_addresses / commands: {测试项ID: IO索引 / 设备IP / 指令}
+    """
+
+    def __init__(self, vehicle_model):
+        self.vehicle_model = vehicle_model
+        categories, self.category_source = resolve_categories(vehicle_model)
+        self.categories = tuple(dict(cat) for cat in categories)
+        self.category_ids = tuple(cat['id'] for cat in self.categories)
+        self.camera_devices = tuple(TABdisplayconfig.get_camera_devices_by_device_model(vehicle_model))
+        self.button_items = tuple(config.get_button_test_items(vehicle_model))
+
+        # 使用X100的IP映射作为默认值
+        ip_map = config.get_camera_ip_map('X100')
+        self.details = {}
+        for test_id, detail in test_data.TEST_DETAILS.items():
+            sections = detail.get('sections', [])
+            if test_id == 'camera':
+                # 只显示CSV配置中指定的设备，并添加IP地址
+                sections = _filter_sections(sections, self.camera_devices,
+                                            lambda item: {'default_ip': ip_map.get(item.get('id'), DEFAULT_CAMERA_IP)})
+            elif test_id == 'button':
+                # 只显示该车型允许的按钮
+                sections = _filter_sections(sections, self.button_items)
+            else:
+                sections = [{"title": section.get('title', ''), "items": [dict(item) for item in section.get('items', [])]}
+                            for section in sections]
+            self.details[test_id] = dict(detail, sections=sections)
+
+        self.items = tuple(
+            (category['id'], category['name'], item['id'], item['name'])
+            for category in self.categories
+            for section in self.details.get(category['id'], {}).get('sections', [])
+            for item in section['items']
+        )
+        self.ip_addresses = {item['id']: item['default_ip']
+                             for section in self.details['camera']['sections'] for item in section['items']}
+        self.io_indices = self._build_io_indices()
+        self.commands = self._build_commands()
+        self._json = {}  # 预先序列化的测试数据
+        self._lock = threading.Lock()
+
+    def _build_io_indices(self):
+        """按键/触边测试项优先使用devices_data.csv编译的映射，其余使用config.py中的IO映射"""
+        io_indices = {}
+        fallback_maps = {}
+        for test_id, get_io_map in (('button', config.get_button_io_map), ('touch', config.get_touch_io_map),
+                                    ('display', config.get_display_io_map)):
+            try:
+                fallback_maps[test_id] = get_io_map(self.vehicle_model)
+            except config.UnknownVehicleModelError as e:
+                # 车型未配置时不使用其他车型的IO索引，这些测试项没有IO索引
+                print(f"[测试计划] ⚠️ {e}")
+                fallback_maps[test_id] = {}
+        for test_id, fallback in fallback_maps.items():
+            for section in self.details.get(test_id, {}).get('sections', []):
+                for item in section['items']:
+                    mapping = config.get_button_mapping_by_item(self.vehicle_model, item['id']) if test_id != 'display' else None
+                    io_index = mapping['io_index'] if mapping else fallback.get(item['id'])
+                    if io_index is not None:
+                        io_indices[item['id']] = io_index
+        return io_indices
+
+    def _build_commands(self):
+        """各测试项的指令（电机测试为默认高度/角度下的指令，行走电机按页面输入的距离生成，不在此列出）"""
+        commands = {}
+        for command_map in (config.COMMAND_MAP, config.VOICE_COMMAND_MAP,
+                            config.LIFT_MOTOR_COMMAND_MAP.get(config.LIFT_MOTOR_DEFAULT_HEIGHT, {}),
+                            config.ROTATION_MOTOR_COMMAND_MAP.get(config.ROTATION_MOTOR_DEFAULT_ANGLE, {}),
+                            {'reset': config.ROTATION_MOTOR_RESET_COMMAND}):
+            for item_id, command in command_map.items():
+                commands.setdefault(item_id, command)
+        return {item_id: commands[item_id] for _, _, item_id, _ in self.items if item_id in commands}
+
+    def has_category(self, test_id):
+        return test_id in self.category_ids
+
+    def get_details(self, test_id):
+        """测试类别的测试数据（按车型筛选后），未知类别返回None"""
+        return self.details.get(test_id)
+
+    def details_json(self, test_id):
+        """/api/test_data/<test_id> 的响应内容（JSON字符串，只序列化一次），未知类别返回None"""
+        if test_id not in self.details:
+            return None
+        cached = self._json.get(test_id)
+        if cached is None:
+            with self._lock:
+                cached = self._json.setdefault(test_id, json.dumps(self.details[test_id], ensure_ascii=False))
+        return cached
+
+    def to_dict(self):
+        return {
+            "vehicle_model": self.vehicle_model,
+            "category_source": self.category_source,
+            "categories": list(self.categories),
+            "camera_devices": list(self.camera_devices),
+            "button_items": list(self.button_items),
+            "io_indices": self.io_indices,
+            "ip_addresses": self.ip_addresses,
+            "commands": self.commands,
+        }
+
+
+class TestPlanCache:
+    """按车型缓存的测试计划（LRU），配置存储的版本变化时整体失效"""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._plans = OrderedDict()
+        self._config_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, vehicle_model):
+        # 读取一次配置（触发文件修改检查），配置重新加载后旧计划全部作废
+        TABdisplayconfig.load_tab_config_from_csv()
+        version = config_store.version
+        with self._lock:
+            if version != self._config_version:
+                self._plans.clear()
+                self._config_version = version
+            plan = self._plans.get(vehicle_model)
+            if plan is not None:
+                self._plans.move_to_end(vehicle_model)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = TestPlan(vehicle_model)
+        with self._lock:
+            if self._config_version == version:
+                self._plans[vehicle_model] = plan
+                self._plans.move_to_end(vehicle_model)
+                while len(self._plans) > (self.max_size or config.TEST_PLAN_CACHE_SIZE):
+                    self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"cached": len(self._plans), "hits": self.hits, "misses": self.misses}
+
+
+# 全局共享的测试计划缓存
+test_plans = TestPlanCache()
+
+
+def get_test_plan(vehicle_model):
+    """获取车型的测试计划（缓存）"""
+    return test_plans.get(vehicle_model)
@@ -0,0 +1,220 @@
+# 设备型号配置批量校验
+# 对 TABdisplay_data.csv 中的每个设备型号，一次性解析出页面实际会使用的配置：
+# 显示的TAB、按键/触边测试项的IO索引（devices_data.csv 优先，config.py 的IO映射兜底）、相机设备的IP，
+# 报告缺失和冲突的配置，并可与另一版本的CSV对比每个型号解析结果的变化。
+# 同一车型、同样TAB和相机设备的型号只解析一次，几千个型号也能在一秒内完成，可用于配置修改的门禁检查
+#
+# 用法：
+#   python validate_config.py                                   # 校验当前配置
+#   python validate_config.py --diff old/TABdisplay_data.csv    # 与旧版TAB配置对比
+#   python validate_config.py --diff-devices old/devices_data.csv --json
+#   python validate_config.py --strict                          # 有警告也返回非0退出码
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+
+import config
+import test_data
+from test_data import TABdisplayconfig
+from test_data.button_mapping import ButtonMappingTable
+from test_data.vehicle_model import family_of
+
+# 未配置车型时页面使用的默认车型
+DEFAULT_FAMILY = "X100"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="批量校验全部设备型号的TAB、IO索引和设备IP配置")
+    parser.add_argument("--tab-csv", default=TABdisplayconfig.CSV_FILE_PATH, help="TAB配置CSV（默认: %(default)s）")
+    parser.add_argument("--devices-csv", default=None, help="按钮映射CSV（默认: test_data/devices_data.csv）")
+    parser.add_argument("--diff", metavar="OLD_TAB_CSV", help="与旧版TAB配置CSV对比各型号的解析结果")
+    parser.add_argument("--diff-devices", metavar="OLD_DEVICES_CSV", help="与旧版按钮映射CSV对比各型号的解析结果")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--strict", action="store_true", help="有警告时也返回非0退出码")
+    parser.add_argument("--limit", type=int, default=5, help="每类问题最多列出的型号数（默认: %(default)s）")
+    return parser.parse_args()
+
+
+def load_sources(tab_csv, devices_csv=None):
+    """读取并解析TAB配置和按钮映射，返回 ({设备型号: TAB配置}, ButtonMappingTable)"""
+    from test_data import button_mapping
+    with open(tab_csv, 'rb') as f:
+        tab_raw = f.read()
+    devices_csv = devices_csv or button_mapping.CSV_FILE_PATH
+    with open(devices_csv, 'rb') as f:
+        devices_raw = f.read()
+    # 解析过程中的日志不输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        tab_config = TABdisplayconfig._parse_tab_config(tab_raw, tab_csv)
+        table = ButtonMappingTable.from_csv(devices_raw, devices_csv)
+    return tab_config, table
+
+
+def _item_ids(test_id):
+    return [item['id'] for section in test_data.TEST_DETAILS[test_id].get('sections', []) for item in section['items']]
+
+
+class CatalogResolver:
+    """把设备型号解析为页面实际使用的配置，并收集问题
+
+    问题按 (级别, 类型, 说明) 分组，记录涉及的型号；同一解析签名（车型、TAB、相机设备）只计算一次
+    """
+
+    def __init__(self, tab_config, table):
+        self.tab_config = tab_config
+        self.table = table
+        self.touch_items = _item_ids('touch')
+        self._signatures = {}
+
+    def resolve_all(self):
+        """返回 ({设备型号: 解析结果}, {(级别, 类型, 说明): [设备型号]})"""
+        resolved = {}
+        issues = {}
+        for device_model, tab in self.tab_config.items():
+            family = family_of(device_model)
+            signature = (family, tuple(tab['tabs']), tuple(tab['camera_devices']))
+            if signature not in self._signatures:
+                self._signatures[signature] = self._resolve_signature(*signature)
+            result, signature_issues = self._signatures[signature]
+            resolved[device_model] = result
+            for issue in signature_issues:
+                issues.setdefault(issue, []).append(device_model)
+        return resolved, issues
+
+    def _resolve_signature(self, family, tabs, camera_devices):
+        issues = []
+        io_indices = {}
+        ip_addresses = {}
+        if family is None:
+            issues.append(("error", "unknown_family", "无法从设备型号中识别车型"))
+        mapping = self.table.get(family)
+
+        button_items = []
+        if 'button' in tabs:
+            if family not in config.BUTTON_TEST_ITEMS_BY_VEHICLE:
+                issues.append(("warning", "button_items_fallback", f"BUTTON_TEST_ITEMS_BY_VEHICLE 没有 {family}，使用 {DEFAULT_FAMILY} 的按键测试项"))
+            button_items = config.BUTTON_TEST_ITEMS_BY_VEHICLE.get(family, config.BUTTON_TEST_ITEMS_BY_VEHICLE.get(DEFAULT_FAMILY, []))
+        touch_items = self.touch_items if 'touch' in tabs else []
+        io_maps = [
+            (button_items, config.BUTTON_IO_INDEX_MAP_BY_VEHICLE, 'BUTTON_IO_INDEX_MAP_BY_VEHICLE'),
+            (touch_items, config.TOUCH_IO_INDEX_MAP_BY_VEHICLE, 'TOUCH_IO_INDEX_MAP_BY_VEHICLE'),
+        ]
+        for items, maps, map_name in io_maps:
+            fallback = maps.get(family, {})
+            for item_id in items:
+                entry = mapping.by_item_id.get(item_id) if mapping else None
+                csv_index = entry['io_index'] if entry else None
+                config_index = fallback.get(item_id)
+                if csv_index is None and config_index is None:
+                    issues.append(("error", "missing_io", f"{item_id} 在 devices_data.csv 和 {map_name} 中都没有IO索引"))
+                    continue
+                if csv_index is not None and config_index is not None and csv_index != config_index:
+                    issues.append(("warning", "io_conflict", f"{item_id} 的IO索引不一致: devices_data.csv={csv_index}, {map_name}={config_index}（使用CSV）"))
+                io_indices[item_id] = csv_index if csv_index is not None else config_index
+        if mapping:
+            for io_index, names in mapping.conflicts['shared_index'].items():
+                if any(io_indices.get(item_id) == io_index for item_id in button_items):
+                    issues.append(("info", "shared_index", f"IO索引 {io_index} 由多个按钮共用: {' '.join(names)}"))
+            for name, indexes in mapping.conflicts['duplicate_name'].items():
+                issues.append(("error", "duplicate_name", f"按钮 '{name}' 出现在多个IO索引 {indexes}"))
+
+        if 'camera' in tabs:
+            family_ips = config.CAMERA_IP_MAP_BY_VEHICLE.get(family, {})
+            default_ips = config.CAMERA_IP_MAP_BY_VEHICLE.get(DEFAULT_FAMILY, {})
+            for device_id in camera_devices:
+                ip = family_ips.get(device_id) or default_ips.get(device_id)
+                if ip is None:
+                    issues.append(("error", "missing_ip", f"设备 {device_id} 没有配置IP"))
+                    continue
+                if family_ips and device_id not in family_ips:
+                    issues.append(("warning", "ip_fallback", f"CAMERA_IP_MAP_BY_VEHICLE[{family}] 没有 {device_id}，使用 {DEFAULT_FAMILY} 的IP"))
+                ip_addresses[device_id] = ip
+
+        result = {
+            "family": family,
+            "tabs": list(tabs),
+            "io_indices": io_indices,
+            "ip_addresses": ip_addresses,
+        }
+        return result, issues
+
+
+def diff_catalogs(old, new):
+    """对比两个版本的解析结果，返回 {added, removed, changed: {设备型号: {字段: [旧值, 新值]}}}"""
+    changed = {}
+    for device_model in old.keys() & new.keys():
+        fields = {key: [old[device_model][key], new[device_model][key]]
+                  for key in new[device_model] if old[device_model].get(key) != new[device_model][key]}
+        if fields:
+            changed[device_model] = fields
+    return {
+        "added": sorted(new.keys() - old.keys()),
+        "removed": sorted(old.keys() - new.keys()),
+        "changed": dict(sorted(changed.items())),
+    }
+
+
+def validate(tab_csv, devices_csv=None):
+    """校验一个版本的配置，返回 (解析结果, 问题列表)"""
+    tab_config, table = load_sources(tab_csv, devices_csv)
+    resolved, issues = CatalogResolver(tab_config, table).resolve_all()
+    issue_list = [
+        {"level": level, "type": kind, "message": message, "count": len(models), "models": models}
+        for (level, kind, message), models in issues.items()
+    ]
+    order = {"error": 0, "warning": 1, "info": 2}
+    issue_list.sort(key=lambda issue: (order[issue["level"]], issue["type"], issue["message"]))
+    return resolved, issue_list
+
+
+def print_report(resolved, issues, diff, elapsed, limit):
+    icons = {"error": "❌", "warning": "⚠️ ", "info": "ℹ️ "}
+    families = {}
+    for result in resolved.values():
+        families[result["family"]] = families.get(result["family"], 0) + 1
+    print(f"共 {len(resolved)} 个设备型号，车型分布: {families}")
+    for issue in issues:
+        models = issue["models"]
+        more = f" 等{len(models)}个" if len(models) > limit else ""
+        print(f"{icons[issue['level']]} [{issue['type']}] {issue['message']} —— {', '.join(models[:limit])}{more}")
+    if diff is not None:
+        print(f"\n版本对比: 新增 {len(diff['added'])} 个，删除 {len(diff['removed'])} 个，变化 {len(diff['changed'])} 个")
+        for device_model in diff["added"][:limit]:
+            print(f"  + {device_model}")
+        for device_model in diff["removed"][:limit]:
+            print(f"  - {device_model}")
+        for device_model, fields in list(diff["changed"].items())[:limit]:
+            for key, (old_value, new_value) in fields.items():
+                print(f"  ~ {device_model} {key}: {old_value} -> {new_value}")
+    counts = {level: sum(1 for issue in issues if issue["level"] == level) for level in icons}
+    print(f"\n错误 {counts['error']} 类，警告 {counts['warning']} 类，耗时 {elapsed * 1000:.0f}ms")
+
+
+def main():
+    args = parse_args()
+    start = time.time()
+    resolved, issues = validate(args.tab_csv, args.devices_csv)
+    diff = None
+    if args.diff or args.diff_devices:
+        old_resolved, _ = validate(args.diff or args.tab_csv, args.diff_devices or args.devices_csv)
+        diff = diff_catalogs(old_resolved, resolved)
+    elapsed = time.time() - start
+
+    if args.json:
+        print(json.dumps({"models": len(resolved), "issues": issues, "diff": diff, "elapsed": round(elapsed, 3)},
+                         ensure_ascii=False, indent=2))
+    else:
+        print_report(resolved, issues, diff, elapsed, args.limit)
+
+    levels = {issue["level"] for issue in issues}
+    if "error" in levels or (args.strict and "warning" in levels):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())